@@ -7,6 +7,7 @@ from agents.doordash_agent import (
     run_reports_then_analysis_then_campaign,
     get_task_description,
     get_task_description_reports_only,
+    get_task_description_login_only,
     get_task_description_campaign_only,
     get_task_description_campaign_already_logged_in,
     get_task_description_campaign_for_combo,
@@ -20,6 +21,7 @@ __all__ = [
     "run_reports_then_analysis_then_campaign",
     "get_task_description",
     "get_task_description_reports_only",
+    "get_task_description_login_only",
     "get_task_description_campaign_only",
     "get_task_description_campaign_already_logged_in",
     "get_task_description_campaign_for_combo",
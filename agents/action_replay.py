@@ -0,0 +1,127 @@
+"""
+ActionReplay: record a successful browser-use run of a fixed portal flow (login, creating and downloading
+the reports) and replay its actions on later runs without the LLM.
+
+record(history) saves the agent's action history (browser-use's AgentHistoryList, which keeps each
+action with the element it acted on) with the run's parameter values (email, password, dates) replaced by
+<secret>name</secret> placeholders. replay(agent) re-runs the saved actions with browser-use's
+load_and_rerun on an agent created with sensitive_data=replay.params, which fills the placeholders back in.
+A history that does not contain every parameter value is not saved: it picked values some other way (e.g.
+clicking dates in a calendar) and replaying it could silently use the old ones.
+
+replay() returns False (and the caller runs the LLM agent instead) when there is no script, when a step
+fails or an element is not found any more (the DOM has changed), or when this browser-use version has no
+rerun support. ACTION_REPLAY=0 turns recording and replaying off.
+"""
+
+import inspect
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from agents.tracing import span
+
+logger = logging.getLogger(__name__)
+
+REPLAY_DIR_NAME = ".replays"
+# Retries per replayed step before the replay counts as failed
+REPLAY_STEP_RETRIES = 1
+
+
+def replay_enabled() -> bool:
+    return os.getenv("ACTION_REPLAY", "1").strip().lower() not in ("0", "false", "no")
+
+
+class ActionReplay:
+    """
+    Replay script `name` in directory root, for a flow whose varying inputs are params {name: value}.
+    optional: values the flow may or may not use (e.g. credentials for a login that is usually not needed);
+    they are replaced by placeholders when they occur but a script is saved without them.
+    """
+
+    def __init__(self, root: Path, name: str, params: Dict[str, str], optional: Optional[Dict[str, str]] = None) -> None:
+        self.root = Path(root)
+        self.name = name
+        self.required = {k for k, v in params.items() if v}
+        self.params = {k: str(v) for k, v in {**(optional or {}), **params}.items() if v}
+        self.path = self.root / f"{name}.json"
+
+    def available(self) -> bool:
+        return replay_enabled() and self.path.is_file()
+
+    def _placeholders(self, text: str) -> Optional[str]:
+        """text with every parameter value replaced by its placeholder; None if a value does not occur in it."""
+        # Longest first, so a value inside another one (a date in a longer string) is not split
+        for key, value in sorted(self.params.items(), key=lambda kv: -len(kv[1])):
+            escaped = json.dumps(value)[1:-1]
+            if escaped not in text and key not in self.required:
+                continue
+            if escaped not in text:
+                logger.info("ActionReplay: %s: recorded actions do not contain %s; not saving the script", self.name, key)
+                return None
+            text = text.replace(escaped, f"<secret>{key}</secret>")
+        return text
+
+    def record(self, history) -> bool:
+        """Save history (from a successful agent.run()) as the replay script. Returns True if it was saved."""
+        if not replay_enabled() or history is None:
+            return False
+        is_successful = getattr(history, "is_successful", None)
+        if callable(is_successful) and is_successful() is False:
+            return False
+        save = getattr(history, "save_to_file", None)
+        if not callable(save):
+            return False
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=f".{self.name}-", suffix=".json")
+        os.close(fd)
+        try:
+            save(tmp)
+            text = self._placeholders(Path(tmp).read_text(encoding="utf-8"))
+            if text is None:
+                return False
+            Path(tmp).write_text(text, encoding="utf-8")
+            # The history can hold page content of the logged-in account
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning("ActionReplay: could not save %s: %s", self.path, e)
+            return False
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        logger.info("ActionReplay: saved %s", self.path)
+        return True
+
+    def discard(self) -> None:
+        """Delete the script (e.g. after it replayed without the expected result)."""
+        self.path.unlink(missing_ok=True)
+
+    async def replay(self, agent) -> bool:
+        """
+        Re-run the saved actions with agent (created with sensitive_data=self.params and the browser to use).
+        Returns True if every step succeeded.
+        """
+        if not self.available():
+            return False
+        rerun = getattr(agent, "load_and_rerun", None)
+        if not callable(rerun):
+            logger.info("ActionReplay: this browser-use version cannot replay histories; running the agent")
+            return False
+        try:
+            params = inspect.signature(rerun).parameters.values()
+        except (TypeError, ValueError):
+            params = []
+        kwargs = {}
+        if any(p.kind is inspect.Parameter.VAR_KEYWORD or p.name == "max_retries" for p in params):
+            kwargs = {"max_retries": REPLAY_STEP_RETRIES, "skip_failures": False}
+        logger.info("ActionReplay: replaying %s", self.path.name)
+        try:
+            with span("portal.replay", script=self.name):
+                await rerun(str(self.path), **kwargs)
+        except Exception as e:
+            logger.info("ActionReplay: %s failed (%s); running the agent", self.name, e)
+            return False
+        return True
@@ -1,7 +1,8 @@
 """
 AnalysisAgent: runs after financial report download. Unzips report, uses FINANCIAL_DETAILED_* only,
 builds date-wise, day-of-week, slot-based, and day-slot tables (Sales, Payouts, Profitability, Orders, AOV).
-Sales = Subtotal. Dollar columns (Sales, Payouts, AOV) formatted to 2 decimals. No pre/post analysis.
+Sales = Subtotal. Values stay numeric; dollar columns (Sales, Payouts, AOV) are formatted as $X.XX when written.
+No pre/post analysis.
 """
 
 import logging
@@ -18,8 +19,13 @@ try:
 except ImportError:
     pd = None
 
-# Slot boundaries from analysis-app slot_analysis (minutes since midnight)
-SLOT_ORDER = ["Early morning", "Breakfast", "Lunch", "Afternoon", "Dinner", "Late night"]
+from agents import report_cache
+from agents.excel_writer import ReportWorkbook
+from agents.financial_rollup import FinancialRollup, RollupAccumulator
+from agents.report_format import mark_currency
+from agents.report_schemas import DD_FINANCIAL, read_report_csv, read_report_header, resolve_columns
+from agents.time_slots import SLOT_ORDER, WEEKDAY_ORDER, classify_slots, classify_weekdays, parse_datetimes
+from agents.tracing import annotate, file_size, span, timed, traced
 
 
 def _find_financial_detailed_in_zip(zip_path: Path) -> Optional[str]:
@@ -35,60 +41,20 @@ def _extract_financial_detailed_csv(zip_path: Path, output_dir: Path) -> Optiona
     if not member:
         return None
     out_csv = output_dir / "financial_detailed_report.csv"
-    with zipfile.ZipFile(zip_path, "r") as z:
-        with z.open(member) as f:
-            out_csv.write_bytes(f.read())
+    with span("financial.extract", member=member) as s:
+        with zipfile.ZipFile(zip_path, "r") as z:
+            with z.open(member) as f:
+                out_csv.write_bytes(f.read())
+        s.set(bytes=file_size(out_csv))
     logger.info("AnalysisAgent: Extracted %s", member)
     return out_csv
 
 
-def _get_time_slot(time_str) -> Optional[str]:
-    """Same logic as analysis-app slot_analysis.get_time_slot."""
-    if pd.isna(time_str) or time_str == "":
-        return None
-    try:
-        time_obj = pd.to_datetime(time_str, errors="coerce")
-        if pd.isna(time_obj):
-            return None
-        total_minutes = time_obj.hour * 60 + time_obj.minute
-        if total_minutes >= 0 and total_minutes < 300:
-            return "Early morning"
-        if total_minutes >= 300 and total_minutes < 659:
-            return "Breakfast"
-        if total_minutes >= 659 and total_minutes < 839:
-            return "Lunch"
-        if total_minutes >= 839 and total_minutes < 959:
-            return "Afternoon"
-        if total_minutes >= 959 and total_minutes < 1159:
-            return "Dinner"
-        if total_minutes >= 1159:
-            return "Late night"
-    except Exception:
-        pass
-    return None
-
-
 def _resolve_columns(df: pd.DataFrame) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
-    """Return (date_col, time_col, subtotal_col, payout_col, order_col). Names from analysis-app."""
+    """Return (date_col, time_col, subtotal_col, payout_col, order_col) using the DD_FINANCIAL schema aliases."""
     df.columns = df.columns.str.strip()
-    date_col = None
-    for c in ["Timestamp local date", "Timestamp Local Date", "Date", "date"]:
-        if c in df.columns:
-            date_col = c
-            break
-    time_col = None
-    for c in ["Timestamp local time", "Timestamp Local Time", "Order received local time"]:
-        if c in df.columns:
-            time_col = c
-            break
-    subtotal_col = "Subtotal" if "Subtotal" in df.columns else None
-    payout_col = None
-    if "Net total" in df.columns:
-        payout_col = "Net total"
-    elif "Net total (for historical reference only)" in df.columns:
-        payout_col = "Net total (for historical reference only)"
-    order_col = "DoorDash order ID" if "DoorDash order ID" in df.columns else None
-    return date_col, time_col, subtotal_col, payout_col, order_col
+    cols = resolve_columns(df.columns, DD_FINANCIAL)
+    return cols["date"], cols["time"], cols["subtotal"], cols["net_total"], cols["order_id"]
 
 
 # Canonical column name for store identifier in outputs (financial raw data uses "Merchant store ID")
@@ -98,47 +64,171 @@ MERCHANT_STORE_ID_LABEL = "Merchant Store ID"
 def _resolve_store_col(df: pd.DataFrame) -> Optional[str]:
     """Return store ID column name if present. Prefers 'Merchant store ID' from financial raw data."""
     df.columns = df.columns.str.strip()
-    for c in ["Merchant store ID", "Store ID", "Shop ID"]:
-        if c in df.columns:
-            return c
-    return None
+    return resolve_columns(df.columns, DD_FINANCIAL)["store_id"]
 
 
-def _format_dollar_columns(df: pd.DataFrame, dollar_cols: list) -> pd.DataFrame:
-    """Format dollar columns as $X.XX (2 decimals)."""
-    out = df.copy()
-    for c in dollar_cols:
-        if c in out.columns:
-            out[c] = out[c].apply(lambda x: f"${float(x):,.2f}" if pd.notna(x) else "")
-    return out
+def _build_fact_frame(
+    df: pd.DataFrame,
+    date_col: str,
+    time_col: Optional[str],
+    store_col: Optional[str],
+    subtotal_col: str,
+    payout_col: str,
+    order_col: Optional[str],
+) -> pd.DataFrame:
+    """
+    Normalize the raw report once into a typed fact frame shared by every _build_* function:
+    date (datetime64, NaT if unparseable), weekday and slot (ordered categoricals, NaN if unknown),
+    store, subtotal and payout (float, 0 if missing), order (order ID, or row number when absent).
+    """
+    dates = parse_datetimes(df[date_col]).dt.normalize()
+    fact = pd.DataFrame(
+        {
+            "date": dates,
+            "weekday": classify_weekdays(dates),
+            "slot": classify_slots(df[time_col]) if time_col else pd.Categorical.from_codes(
+                [-1] * len(df), categories=SLOT_ORDER, ordered=True
+            ),
+            "store": df[store_col] if store_col else None,
+            "subtotal": pd.to_numeric(df[subtotal_col], errors="coerce").fillna(0),
+            "payout": pd.to_numeric(df[payout_col], errors="coerce").fillna(0),
+            "order": df[order_col] if order_col else pd.RangeIndex(len(df)),
+        },
+        index=df.index,
+    )
+    return fact
 
 
-def _build_date_wise(df: pd.DataFrame, date_col: str, subtotal_col: str, payout_col: str, order_col: str) -> pd.DataFrame:
-    """Date-wise: Sales, Payouts, Profitability (Payouts/Sales), Orders, AOV."""
-    df = df.copy()
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    df = df.dropna(subset=[date_col])
-    df["_date"] = df[date_col].dt.date
-    df[subtotal_col] = pd.to_numeric(df[subtotal_col], errors="coerce").fillna(0)
-    df[payout_col] = pd.to_numeric(df[payout_col], errors="coerce").fillna(0)
-    agg = df.groupby("_date").agg(
-        Sales=(subtotal_col, "sum"),
-        Payouts=(payout_col, "sum"),
-        Orders=(order_col, "nunique") if order_col else (subtotal_col, "count"),
-    ).reset_index()
-    agg.columns = ["Date", "Sales", "Payouts", "Orders"]
+# Rows per chunk when FINANCIAL_DETAILED is streamed straight from the zip (run(stream=True))
+STREAM_CHUNK_ROWS = 200_000
+
+
+def _load_financial_grouped(zip_path: Path, output_dir: Path) -> Optional[Tuple[pd.DataFrame, dict]]:
+    """
+    Extract FINANCIAL_DETAILED_* to output_dir, load it whole and aggregate it per (cell, order).
+    Returns (RollupAccumulator.grouped() frame, meta), or None if the report is missing or unusable.
+    meta: count_distinct_orders, has_time, has_store.
+    """
+    extracted_csv = _extract_financial_detailed_csv(zip_path, output_dir)
+    if not extracted_csv or not extracted_csv.is_file():
+        logger.warning("AnalysisAgent: No FINANCIAL_DETAILED_* in zip")
+        return None
+
+    df = read_report_csv(extracted_csv, DD_FINANCIAL)
+    annotate(rows=len(df))
+    date_col, time_col, subtotal_col, payout_col, order_col = _resolve_columns(df)
+    if not all([date_col, subtotal_col, payout_col]):
+        logger.warning("AnalysisAgent: Missing required columns (date, Subtotal, Net total)")
+        return None
+
+    store_col = _resolve_store_col(df)
+    accumulator = RollupAccumulator(count_distinct_orders=bool(order_col))
+    accumulator.add(_build_fact_frame(df, date_col, time_col, store_col, subtotal_col, payout_col, order_col))
+    del df
+    meta = {"count_distinct_orders": bool(order_col), "has_time": bool(time_col), "has_store": bool(store_col)}
+    return accumulator.grouped(), meta
+
+
+def _stream_financial_grouped(zip_path: Path, chunksize: int = STREAM_CHUNK_ROWS) -> Optional[Tuple[pd.DataFrame, dict]]:
+    """
+    Read FINANCIAL_DETAILED_* straight from the zip member in chunks of `chunksize` rows and fold each
+    chunk into a RollupAccumulator. Nothing is extracted to disk and only the DD_FINANCIAL schema columns
+    are parsed, with the same dtypes in every chunk.
+    Returns the same (grouped frame, meta) as _load_financial_grouped, or None if the report is missing or unusable.
+    """
+    member = _find_financial_detailed_in_zip(zip_path)
+    if not member:
+        logger.warning("AnalysisAgent: No FINANCIAL_DETAILED_* in zip")
+        return None
+
+    with zipfile.ZipFile(zip_path, "r") as z:
+        def open_member():
+            return z.open(member)
+
+        header = pd.DataFrame(columns=read_report_header(open_member, DD_FINANCIAL))
+        date_col, time_col, subtotal_col, payout_col, order_col = _resolve_columns(header)
+        if not all([date_col, subtotal_col, payout_col]):
+            logger.warning("AnalysisAgent: Missing required columns (date, Subtotal, Net total)")
+            return None
+        store_col = _resolve_store_col(header)
+
+        accumulator = RollupAccumulator(count_distinct_orders=bool(order_col))
+        for chunk in read_report_csv(open_member, DD_FINANCIAL, chunksize=chunksize):
+            accumulator.add(_build_fact_frame(chunk, date_col, time_col, store_col, subtotal_col, payout_col, order_col))
+
+    grouped = accumulator.grouped()
+    if grouped is None:
+        logger.warning("AnalysisAgent: %s has no rows", member)
+        return None
+    logger.info("AnalysisAgent: Streamed %s (%d rows)", member, accumulator.rows)
+    annotate(rows=accumulator.rows)
+    meta = {"count_distinct_orders": bool(order_col), "has_time": bool(time_col), "has_store": bool(store_col)}
+    return grouped, meta
+
+
+def _load_financial_rollup(
+    zip_path: Path, output_dir: Path, stream: bool, chunksize: Optional[int], use_cache: bool
+) -> Optional[Tuple[FinancialRollup, dict]]:
+    """
+    Parse the report (whole or streamed) into a FinancialRollup. With use_cache, the parsed per-order frame is
+    stored in report_cache keyed by the zip's SHA-256, and later runs on the same zip memory-map it instead.
+    """
+    with span("financial.load", bytes=file_size(zip_path), stream=stream) as s:
+        key = report_cache.cache_key(zip_path, "financial_grouped") if use_cache and report_cache.available() else None
+        cached = report_cache.load_frames(zip_path, key) if key else None
+        s.set(cached=bool(cached))
+        if cached:
+            frames, meta = cached
+            grouped = frames["grouped"]
+        else:
+            if stream:
+                loaded = _stream_financial_grouped(zip_path, chunksize or STREAM_CHUNK_ROWS)
+            else:
+                loaded = _load_financial_grouped(zip_path, output_dir)
+            if loaded is None:
+                return None
+            grouped, meta = loaded
+            if key:
+                report_cache.save_frames(zip_path, key, {"grouped": grouped}, meta)
+        s.set(grouped_rows=len(grouped))
+    grouped = _numeric_store_ids(grouped)
+    return FinancialRollup.from_grouped(grouped, meta["count_distinct_orders"]), meta
+
+
+def _numeric_store_ids(grouped: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store IDs are read as text (report_schemas); when every ID is made of digits they become numbers again,
+    so Merchant Store ID cells and the DaySlot-Store headers are written as numbers and stores sort numerically.
+    """
+    if "store" not in grouped.columns or not isinstance(grouped["store"].dtype, pd.CategoricalDtype):
+        return grouped
+    ids = grouped["store"].cat.categories.astype(str)
+    if not len(ids) or not ids.str.fullmatch(r"\d+").all() or ids.astype("int64").has_duplicates:
+        return grouped  # text IDs (or IDs that only differ in leading zeros) stay text
+    store = grouped["store"].cat.rename_categories(ids.astype("int64"))
+    return grouped.assign(store=store.cat.reorder_categories(sorted(store.cat.categories)))
+
+
+def _add_ratios(agg: pd.DataFrame) -> pd.DataFrame:
+    """Profitability (Payouts/Sales %) and AOV (Sales/Orders), rounded to 2 decimals."""
     agg["Profitability"] = (agg["Payouts"] / agg["Sales"].replace(0, float("nan")) * 100).round(2)
     agg["AOV"] = (agg["Sales"] / agg["Orders"].replace(0, float("nan"))).round(2)
+    return agg
+
+
+def _build_date_wise(rollup: FinancialRollup) -> pd.DataFrame:
+    """Date-wise: Sales, Payouts, Profitability (Payouts/Sales), Orders, AOV."""
+    agg = rollup.rollup(["date"])
+    agg["Date"] = agg["date"].dt.date
+    agg = _add_ratios(agg)
     return agg[["Date", "Sales", "Payouts", "Profitability", "Orders", "AOV"]]
 
 
-def _build_day_of_week(df: pd.DataFrame, date_col: str, subtotal_col: str, payout_col: str, order_col: str) -> pd.DataFrame:
+def _build_day_of_week(date_wise: pd.DataFrame) -> pd.DataFrame:
     """Day-of-week: average (across dates) of Sales, Payouts, Profitability, Orders, AOV per weekday."""
-    daily = _build_date_wise(df, date_col, subtotal_col, payout_col, order_col)
-    daily["Date"] = pd.to_datetime(daily["Date"])
-    daily["Day of week"] = daily["Date"].dt.day_name()
-    weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    avg = daily.groupby("Day of week").agg(
+    daily = date_wise.copy()
+    daily["Day of week"] = classify_weekdays(daily["Date"])
+    avg = daily.groupby("Day of week", observed=True).agg(
         Sales=("Sales", "mean"),
         Payouts=("Payouts", "mean"),
         Profitability=("Profitability", "mean"),
@@ -150,135 +240,78 @@ def _build_day_of_week(df: pd.DataFrame, date_col: str, subtotal_col: str, payou
     avg["Profitability"] = avg["Profitability"].round(2)
     avg["Orders"] = avg["Orders"].round(2)
     avg["AOV"] = avg["AOV"].round(2)
-    avg["Day of week"] = pd.Categorical(avg["Day of week"], categories=weekday_order, ordered=True)
+    avg["Day of week"] = pd.Categorical(avg["Day of week"], categories=WEEKDAY_ORDER, ordered=True)
     avg = avg.sort_values("Day of week").reset_index(drop=True)
     return avg[["Day of week", "Sales", "Payouts", "Profitability", "Orders", "AOV"]]
 
 
-def _build_slot_based(df: pd.DataFrame, time_col: str, subtotal_col: str, payout_col: str, order_col: str) -> pd.DataFrame:
+def _build_slot_based(rollup: FinancialRollup) -> pd.DataFrame:
     """Slot-based: per slot Sales, Payouts, Profitability, Orders, AOV."""
-    df = df.copy()
-    df["_slot"] = df[time_col].apply(_get_time_slot)
-    df = df.dropna(subset=["_slot"])
-    df[subtotal_col] = pd.to_numeric(df[subtotal_col], errors="coerce").fillna(0)
-    df[payout_col] = pd.to_numeric(df[payout_col], errors="coerce").fillna(0)
-    agg = df.groupby("_slot").agg(
-        Sales=(subtotal_col, "sum"),
-        Payouts=(payout_col, "sum"),
-        Orders=(order_col, "nunique") if order_col else (subtotal_col, "count"),
-    ).reset_index()
-    agg.columns = ["Slot", "Sales", "Payouts", "Orders"]
-    agg["Profitability"] = (agg["Payouts"] / agg["Sales"].replace(0, float("nan")) * 100).round(2)
-    agg["AOV"] = (agg["Sales"] / agg["Orders"].replace(0, float("nan"))).round(2)
+    agg = rollup.rollup(["slot"])
+    agg = _add_ratios(agg.rename(columns={"slot": "Slot"}))
     agg["Slot"] = pd.Categorical(agg["Slot"], categories=SLOT_ORDER, ordered=True)
     agg = agg.sort_values("Slot").reset_index(drop=True)
     return agg[["Slot", "Sales", "Payouts", "Profitability", "Orders", "AOV"]]
 
 
-def _build_day_slot(df: pd.DataFrame, date_col: str, time_col: str, subtotal_col: str, payout_col: str, order_col: str) -> pd.DataFrame:
-    """Day-Slot: Day, Slot, Sales, Payouts, Profitability, Orders, AOV, uplift, Min.Subtotal, campaign recommendation. Sorted by Day then Slot."""
-    df = df.copy()
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    df = df.dropna(subset=[date_col])
-    df["_day"] = df[date_col].dt.day_name()
-    df["_slot"] = df[time_col].apply(_get_time_slot)
-    df = df.dropna(subset=["_slot"])
-    df[subtotal_col] = pd.to_numeric(df[subtotal_col], errors="coerce").fillna(0)
-    df[payout_col] = pd.to_numeric(df[payout_col], errors="coerce").fillna(0)
-    agg = df.groupby(["_day", "_slot"]).agg(
-        Sales=(subtotal_col, "sum"),
-        Payouts=(payout_col, "sum"),
-        Orders=(order_col, "nunique") if order_col else (subtotal_col, "count"),
-    ).reset_index()
-    agg["Profitability"] = (agg["Payouts"] / agg["Sales"].replace(0, float("nan")) * 100).round(2)
-    agg["AOV"] = (agg["Sales"] / agg["Orders"].replace(0, float("nan"))).round(2)
-    weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    agg["Day"] = pd.Categorical(agg["_day"], categories=weekday_order, ordered=True)
-    agg["Slot"] = pd.Categorical(agg["_slot"], categories=SLOT_ORDER, ordered=True)
-    agg = agg.sort_values(["Day", "Slot"]).drop(columns=["_day", "_slot"]).reset_index(drop=True)
+DAY_SLOT_COLUMNS = ["Day", "Slot", "Sales", "Payouts", "Profitability", "Orders", "AOV", "uplift", "Min.Subtotal", "campaign recommendation"]
+
+
+def _add_day_slot_columns(agg: pd.DataFrame) -> pd.DataFrame:
+    """Day/Slot categoricals plus uplift, Min.Subtotal and campaign recommendation, sorted by Day then Slot."""
+    agg = _add_ratios(agg)
+    agg["Day"] = pd.Categorical(agg["weekday"], categories=WEEKDAY_ORDER, ordered=True)
+    agg["Slot"] = pd.Categorical(agg["slot"], categories=SLOT_ORDER, ordered=True)
+    agg = agg.sort_values(["Day", "Slot"], kind="stable").drop(columns=["weekday", "slot"]).reset_index(drop=True)
     # After AOV: uplift = AOV*1.2, Min.Subtotal = CEILING(uplift, 5), campaign recommendation
     agg["uplift"] = (agg["AOV"] * 1.2).round(2)
     agg["Min.Subtotal"] = agg["uplift"].astype(float).apply(lambda x: int(math.ceil(x / 5) * 5))
     agg["campaign recommendation"] = agg["Min.Subtotal"].apply(
         lambda m: f"All customers 15% off on min order of {m} upto Always lowest"
     )
-    return agg[["Day", "Slot", "Sales", "Payouts", "Profitability", "Orders", "AOV", "uplift", "Min.Subtotal", "campaign recommendation"]]
+    return agg
 
 
-def _build_store_slot_agg(
-    df: pd.DataFrame,
-    store_col: str,
-    time_col: str,
-    subtotal_col: str,
-    payout_col: str,
-    order_col: Optional[str],
-) -> pd.DataFrame:
+def _build_day_slot(rollup: FinancialRollup) -> pd.DataFrame:
+    """Day-Slot: Day, Slot, Sales, Payouts, Profitability, Orders, AOV, uplift, Min.Subtotal, campaign recommendation. Sorted by Day then Slot."""
+    agg = _add_day_slot_columns(rollup.rollup(["weekday", "slot"]))
+    return agg[DAY_SLOT_COLUMNS]
+
+
+def _build_day_slot_per_store(rollup: FinancialRollup) -> List[Tuple[object, pd.DataFrame]]:
+    """
+    Day-Slot table for every store from one groupby([store, day, slot]), split afterwards.
+    Returns (store_id, table) in the order stores first appear in the report.
+    """
+    agg = _add_day_slot_columns(rollup.rollup(["store", "weekday", "slot"]))
+    by_store = {store_id: tbl for store_id, tbl in agg.groupby("store", sort=False)}
+    out = []
+    for store_id in rollup.cells["store"].dropna().unique():
+        tbl = by_store.get(store_id)
+        if tbl is not None and not tbl.empty:
+            out.append((store_id, tbl[DAY_SLOT_COLUMNS].reset_index(drop=True)))
+    return out
+
+
+def _build_store_slot_agg(rollup: FinancialRollup) -> pd.DataFrame:
     """Aggregate by Merchant Store ID and Slot; columns Merchant Store ID, Slot, Sales, Payouts, Orders, Profitability, AOV."""
-    df = df.copy()
-    df["_slot"] = df[time_col].apply(_get_time_slot)
-    df = df.dropna(subset=["_slot"])
-    df[subtotal_col] = pd.to_numeric(df[subtotal_col], errors="coerce").fillna(0)
-    df[payout_col] = pd.to_numeric(df[payout_col], errors="coerce").fillna(0)
-    agg = df.groupby([store_col, "_slot"]).agg(
-        Sales=(subtotal_col, "sum"),
-        Payouts=(payout_col, "sum"),
-        Orders=(order_col, "nunique") if order_col else (subtotal_col, "count"),
-    ).reset_index()
-    agg = agg.rename(columns={store_col: MERCHANT_STORE_ID_LABEL, "_slot": "Slot"})
-    agg["Profitability"] = (agg["Payouts"] / agg["Sales"].replace(0, float("nan")) * 100).round(2)
-    agg["AOV"] = (agg["Sales"] / agg["Orders"].replace(0, float("nan"))).round(2)
-    return agg
+    agg = rollup.rollup(["store", "slot"])
+    agg = agg.rename(columns={"store": MERCHANT_STORE_ID_LABEL, "slot": "Slot"})
+    return _add_ratios(agg)
 
 
-def _build_day_slot_store_agg(
-    df: pd.DataFrame,
-    date_col: str,
-    time_col: str,
-    store_col: str,
-    subtotal_col: str,
-    payout_col: str,
-    order_col: Optional[str],
-) -> pd.DataFrame:
+def _build_day_slot_store_agg(rollup: FinancialRollup) -> pd.DataFrame:
     """Aggregate by Day-Slot and Merchant Store ID; columns Day-Slot, Merchant Store ID, Sales, Payouts, Orders, Profitability, AOV."""
-    df = df.copy()
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    df = df.dropna(subset=[date_col])
-    df["_day"] = df[date_col].dt.day_name()
-    df["_slot"] = df[time_col].apply(_get_time_slot)
-    df = df.dropna(subset=["_slot"])
-    df["Day-Slot"] = df["_day"] + "-" + df["_slot"]
-    df[subtotal_col] = pd.to_numeric(df[subtotal_col], errors="coerce").fillna(0)
-    df[payout_col] = pd.to_numeric(df[payout_col], errors="coerce").fillna(0)
-    agg = df.groupby(["Day-Slot", store_col]).agg(
-        Sales=(subtotal_col, "sum"),
-        Payouts=(payout_col, "sum"),
-        Orders=(order_col, "nunique") if order_col else (subtotal_col, "count"),
-    ).reset_index()
-    agg = agg.rename(columns={store_col: MERCHANT_STORE_ID_LABEL})
-    agg["Profitability"] = (agg["Payouts"] / agg["Sales"].replace(0, float("nan")) * 100).round(2)
-    agg["AOV"] = (agg["Sales"] / agg["Orders"].replace(0, float("nan"))).round(2)
-    return agg
+    agg = rollup.rollup(["weekday", "slot", "store"])
+    agg.insert(0, "Day-Slot", agg["weekday"].astype(str) + "-" + agg["slot"].astype(str))
+    agg = agg.drop(columns=["weekday", "slot"]).rename(columns={"store": MERCHANT_STORE_ID_LABEL})
+    return _add_ratios(agg)
 
 
-def _build_store_metrics(
-    df: pd.DataFrame,
-    store_col: str,
-    subtotal_col: str,
-    payout_col: str,
-    order_col: Optional[str],
-) -> pd.DataFrame:
+def _build_store_metrics(rollup: FinancialRollup) -> pd.DataFrame:
     """Per-store: Merchant Store ID, Sales, Payouts, Orders, AOV, Profitability."""
-    df = df.copy()
-    df[subtotal_col] = pd.to_numeric(df[subtotal_col], errors="coerce").fillna(0)
-    df[payout_col] = pd.to_numeric(df[payout_col], errors="coerce").fillna(0)
-    agg = df.groupby(store_col).agg(
-        Sales=(subtotal_col, "sum"),
-        Payouts=(payout_col, "sum"),
-        Orders=(order_col, "nunique") if order_col else (subtotal_col, "count"),
-    ).reset_index()
-    agg = agg.rename(columns={store_col: MERCHANT_STORE_ID_LABEL})
-    agg["Profitability"] = (agg["Payouts"] / agg["Sales"].replace(0, float("nan")) * 100).round(2)
-    agg["AOV"] = (agg["Sales"] / agg["Orders"].replace(0, float("nan"))).round(2)
+    agg = rollup.rollup(["store"])
+    agg = _add_ratios(agg.rename(columns={"store": MERCHANT_STORE_ID_LABEL}))
     return agg[[MERCHANT_STORE_ID_LABEL, "Sales", "Payouts", "Profitability", "Orders", "AOV"]]
 
 
@@ -326,6 +359,7 @@ def _build_campaign_recommendations(store_metrics: pd.DataFrame) -> pd.DataFrame
 DOLLAR_COLS = ["Sales", "Payouts", "AOV"]
 
 
+@traced("financial.workbook")
 def _write_excel(
     output_dir: Path,
     date_wise: pd.DataFrame,
@@ -339,59 +373,41 @@ def _write_excel(
     operator_name: Optional[str] = None,
     day_slot_per_store: Optional[List[Tuple[str, pd.DataFrame]]] = None,
 ) -> Path:
-    try:
-        import openpyxl
-    except ImportError:
-        raise RuntimeError("openpyxl is required. Install with: pip install openpyxl")
-    from openpyxl import Workbook
-    from openpyxl.styles import Font
-    from openpyxl.utils.dataframe import dataframe_to_rows
-
-    wb = Workbook()
-    wb.remove(wb.active)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     tag = (operator_name.strip() if operator_name and isinstance(operator_name, str) else None)
     filename = f"{tag}_financial_analysis_{timestamp}.xlsx" if tag else f"financial_analysis_{timestamp}.xlsx"
     filepath = output_dir / filename
+    book = ReportWorkbook(filepath)
 
-    def add_sheet(ws, df, title: str):
+    def add_sheet(name: str, df, title: str):
+        # An empty table still gets its (blank) sheet
         if df is None or df.empty:
-            return
-        ws.cell(row=1, column=1, value=title).font = Font(bold=True, size=12)
-        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), start=3):
-            for c_idx, value in enumerate(row, start=1):
-                cell = ws.cell(row=r_idx, column=c_idx, value=value)
-                if r_idx == 3:
-                    cell.font = Font(bold=True)
-
-    ws1 = wb.create_sheet("Date-wise")
-    add_sheet(ws1, date_wise, "Date-wise: Sales, Payouts, Profitability, Orders, AOV")
+            book.add_sheet(name)
+        else:
+            book.add_sheet(name, df, title)
+
+    add_sheet("Date-wise", date_wise, "Date-wise: Sales, Payouts, Profitability, Orders, AOV")
     if store_wise is not None and not store_wise.empty:
-        ws_store = wb.create_sheet("Store-wise")
-        add_sheet(ws_store, store_wise, "Store-wise: Sales, Payouts, Profitability, Orders, AOV (by Merchant Store ID)")
-    ws2 = wb.create_sheet("Day of week")
-    add_sheet(ws2, day_of_week, "Day-of-week averages: Sales, Payouts, Profitability, Orders, AOV")
-    ws3 = wb.create_sheet("Slot-based")
-    add_sheet(ws3, slot, "Slot-based: Sales, Payouts, Profitability, Orders, AOV")
+        add_sheet("Store-wise", store_wise, "Store-wise: Sales, Payouts, Profitability, Orders, AOV (by Merchant Store ID)")
+    add_sheet("Day of week", day_of_week, "Day-of-week averages: Sales, Payouts, Profitability, Orders, AOV")
+    add_sheet("Slot-based", slot, "Slot-based: Sales, Payouts, Profitability, Orders, AOV")
     if day_slot is not None and not day_slot.empty:
-        ws4 = wb.create_sheet("Day-Slot")
-        add_sheet(ws4, day_slot, "Day-Slot: Day, Slot, Sales, Payouts, Profitability, Orders, AOV, uplift, Min.Subtotal, campaign recommendation")
+        add_sheet("Day-Slot", day_slot, "Day-Slot: Day, Slot, Sales, Payouts, Profitability, Orders, AOV, uplift, Min.Subtotal, campaign recommendation")
     if day_slot_per_store:
         for sheet_name, tbl in day_slot_per_store:
             if tbl is not None and not tbl.empty:
-                ws = wb.create_sheet(sheet_name[:31])
-                add_sheet(ws, tbl, f"Day-Slot: {sheet_name}")
+                add_sheet(sheet_name, tbl, f"Day-Slot: {sheet_name}")
 
     for sheet_name, pivot_df in (store_slot_pivots or []) + (day_slot_store_pivots or []):
         if pivot_df is not None and not pivot_df.empty:
-            ws = wb.create_sheet(sheet_name[:31])
-            add_sheet(ws, pivot_df, sheet_name)
+            add_sheet(sheet_name, pivot_df, sheet_name)
 
-    wb.save(filepath)
+    book.save()
     logger.info("AnalysisAgent: Wrote %s", filepath.name)
     return filepath
 
 
+@traced("financial.analysis")
 def run(
     zip_path: Path,
     output_dir: Path,
@@ -400,11 +416,17 @@ def run(
     excluded_dates: Optional[list] = None,
     operator_name: Optional[str] = None,
     write_file: bool = True,
+    stream: bool = False,
+    chunksize: Optional[int] = None,
+    use_cache: bool = True,
 ) -> Union[Optional[Path], Optional[List[Tuple[str, pd.DataFrame]]]]:
     """
     Load FINANCIAL_DETAILED_* from zip, build date-wise / day-of-week / slot-based tables.
     If write_file=True, writes financial_analysis_<timestamp>.xlsx and returns path.
     If write_file=False, returns list of (sheet_name, DataFrame) for combined report.
+    If stream=True, the report is read from the zip in chunks of `chunksize` rows (default STREAM_CHUNK_ROWS)
+    instead of being extracted and loaded whole, so memory stays bounded for multi-GB reports.
+    If use_cache=True (and pyarrow is installed), the parsed report is cached by the zip's SHA-256 (see report_cache).
     """
     if pd is None:
         raise RuntimeError("pandas is required for AnalysisAgent. Install with: pip install pandas")
@@ -417,41 +439,32 @@ def run(
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    extracted_csv = _extract_financial_detailed_csv(zip_path, output_dir)
-    if not extracted_csv or not extracted_csv.is_file():
-        logger.warning("AnalysisAgent: No FINANCIAL_DETAILED_* in zip")
+    # Single scan of the raw rows (or a cached copy of it); every table below re-aggregates the date x slot x store grain
+    loaded = _load_financial_rollup(zip_path, output_dir, stream, chunksize, use_cache)
+    if loaded is None:
         return None
-
-    df = pd.read_csv(extracted_csv)
-    date_col, time_col, subtotal_col, payout_col, order_col = _resolve_columns(df)
-    if not all([date_col, subtotal_col, payout_col]):
-        logger.warning("AnalysisAgent: Missing required columns (date, Subtotal, Net total)")
-        return None
-
-    store_col = _resolve_store_col(df)
-    date_wise = _build_date_wise(df, date_col, subtotal_col, payout_col, order_col or subtotal_col)
-    day_of_week = _build_day_of_week(df, date_col, subtotal_col, payout_col, order_col or subtotal_col)
-    slot_table = _build_slot_based(df, time_col, subtotal_col, payout_col, order_col) if time_col else pd.DataFrame()
-    day_slot_table = _build_day_slot(df, date_col, time_col, subtotal_col, payout_col, order_col) if time_col else pd.DataFrame()
+    rollup, meta = loaded
+    time_col, store_col = meta["has_time"], meta["has_store"]
+    date_wise = timed("financial.date_wise", _build_date_wise, rollup)
+    day_of_week = timed("financial.day_of_week", _build_day_of_week, date_wise)
+    slot_table = timed("financial.slot_based", _build_slot_based, rollup) if time_col else pd.DataFrame()
+    day_slot_table = timed("financial.day_slot", _build_day_slot, rollup) if time_col else pd.DataFrame()
     day_slot_per_store: List[Tuple[str, pd.DataFrame]] = []
     if store_col and time_col and not day_slot_table.empty:
-        for store_id in df[store_col].dropna().unique():
-            store_df = df[df[store_col] == store_id]
-            tbl = _build_day_slot(store_df, date_col, time_col, subtotal_col, payout_col, order_col)
-            if not tbl.empty:
-                tbl = _format_dollar_columns(tbl, [c for c in DOLLAR_COLS + ["uplift"] if c in tbl.columns])
-                sheet_name = f"Day-Slot - {store_id}"[:31]
-                day_slot_per_store.append((sheet_name, tbl))
-    store_metrics = _build_store_metrics(df, store_col, subtotal_col, payout_col, order_col) if store_col else pd.DataFrame()
+        for store_id, tbl in timed("financial.day_slot_per_store", _build_day_slot_per_store, rollup):
+            mark_currency(tbl, DOLLAR_COLS + ["uplift"])
+            sheet_name = f"Day-Slot - {store_id}"[:31]
+            day_slot_per_store.append((sheet_name, tbl))
+    store_metrics = timed("financial.store_metrics", _build_store_metrics, rollup) if store_col else pd.DataFrame()
     store_wise = store_metrics.copy()
-    campaign_recs = _build_campaign_recommendations(store_metrics) if not store_metrics.empty else pd.DataFrame()
+    campaign_recs = timed("financial.campaign_recommendations", _build_campaign_recommendations, store_metrics) if not store_metrics.empty else pd.DataFrame()
     if not campaign_recs.empty:
-        campaign_recs = _format_dollar_columns(campaign_recs, [c for c in ["AOV", "Min order (new cust) B", "Min order (all cust) C"] if c in campaign_recs.columns])
+        mark_currency(campaign_recs, ["AOV", "Min order (new cust) B", "Min order (all cust) C"])
 
     store_slot_pivots = []
     day_slot_store_pivots = []
     if store_col and time_col:
-        store_slot_agg = _build_store_slot_agg(df, store_col, time_col, subtotal_col, payout_col, order_col)
+        store_slot_agg = timed("financial.store_slot", _build_store_slot_agg, rollup)
         if not store_slot_agg.empty:
             for metric in ["AOV", "Profitability", "Sales", "Payouts", "Orders"]:
                 if metric in store_slot_agg.columns:
@@ -459,25 +472,22 @@ def run(
                     pt = pt.reindex(columns=[s for s in SLOT_ORDER if s in pt.columns])
                     pt = pt.reset_index()
                     if metric in DOLLAR_COLS:
-                        dollar_cols = [c for c in pt.columns if c != MERCHANT_STORE_ID_LABEL]
-                        pt = _format_dollar_columns(pt, dollar_cols)
+                        mark_currency(pt, [c for c in pt.columns if c != MERCHANT_STORE_ID_LABEL])
                     store_slot_pivots.append((f"Store-Slot {metric}", pt))
-        day_slot_store_agg = _build_day_slot_store_agg(df, date_col, time_col, store_col, subtotal_col, payout_col, order_col)
+        day_slot_store_agg = timed("financial.day_slot_store", _build_day_slot_store_agg, rollup)
         if not day_slot_store_agg.empty:
             for metric in ["AOV", "Profitability", "Sales", "Payouts", "Orders"]:
                 if metric in day_slot_store_agg.columns:
                     pt = day_slot_store_agg.pivot(index="Day-Slot", columns=MERCHANT_STORE_ID_LABEL, values=metric)
                     pt = pt.reset_index()
                     if metric in DOLLAR_COLS:
-                        dollar_cols = [c for c in pt.columns if c != "Day-Slot"]
-                        pt = _format_dollar_columns(pt, dollar_cols)
+                        mark_currency(pt, [c for c in pt.columns if c != "Day-Slot"])
                     day_slot_store_pivots.append((f"DaySlot-Store {metric}", pt))
 
-    date_wise = _format_dollar_columns(date_wise, [c for c in DOLLAR_COLS if c in date_wise.columns]) if not date_wise.empty else date_wise
-    store_wise = _format_dollar_columns(store_wise, [c for c in DOLLAR_COLS if c in store_wise.columns]) if not store_wise.empty else store_wise
-    day_of_week = _format_dollar_columns(day_of_week, [c for c in DOLLAR_COLS if c in day_of_week.columns]) if not day_of_week.empty else day_of_week
-    slot_table = _format_dollar_columns(slot_table, [c for c in DOLLAR_COLS if c in slot_table.columns]) if not slot_table.empty else slot_table
-    day_slot_table = _format_dollar_columns(day_slot_table, [c for c in DOLLAR_COLS + ["uplift"] if c in day_slot_table.columns]) if not day_slot_table.empty else day_slot_table
+    # Values stay numeric; writers format these columns as $X.XX
+    for tbl in (date_wise, store_wise, day_of_week, slot_table):
+        mark_currency(tbl, DOLLAR_COLS)
+    mark_currency(day_slot_table, DOLLAR_COLS + ["uplift"])
 
     sheets_list: List[Tuple[str, pd.DataFrame]] = [
         ("Date-wise", date_wise),
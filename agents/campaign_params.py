@@ -7,14 +7,17 @@ Reads "Day-Slot - {storeID}" sheets to get:
 
 Provides both single-params (first row) and all combos for looping campaigns.
 
-Also writes campaigns_executed.csv in the run directory to log each campaign setup.
+Also writes campaigns_executed.csv in the run directory to log each campaign setup, and reads those logs back
+(this run's and the account's earlier runs') as a ledger of completed campaigns, so none is created twice.
 """
 
 import csv
 import logging
+import os
 import re
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set, Tuple
 
 # CSV filename and columns for campaign execution log (in run_dir, e.g. downloads/email-timestamp/)
 CAMPAIGNS_EXECUTED_CSV = "campaigns_executed.csv"
@@ -25,7 +28,16 @@ CAMPAIGNS_EXECUTED_COLUMNS = [
     "Min.Subtotal value",
     "Maximum discount value",
     "Status",
+    "Cells",
+    "Executed At",
 ]
+# Incentive every campaign is created with (see doordash_agent.get_task_description_campaign_for_combo)
+CAMPAIGN_PCT_VALUE = 15
+CAMPAIGN_MAX_DISCOUNT = "Always lowest"
+# Earlier runs of the account whose campaigns_executed.csv counts as already done (CAMPAIGN_LEDGER_DAYS)
+DEFAULT_LEDGER_DAYS = 30
+# Run directories are named {account}-{YYYYMMDD_HHMMSS} (main._run_dir_for_email)
+RUN_DIR_SUFFIX_RE = re.compile(r"-(\d{8}_\d{6})$")
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +52,24 @@ DAY_SLOT_SHEET_PREFIX = "Day-Slot - "
 DAY_SLOT_SHEET_PATTERN = re.compile(r"Day-Slot\s*-\s*(.+)", re.IGNORECASE)
 
 
+def _parse_min_subtotal(value, default: float = 20.0) -> float:
+    """
+    Min.Subtotal cell as a float. Reports store it as a number; workbooks written before numbers were
+    kept numeric have text like "$20.00". Missing, unparseable or non-positive values give `default`.
+    """
+    try:
+        if pd.isna(value):
+            return default
+        if isinstance(value, (int, float)):
+            parsed = float(value)
+        else:
+            s = str(value).strip().replace("$", "").replace(",", "")
+            parsed = float(s) if s else default
+    except (ValueError, TypeError):
+        return default
+    return parsed if parsed > 0 else default
+
+
 def get_campaign_params_from_combined_analysis(combined_xlsx_path: Path) -> Optional[dict]:
     """
     Read the first Day-Slot - {storeID} sheet from combined_analysis_*.xlsx.
@@ -114,22 +144,8 @@ def get_campaign_params_from_combined_analysis(combined_xlsx_path: Path) -> Opti
     row = data.iloc[0]
     day = str(row["Day"]).strip()
     slot = str(row["Slot"]).strip()
-    min_val = row["Min.Subtotal"]
-
-    # Parse Min.Subtotal: may be number or string like "$20.00"
-    try:
-        if pd.isna(min_val):
-            min_subtotal = 20.0
-        elif isinstance(min_val, (int, float)):
-            min_subtotal = float(min_val)
-        else:
-            s = str(min_val).strip().replace("$", "").replace(",", "")
-            min_subtotal = float(s) if s else 20.0
-    except (ValueError, TypeError):
-        min_subtotal = 20.0
 
-    if min_subtotal <= 0:
-        min_subtotal = 20.0
+    min_subtotal = _parse_min_subtotal(row["Min.Subtotal"])
 
     # Campaign name: e.g. TODC-14351-Wednesday-Lunch
     campaign_name = f"TODC-{store_id}-{day}-{slot}"
@@ -199,19 +215,7 @@ def get_all_campaign_combos_from_combined_analysis(combined_xlsx_path: Path) ->
         for _, row in data.iterrows():
             day = str(row["Day"]).strip()
             slot = str(row["Slot"]).strip()
-            min_val = row["Min.Subtotal"]
-            try:
-                if pd.isna(min_val):
-                    min_subtotal = 20.0
-                elif isinstance(min_val, (int, float)):
-                    min_subtotal = float(min_val)
-                else:
-                    s = str(min_val).strip().replace("$", "").replace(",", "")
-                    min_subtotal = float(s) if s else 20.0
-            except (ValueError, TypeError):
-                min_subtotal = 20.0
-            if min_subtotal <= 0:
-                min_subtotal = 20.0
+            min_subtotal = _parse_min_subtotal(row["Min.Subtotal"])
 
             campaign_name = f"TODC-{store_id}-{day}-{slot}"
             combos.append({
@@ -231,6 +235,20 @@ def get_campaigns_executed_path(run_dir: Path) -> Path:
     return Path(run_dir) / CAMPAIGNS_EXECUTED_CSV
 
 
+def _upgrade_campaigns_executed_csv(path: Path) -> None:
+    """Rewrite a campaigns_executed.csv written before the Cells / Executed At columns with the current header."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    if not rows or rows[0] == CAMPAIGNS_EXECUTED_COLUMNS:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CAMPAIGNS_EXECUTED_COLUMNS)
+        for row in rows[1:]:
+            w.writerow(row + [""] * (len(CAMPAIGNS_EXECUTED_COLUMNS) - len(row)))
+    logger.info("campaign_params: upgraded %s to the current columns", path)
+
+
 def ensure_campaigns_executed_csv(run_dir: Path) -> Path:
     """
     Create campaigns_executed.csv in run_dir with header if it does not exist.
@@ -243,28 +261,156 @@ def ensure_campaigns_executed_csv(run_dir: Path) -> Path:
             w = csv.writer(f)
             w.writerow(CAMPAIGNS_EXECUTED_COLUMNS)
         logger.info("campaign_params: created %s", path)
+    else:
+        _upgrade_campaigns_executed_csv(path)
     return path
 
 
+def format_cells(cells: Iterable[Tuple[str, str]]) -> str:
+    """[(day, slot), ...] as the Cells column: "Monday/Lunch; Friday/Dinner"."""
+    return "; ".join(f"{day}/{slot}" for day, slot in cells)
+
+
+def combo_cells(combo: dict) -> List[Tuple[str, str]]:
+    """The (day, slot) schedule cells of a combo or of a consolidated campaign (campaign_planner)."""
+    cells = combo.get("cells") or [(combo.get("day", ""), combo.get("slot", ""))]
+    return [(str(day).strip(), str(slot).strip()) for day, slot in cells]
+
+
 def log_campaign_executed(
     run_dir: Path,
     store_id: str,
     campaign_name: str,
-    pct_value: int = 15,
+    pct_value: int = CAMPAIGN_PCT_VALUE,
     min_subtotal: float = 10,
-    max_discount: str = "Always lowest",
+    max_discount: str = CAMPAIGN_MAX_DISCOUNT,
     status: str = "Completed",
+    cells: Optional[Iterable[Tuple[str, str]]] = None,
 ) -> None:
     """
     Append one row to campaigns_executed.csv in run_dir.
     Call after each campaign is executed (or with status="Failed" on error).
+    store_id: one store ID, or several separated by spaces; cells: its schedule as [(day, slot), ...].
     """
     path = get_campaigns_executed_path(run_dir)
     path.parent.mkdir(parents=True, exist_ok=True)
     file_exists = path.exists()
+    if file_exists:
+        _upgrade_campaigns_executed_csv(path)
     with open(path, "a", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         if not file_exists:
             w.writerow(CAMPAIGNS_EXECUTED_COLUMNS)
-        w.writerow([store_id, campaign_name, pct_value, min_subtotal, max_discount, status])
+        w.writerow([
+            store_id, campaign_name, pct_value, min_subtotal, max_discount, status,
+            format_cells(cells or []), datetime.now().isoformat(timespec="seconds"),
+        ])
     logger.debug("campaign_params: logged campaign %s -> %s", campaign_name, path)
+
+
+def account_run_dirs(run_dir: Path, days: Optional[int] = None) -> List[Path]:
+    """
+    run_dir and the account's other run directories (siblings named like it, {account}-{timestamp}) started
+    at most `days` days (default CAMPAIGN_LEDGER_DAYS, DEFAULT_LEDGER_DAYS) before it; oldest first.
+    """
+    run_dir = Path(run_dir)
+    match = RUN_DIR_SUFFIX_RE.search(run_dir.name)
+    if not match or not run_dir.parent.is_dir():
+        return [run_dir]
+    if days is None:
+        try:
+            days = int(os.getenv("CAMPAIGN_LEDGER_DAYS", "") or DEFAULT_LEDGER_DAYS)
+        except ValueError:
+            days = DEFAULT_LEDGER_DAYS
+    prefix = run_dir.name[:match.start()]
+    started = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
+    dirs = []
+    for path in run_dir.parent.iterdir():
+        m = RUN_DIR_SUFFIX_RE.search(path.name)
+        if not m or path.name[:m.start()] != prefix or not path.is_dir() or path == run_dir:
+            continue
+        when = datetime.strptime(m.group(1), "%Y%m%d_%H%M%S")
+        if started - timedelta(days=days) <= when <= started:
+            dirs.append(path)
+    return sorted(dirs) + [run_dir]
+
+
+LedgerKey = Tuple[str, str, str, int, int, str]
+
+
+def _ledger_key(store_id, day, slot, pct_value, min_subtotal, max_discount) -> Optional[LedgerKey]:
+    try:
+        # Min.Subtotal is entered in whole dollars (see campaign_planner)
+        return (
+            str(store_id).strip(), str(day).strip(), str(slot).strip(), int(float(pct_value)),
+            int(round(float(min_subtotal))), str(max_discount).strip().lower(),
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def _row_cells(row: dict) -> List[Tuple[str, str]]:
+    cells = [c.split("/", 1) for c in (row.get("Cells") or "").split(";") if "/" in c]
+    if cells:
+        return [(day.strip(), slot.strip()) for day, slot in cells]
+    # Rows logged before the Cells column: TODC-{store}-{Day}-{Slot}
+    parts = (row.get("Campaign Name") or "").rsplit("-", 2)
+    return [(parts[1], parts[2])] if len(parts) == 3 else []
+
+
+def load_campaign_ledger(run_dirs: Iterable[Path]) -> Set[LedgerKey]:
+    """
+    Index of the completed campaigns in the campaigns_executed.csv of run_dirs (e.g. account_run_dirs):
+    one (store, day, slot, %value, Min.Subtotal, maximum discount) key per store and schedule cell.
+    """
+    completed: Set[LedgerKey] = set()
+    for run_dir in run_dirs:
+        path = get_campaigns_executed_path(run_dir)
+        if not path.is_file():
+            continue
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        except (OSError, csv.Error) as e:
+            logger.warning("campaign_params: could not read %s: %s", path, e)
+            continue
+        for row in rows:
+            if (row.get("Status") or "").strip() != "Completed":
+                continue
+            for store_id in (row.get("StoreID") or "").split():
+                for day, slot in _row_cells(row):
+                    key = _ledger_key(
+                        store_id, day, slot, row.get("%value"), row.get("Min.Subtotal value"),
+                        row.get("Maximum discount value"),
+                    )
+                    if key:
+                        completed.add(key)
+    return completed
+
+
+def campaign_in_ledger(
+    ledger: Set[LedgerKey],
+    combo: dict,
+    pct_value: int = CAMPAIGN_PCT_VALUE,
+    max_discount: str = CAMPAIGN_MAX_DISCOUNT,
+) -> bool:
+    """True if every store and cell of combo was already created with the same incentive."""
+    keys = [
+        _ledger_key(store_id, day, slot, pct_value, combo.get("min_subtotal", 10), max_discount)
+        for store_id in (combo.get("store_ids") or [combo.get("store_id", "")])
+        for day, slot in combo_cells(combo)
+    ]
+    return bool(keys) and all(key in ledger for key in keys)
+
+
+def count_campaigns_executed(run_dir: Path) -> dict:
+    """Status -> number of rows in run_dir's campaigns_executed.csv (empty if there is none)."""
+    path = get_campaigns_executed_path(run_dir)
+    counts: dict = {}
+    if not path.is_file():
+        return counts
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            status = (row.get("Status") or "").strip() or "Unknown"
+            counts[status] = counts.get(status, 0) + 1
+    return counts
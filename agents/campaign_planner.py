@@ -0,0 +1,156 @@
+"""
+Campaign consolidation planner: groups the per-cell combos from campaign_params (one campaign per
+store x day x slot) into the fewest campaigns with the same incentive, since one promotion's schedule grid
+takes several day-slot cells and its store picker several stores.
+
+Combos are grouped by Min.Subtotal in whole dollars, as entered in the portal (the only incentive value that
+differs; the % off and maximum discount are the same for every campaign). Modes (CAMPAIGN_CONSOLIDATION):
+  - off: one campaign per combo, as listed in the Day-Slot sheets.
+  - store (default): one campaign per store and Min.Subtotal, with all of its cells in the schedule.
+  - stores: campaigns may also cover several stores (every store in a campaign gets the same cells); the
+    plan with fewer campaigns of "cells grouped by store" and "stores grouped by cells" is used.
+CAMPAIGN_MAX_CELLS and CAMPAIGN_MAX_STORES cap one campaign's schedule cells and stores; larger groups are
+split into numbered parts.
+
+A planned campaign is a combo dict (store_id, min_subtotal, campaign_name) with the lists store_ids and
+cells [(day, slot), ...] and combos (the campaign names it replaces). A group of one combo is kept as that
+combo, name included. Plans are deterministic, so a retry resumes the same campaigns (see run_checkpoint).
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from agents.time_slots import SLOT_ORDER, WEEKDAY_ORDER
+
+logger = logging.getLogger(__name__)
+
+CONSOLIDATION_MODES = ("off", "store", "stores")
+DEFAULT_CONSOLIDATION = "store"
+# Schedule cells / stores per campaign; a long checklist is where the browser agent makes mistakes
+DEFAULT_MAX_CELLS = 12
+DEFAULT_MAX_STORES = 10
+
+Cell = Tuple[str, str]
+
+
+def _cell_sort_key(cell: Cell) -> Tuple[int, int, str]:
+    day, slot = cell
+    day_idx = WEEKDAY_ORDER.index(day) if day in WEEKDAY_ORDER else len(WEEKDAY_ORDER)
+    slot_idx = SLOT_ORDER.index(slot) if slot in SLOT_ORDER else len(SLOT_ORDER)
+    return day_idx, slot_idx, f"{day}|{slot}"
+
+
+def _chunks(items: list, size: int) -> List[list]:
+    if size <= 0:
+        return [items]
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _incentive_amount(value) -> int:
+    """Min.Subtotal as entered in the portal (whole dollars; see get_task_description_campaign_for_combo)."""
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return 10
+
+
+def _campaign(stores: List[str], cells: List[Cell], min_subtotal: int, name: str, members: Dict) -> dict:
+    combos = [members[(store, cell)]["campaign_name"] for store in stores for cell in cells]
+    if len(combos) == 1:
+        return dict(members[(stores[0], cells[0])])
+    return {
+        "store_id": " ".join(stores),
+        "store_ids": list(stores),
+        "day": cells[0][0],
+        "slot": cells[0][1],
+        "cells": list(cells),
+        "min_subtotal": min_subtotal,
+        "campaign_name": name,
+        "combos": combos,
+    }
+
+
+def _by_store(groups: Dict[str, List[Cell]], min_subtotal: int, max_cells: int, members: Dict) -> List[dict]:
+    """One campaign per store (cells split into parts of max_cells)."""
+    out = []
+    for store in sorted(groups):
+        parts = _chunks(sorted(groups[store], key=_cell_sort_key), max_cells)
+        for i, cells in enumerate(parts, 1):
+            name = f"TODC-{store}-Min{min_subtotal}" + (f"-{i}" if len(parts) > 1 else "")
+            out.append(_campaign([store], cells, min_subtotal, name, members))
+    return out
+
+
+def _by_cells(
+    groups: Dict[str, List[Cell]], min_subtotal: int, max_cells: int, max_stores: int, members: Dict
+) -> List[dict]:
+    """Cells grouped by the exact set of stores that have them; one campaign per (store set, cells) part."""
+    stores_by_cell: Dict[Cell, List[str]] = {}
+    for store in sorted(groups):
+        for cell in groups[store]:
+            stores_by_cell.setdefault(cell, []).append(store)
+    cells_by_stores: Dict[Tuple[str, ...], List[Cell]] = {}
+    for cell in sorted(stores_by_cell, key=_cell_sort_key):
+        cells_by_stores.setdefault(tuple(stores_by_cell[cell]), []).append(cell)
+    out = []
+    n = 0
+    for stores in sorted(cells_by_stores, key=lambda s: (-len(s), s)):
+        for store_part in _chunks(list(stores), max_stores):
+            for cells in _chunks(cells_by_stores[stores], max_cells):
+                n += 1
+                out.append(_campaign(store_part, cells, min_subtotal, f"TODC-Min{min_subtotal}-{n}", members))
+    return out
+
+
+def plan_campaigns(
+    combos: List[dict],
+    mode: Optional[str] = None,
+    max_cells: Optional[int] = None,
+    max_stores: Optional[int] = None,
+) -> List[dict]:
+    """
+    Consolidate combos (from get_all_campaign_combos_from_combined_analysis) into campaigns.
+    mode / max_cells / max_stores default to CAMPAIGN_CONSOLIDATION / CAMPAIGN_MAX_CELLS / CAMPAIGN_MAX_STORES
+    (0 = no cap). Returns campaigns ordered by Min.Subtotal, then store.
+    """
+    mode = (mode or os.getenv("CAMPAIGN_CONSOLIDATION", "") or DEFAULT_CONSOLIDATION).strip().lower()
+    if mode not in CONSOLIDATION_MODES:
+        logger.warning("campaign_planner: unknown CAMPAIGN_CONSOLIDATION=%s; using %s", mode, DEFAULT_CONSOLIDATION)
+        mode = DEFAULT_CONSOLIDATION
+    if mode == "off" or not combos:
+        return list(combos)
+    max_cells = _env_int("CAMPAIGN_MAX_CELLS", DEFAULT_MAX_CELLS) if max_cells is None else max_cells
+    max_stores = _env_int("CAMPAIGN_MAX_STORES", DEFAULT_MAX_STORES) if max_stores is None else max_stores
+
+    # min_subtotal -> store -> cells; (store, cell) -> combo (a repeated cell keeps its first combo)
+    groups: Dict[int, Dict[str, List[Cell]]] = {}
+    members: Dict[Tuple[str, Cell], dict] = {}
+    for combo in combos:
+        store = str(combo.get("store_id", "")).strip()
+        cell = (str(combo.get("day", "")).strip(), str(combo.get("slot", "")).strip())
+        if (store, cell) in members:
+            continue
+        members[(store, cell)] = combo
+        groups.setdefault(_incentive_amount(combo.get("min_subtotal", 10)), {}).setdefault(store, []).append(cell)
+
+    campaigns: List[dict] = []
+    for min_subtotal in sorted(groups):
+        by_store = _by_store(groups[min_subtotal], min_subtotal, max_cells, members)
+        if mode == "stores" and max_stores != 1:
+            by_cells = _by_cells(groups[min_subtotal], min_subtotal, max_cells, max_stores, members)
+            if len(by_cells) < len(by_store):
+                by_store = by_cells
+        campaigns.extend(by_store)
+    logger.info(
+        "campaign_planner: %s combos -> %s campaigns (%s, max %s cells, max %s stores per campaign)",
+        len(combos), len(campaigns), mode, max_cells or "no", max_stores if mode == "stores" else 1,
+    )
+    return campaigns
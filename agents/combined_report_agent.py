@@ -15,9 +15,12 @@ try:
 except ImportError:
     pd = None
 
+from agents.excel_writer import ReportWorkbook
+from agents.tracing import annotate, file_size, traced
+
 
 def _copy_sheet_from_book(src_wb, sheet_name, dest_wb, new_name=None):
-    """Copy a sheet from src_wb to dest_wb (values only)."""
+    """Copy a sheet from src_wb to dest_wb (values and number formats, e.g. currency)."""
     try:
         import openpyxl
     except ImportError:
@@ -34,9 +37,12 @@ def _copy_sheet_from_book(src_wb, sheet_name, dest_wb, new_name=None):
     dest_ws = dest_wb.create_sheet(name)
     for row in src_ws.iter_rows():
         for cell in row:
-            dest_ws.cell(row=cell.row, column=cell.column, value=cell.value)
+            dest = dest_ws.cell(row=cell.row, column=cell.column, value=cell.value)
+            if cell.number_format != "General":
+                dest.number_format = cell.number_format
 
 
+@traced("combined.workbook")
 def write_combined_report(
     financial_xlsx_path: Optional[Path] = None,
     marketing_xlsx_path: Optional[Path] = None,
@@ -89,34 +95,17 @@ def write_combined_report(
 
     wb_out.remove(default_sheet)
     wb_out.save(out_path)
+    annotate(engine="openpyxl", sheets=sheet_count, bytes=file_size(out_path))
     logger.info("CombinedReportAgent: Wrote %s (%s sheets)", out_path.name, sheet_count)
     return out_path
 
 
-def _add_sheet_from_df(wb, sheet_name: str, df, title: str = None):
-    """Add a sheet to openpyxl workbook from a pandas DataFrame."""
-    from openpyxl.styles import Font
-    from openpyxl.utils.dataframe import dataframe_to_rows
-    name = (sheet_name or "Sheet")[:31]
-    if name in wb.sheetnames:
-        base, n = name, 1
-        while f"{base}_{n}"[:31] in wb.sheetnames:
-            n += 1
-        name = f"{base}_{n}"[:31]
-    ws = wb.create_sheet(name)
-    if title:
-        ws.cell(row=1, column=1, value=title).font = Font(bold=True, size=12)
-        start_row = 3
-    else:
-        start_row = 1
-    if df is not None and not (getattr(df, "empty", True)):
-        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), start=start_row):
-            for c_idx, value in enumerate(row, start=1):
-                cell = ws.cell(row=r_idx, column=c_idx, value=value)
-                if r_idx == start_row:
-                    cell.font = Font(bold=True)
+def _add_sheet_from_df(book, sheet_name: str, df, title: str = None) -> str:
+    """Add a sheet to a ReportWorkbook from a pandas DataFrame (title in row 1, header in row 3). Returns the sheet name."""
+    return book.add_sheet(sheet_name or "Sheet", df, title)
 
 
+@traced("combined.workbook")
 def write_combined_from_sheets(
     financial_sheets: Optional[List[Tuple[str, object]]] = None,
     marketing_sheets: Optional[List[Tuple[str, object]]] = None,
@@ -127,11 +116,6 @@ def write_combined_from_sheets(
     Build one workbook from list of (sheet_name, DataFrame) for financial and marketing.
     Saves to output_dir/combined_analysis_{timestamp}.xlsx. Returns path or None.
     """
-    try:
-        import openpyxl
-    except ImportError:
-        logger.warning("openpyxl required for combined report")
-        return None
     financial_sheets = financial_sheets or []
     marketing_sheets = marketing_sheets or []
     if not financial_sheets and not marketing_sheets:
@@ -144,25 +128,26 @@ def write_combined_from_sheets(
         output_filename = f"combined_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     out_path = output_dir / output_filename
 
-    wb = openpyxl.Workbook()
-    default_sheet = wb.active
+    financial_sheets = [(n, df) for n, df in financial_sheets if df is not None and not getattr(df, "empty", True)]
+    marketing_sheets = [(n, df) for n, df in marketing_sheets if df is not None and not getattr(df, "empty", True)]
+    if not financial_sheets and not marketing_sheets:
+        return None
+    try:
+        book = ReportWorkbook(out_path)
+    except RuntimeError as e:
+        logger.warning("CombinedReportAgent: %s", e)
+        return None
     sheet_count = 0
     for name, df in financial_sheets:
-        if df is not None and not (getattr(df, "empty", True)):
-            _add_sheet_from_df(wb, name, df, name)
-            sheet_count += 1
+        _add_sheet_from_df(book, name, df, name)
+        sheet_count += 1
     for name, df in marketing_sheets:
-        if df is not None and not (getattr(df, "empty", True)):
-            safe = name[:31]
-            if safe in wb.sheetnames:
-                safe = f"Marketing-{name}"[:31]
-            _add_sheet_from_df(wb, safe, df, name)
-            sheet_count += 1
-    if sheet_count == 0:
-        wb.close()
-        return None
-    wb.remove(default_sheet)
-    wb.save(out_path)
+        safe = name[:31]
+        if safe in book.sheet_names:
+            safe = f"Marketing-{name}"[:31]
+        _add_sheet_from_df(book, safe, df, name)
+        sheet_count += 1
+    book.save()
     logger.info("CombinedReportAgent: Wrote %s (%s sheets)", out_path.name, sheet_count)
     return out_path
 
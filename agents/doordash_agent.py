@@ -7,11 +7,44 @@ Returns paths to downloaded report file(s) for use by analysis_agent and marketi
 import asyncio
 import logging
 import os
+import time
 from pathlib import Path
 from typing import Awaitable, Callable, Optional, Tuple
 
+from agents.action_replay import REPLAY_DIR_NAME, ActionReplay
+from agents.campaign_planner import plan_campaigns
+from agents.download_watcher import GENERATED_FILE_PREFIXES, DownloadWatcher
+from agents.portal_actions import (
+    date_range_step,
+    incentive_hint,
+    login_hint,
+    portal_agent_kwargs,
+    portal_session_valid,
+    schedule_hint,
+)
+from agents.report_partitions import REPORTS, ReportPartitionStore
+from agents.run_checkpoint import RunCheckpoint
+from agents.tracing import file_size, span
+
 logger = logging.getLogger(__name__)
 
+# Seconds to wait after the reports task for downloads the watcher has not seen finish yet
+DOWNLOAD_WAIT_SEC = 30
+# Campaign workers (browsers sharing the logged-in session) per account; 1 = one chained agent (CAMPAIGN_WORKERS)
+DEFAULT_CAMPAIGN_WORKERS = 1
+# Page a campaign worker's browser opens first (its session cookies come from the logged-in browser)
+MERCHANT_PORTAL_URL = "https://merchant-portal.doordash.com/merchant/"
+# Logged-in session (cookies, local storage) exported for the campaign workers, in the run directory
+STORAGE_STATE_FILE = ".storage_state.json"
+# Chrome with remote debugging (scripts/start_chrome_debug.sh) that USE_LOCAL_BROWSER=true attaches to (CHROME_CDP_URL)
+DEFAULT_CDP_URL = "http://localhost:9222"
+# Tasks one agent runs (add_new_task) before a fresh agent takes over in the same browser: a chained agent sends
+# its whole conversation with every step, so prompts grow with each campaign (CAMPAIGN_CHAIN_TASKS, 0 = no limit)
+DEFAULT_CAMPAIGN_CHAIN_TASKS = 10
+
+# id() of the browsers _get_browser attached to over CDP (closing them only disconnects)
+_attached_browsers: set = set()
+
 
 def get_task_description(
     email: str,
@@ -105,29 +138,40 @@ def get_task_description_reports_only(
     password: str,
     start_date: str,
     end_date: str,
+    logged_in: bool = False,
 ) -> str:
-    """Task that ends after downloading both reports (no campaign). Used so we can run analysis before campaign."""
+    """
+    Task that ends after downloading both reports (no campaign). Used so we can run analysis before campaign.
+    logged_in: the browser's profile still has a valid session and the browser is on the Reports page, so the
+    login steps are skipped (kept only as a fallback).
+    """
     if not password:
         raise ValueError("DOORDASH_PASSWORD is not set. Add it to your .env file (see .env.example).")
-    return f"""
-You are automating the DoorDash Merchant Portal. Complete the following steps in order. Stop after downloading both reports — do NOT create a campaign.
-
-=== STEP 0: Navigate and log in (DO THIS EXACT ORDER — two-step login) ===
-The login has TWO steps. Do NOT enter the password in the email field. Do NOT click "Log In" until the password screen is visible.
+    if logged_in:
+        login = f"""=== STEP 0: Already logged in ===
+The browser is already logged in and shows the Reports page. Do NOT go to the login page; start from the current page with step 6.
+1-5. Only if a login form is shown after all: enter ONLY the email {email}, click "Continue to Log In", enter ONLY the password {password} on the next screen, click "Log In" and wait for the dashboard."""
+    else:
+        login = f"""=== STEP 0: Navigate and log in (DO THIS EXACT ORDER — two-step login) ===
+{login_hint(email, password)}The login has TWO steps. Do NOT enter the password in the email field. Do NOT click "Log In" until the password screen is visible.
 
 1. Go to exactly this URL: https://merchant-portal.doordash.com/merchant/login
 2. On the first screen: find the EMAIL input field (labeled "Email"). Enter ONLY the email, exactly: {email}
 3. Click the "Continue to Log In" button (the red button). Wait for the page to change.
 4. On the NEXT screen: find the PASSWORD input field. Enter ONLY the password there: {password}
-5. Click the "Log In" button. Wait until the dashboard has loaded.
+5. Click the "Log In" button. Wait until the dashboard has loaded."""
+    return f"""
+You are automating the DoorDash Merchant Portal. Complete the following steps in order. Stop after downloading both reports — do NOT create a campaign.
+
+{login}
 
 === STEP 1: Generate Financial Report ===
 6. In the LEFT SIDEBAR, click "Reports". Click "Create report". Select "Financial report" RADIO BUTTON, click "Next".
-7. Choose "By date range". Set Start date: {start_date}, End date: {end_date}. Click "Create report". Wait for the report to appear in the list.
+7. {date_range_step(start_date, end_date)} Click "Create report". Wait for the report to appear in the list.
 
 === STEP 2: Generate Marketing Report ===
 8. Click "Create report". Select "Marketing report" RADIO BUTTON, click "Next". UNCHECK "Online Ordering", leave "Marketplace" CHECKED.
-9. By date range: Start {start_date}, End {end_date}. Click "Create report". Wait for it to appear.
+9. {date_range_step(start_date, end_date)} Click "Create report". Wait for it to appear.
 
 === STEP 3: Download the Financial Report ===
 10. Find the recently created "Financials" (or "Financial") report. Click the DOWNLOAD icon next to it. Wait for the download to complete.
@@ -140,6 +184,23 @@ When both reports are downloaded, use the done action to finish. Summarize: logi
 """
 
 
+def get_task_description_login_only(email: str, password: str) -> str:
+    """Task that only logs in. Used when a retry resumes at the campaign phase (reports already downloaded)."""
+    if not password:
+        raise ValueError("DOORDASH_PASSWORD is not set. Add it to your .env file (see .env.example).")
+    return f"""
+You are automating the DoorDash Merchant Portal. Only log in — do NOT create or download reports and do NOT create a campaign.
+
+=== Log in (two-step login) ===
+{login_hint(email, password)}1. Go to: https://merchant-portal.doordash.com/merchant/login
+2. Enter ONLY the email in the Email field: {email}. Click "Continue to Log In". Wait for the next screen.
+3. Enter ONLY the password in the Password field: {password}. Click "Log In". Wait for the dashboard.
+
+=== DONE ===
+When the dashboard has loaded, use the done action to finish. Summarize: logged in.
+"""
+
+
 def get_task_description_campaign_only(
     email: str,
     password: str,
@@ -209,11 +270,12 @@ When the campaign is created, use the done action to finish. Summarize: campaign
 """
 
 
-def get_task_description_campaign_for_combo(combo: dict) -> str:
+def get_task_description_campaign_for_combo(combo: dict, start_url: Optional[str] = None) -> str:
     """
     Build campaign task for one (store_id, day, slot, min_subtotal, campaign_name) from combined_analysis.
     For use when already logged in (same browser session). Combo dict has keys:
     store_id, day, slot, min_subtotal, campaign_name (e.g. TODC-{StoreID}-Monday-Breakfast).
+    start_url: page to open first (a fresh browser that carries the logged-in session's cookies).
     """
     store_id = str(combo.get("store_id", "")).strip()
     day = str(combo.get("day", "")).strip()
@@ -224,24 +286,52 @@ def get_task_description_campaign_for_combo(combo: dict) -> str:
     except (TypeError, ValueError):
         min_subtotal = 10
     campaign_name = str(combo.get("campaign_name", f"TODC-{store_id}-{day}-{slot}")).strip()
+    store_ids = [str(s).strip() for s in combo.get("store_ids") or [store_id]]
+    cells = [(str(d).strip(), str(s).strip()) for d, s in combo.get("cells") or [(day, slot)]]
 
     # Day short form for UI (e.g. Monday -> Mon, Tuesday -> Tue)
-    day_short = day[:3] if len(day) >= 3 else day
+    def short(d: str) -> str:
+        return d[:3] if len(d) >= 3 else d
+
+    day_short = short(day)
+
+    if len(store_ids) == 1:
+        scope = "exactly one store"
+        stores_step = f"""In the search bar type: {store_id}. Select the store that contains "{store_id}" (e.g. McDonald's ({store_id} - ...)). Click "Save"."""
+    else:
+        scope = f"exactly these {len(store_ids)} stores"
+        stores_step = (
+            "For EACH of these store IDs in turn: "
+            + ", ".join(store_ids)
+            + " — type the ID in the search bar and select the store that contains it (e.g. McDonald's (ID - ...)); "
+            + f"keep the earlier selections. Check that exactly {len(store_ids)} stores are selected, then click \"Save\"."
+        )
+    if len(cells) == 1:
+        scope += ", one day, one slot"
+        cells_step = f"""Then select ONLY the single combination: Day = {day} ({day_short}) and Slot = {slot}. In the grid, check only the cell where column {day_short} meets row {slot}."""
+    else:
+        scope += f", {len(cells)} day-slot cells"
+        listed = "; ".join(f"{short(d)} + {sl}" for d, sl in cells)
+        cells_step = (
+            f"Then select ONLY these {len(cells)} combinations (column = day, row = slot): {listed}. "
+            f"In the grid, check exactly those {len(cells)} cells and no others."
+        )
 
+    start = f"Go to exactly this URL first: {start_url}" if start_url else "Start from the current page."
     return f"""
-You are already logged in to the DoorDash Merchant Portal. Do NOT go to login. Start from the current page.
+You are already logged in to the DoorDash Merchant Portal. Do NOT go to login. {start}
 
-Create this campaign (exactly one store, one day, one slot):
+Create this campaign ({scope}):
 
 1. In the LEFT SIDEBAR, click "Marketing", then "Run a campaign". Click "Discount for all customers".
 
-2. Edit Stores: click EDIT (pencil) next to "Stores". In the search bar type: {store_id}. Select the store that contains "{store_id}" (e.g. McDonald's ({store_id} - ...)). Click "Save".
+2. Edit Stores: click EDIT (pencil) next to "Stores". {stores_step}
 
-3. Edit Customer incentive: click EDIT (pencil). Select the "%" (percentage) option. Type 15 in the percentage field. Under "Minimum subtotal", choose "Custom" and enter {min_subtotal} in the dollar amount field. For "Maximum discount amount", select the leftmost option ("Always lowest" or similar). Click "Save".
+3. Edit Customer incentive: click EDIT (pencil).{incentive_hint(15, min_subtotal)} Select the "%" (percentage) option. Type 15 in the percentage field. Under "Minimum subtotal", choose "Custom" and enter {min_subtotal} in the dollar amount field. For "Maximum discount amount", select the leftmost option ("Always lowest" or similar). Click "Save".
 
 4. Edit Scheduling: click EDIT (pencil). Choose "Set a custom schedule". In the modal:
-   - Click the "Weekdays" button to deselect all weekday slots. Click the "Weekends" button to deselect all weekend slots.
-   - Then select ONLY the single combination: Day = {day} ({day_short}) and Slot = {slot}. In the grid, check only the cell where column {day_short} meets row {slot}.
+{schedule_hint(cells)}   - Click the "Weekdays" button to deselect all weekday slots. Click the "Weekends" button to deselect all weekend slots.
+   - {cells_step}
    - Click "Save". Wait 2 seconds.
 
 5. Edit Campaign name: click EDIT (pencil) next to "Campaign name". Delete the default text and type exactly: {campaign_name}. Wait 2 seconds. Click "Save".
@@ -267,16 +357,44 @@ def _get_llm():
     return ChatBrowserUse()
 
 
-def _get_browser(download_dir: Path, keep_alive: bool = False):
-    """Browser with download path set to the given directory. keep_alive=True keeps browser open for reuse."""
+def use_local_browser() -> bool:
+    """USE_LOCAL_BROWSER=true: attach to an already running Chrome instead of launching one (see _get_browser)."""
+    return os.getenv("USE_LOCAL_BROWSER", "").strip().lower() in ("1", "true", "yes")
+
+
+def _get_browser(
+    download_dir: Path,
+    keep_alive: bool = False,
+    user_data_dir: Optional[Path] = None,
+    storage_state: Optional[Path] = None,
+    attach: bool = True,
+):
+    """
+    Browser with download path set to the given directory. keep_alive=True keeps browser open for reuse.
+    user_data_dir gives the browser its own profile directory (needed when several browsers run at once).
+    storage_state: cookies / local storage file (see _export_storage_state) the browser starts with.
+    attach: with USE_LOCAL_BROWSER=true, connect over CDP to the Chrome already running at CHROME_CDP_URL
+    (scripts/start_chrome_debug.sh) instead of launching one; that Chrome's own profile and session are used
+    (user_data_dir and storage_state do not apply) and _close_browser only disconnects from it.
+    """
     from browser_use import Browser
 
     downloads_path = str(download_dir.resolve())
+    if attach and use_local_browser():
+        cdp_url = os.getenv("CHROME_CDP_URL", "").strip() or DEFAULT_CDP_URL
+        logger.info("DoorDash (browser-use): Attaching to the running Chrome at %s.", cdp_url)
+        browser = Browser(cdp_url=cdp_url, downloads_path=downloads_path, keep_alive=True)
+        _attached_browsers.add(id(browser))
+        return browser
     common = dict(
         downloads_path=downloads_path,
         enable_default_extensions=False,
         keep_alive=keep_alive,
     )
+    if user_data_dir is not None:
+        common["user_data_dir"] = str(Path(user_data_dir).resolve())
+    if storage_state is not None:
+        common["storage_state"] = str(Path(storage_state).resolve())
     # Optional: use Chrome executable on macOS for consistent behavior
     if os.name == "posix":
         chrome = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
@@ -298,7 +416,7 @@ def _discover_downloads(download_dir: Path) -> Tuple[Optional[Path], Optional[Pa
     all_files = []
     for ext in ("*.csv", "*.zip", "*.xlsx"):
         for f in download_dir.glob(ext):
-            if f.is_file():
+            if f.is_file() and not f.name.lower().startswith(GENERATED_FILE_PREFIXES):
                 all_files.append((f.stat().st_mtime, f))
     all_files.sort(key=lambda x: x[0], reverse=True)
 
@@ -323,20 +441,74 @@ def _discover_downloads(download_dir: Path) -> Tuple[Optional[Path], Optional[Pa
     return (marketing_path, financial_path)
 
 
-async def _run_agent(download_dir: Path, task: str) -> None:
-    """Run the browser-use agent with the given task (no download discovery)."""
+def _replay_dir(download_dir: Path) -> Path:
+    """Replay scripts (action_replay) are shared by all runs and accounts, next to the run directories."""
+    return Path(download_dir).resolve().parent / REPLAY_DIR_NAME
+
+
+def _reports_replay(
+    download_dir: Path, email: str, password: str, start_date: str, end_date: str, logged_in: bool = False
+) -> ActionReplay:
+    credentials = {"email": email, "password": password}
+    dates = {"start_date": start_date, "end_date": end_date}
+    if logged_in:
+        # Starts on the Reports page of a valid session (own script); the fallback login may not happen
+        return ActionReplay(_replay_dir(download_dir), "reports-logged-in", dates, optional=credentials)
+    return ActionReplay(_replay_dir(download_dir), "reports", {**credentials, **dates})
+
+
+def _login_replay(download_dir: Path, email: str, password: str) -> ActionReplay:
+    return ActionReplay(_replay_dir(download_dir), "login", {"email": email, "password": password})
+
+
+async def _session_valid(browser, user_data_dir: Optional[Path]) -> bool:
+    """
+    Whether browser is still logged in from an earlier run (its persistent profile user_data_dir keeps the
+    session cookies, or it is the attached Chrome); the browser is then on the Reports page. Without a profile
+    there is no session to check.
+    """
+    attached = id(browser) in _attached_browsers
+    if not attached and (user_data_dir is None or not Path(user_data_dir).is_dir()):
+        return False
+    valid = await portal_session_valid(browser)
+    source = "the attached Chrome" if attached else Path(user_data_dir).name
+    logger.info("DoorDash (browser-use): Saved session in %s is %s.", source, "valid" if valid else "not valid")
+    return valid
+
+
+async def _replay(replay: Optional[ActionReplay], task: str, llm, browser) -> bool:
+    """Replay replay's script in browser (see action_replay); False if there is none or it failed."""
+    if replay is None or not replay.available():
+        return False
+    from browser_use import Agent
+
+    return await replay.replay(Agent(task=task, llm=llm, browser=browser, sensitive_data=replay.params, **portal_agent_kwargs()))
+
+
+async def _run_agent(download_dir: Path, task: str, replay: Optional[ActionReplay] = None) -> bool:
+    """
+    Run the browser-use agent with the given task (no download discovery). With replay, its recorded actions
+    are replayed instead when they still work, and a successful agent run is recorded for next time.
+    Returns True if the run was replayed.
+    """
     from browser_use import Agent
 
     download_dir = Path(download_dir)
     download_dir.mkdir(parents=True, exist_ok=True)
     llm = _get_llm()
     browser = _get_browser(download_dir)
-    agent = Agent(task=task, llm=llm, browser=browser)
+    if await _replay(replay, task, llm, browser):
+        logger.info("DoorDash (browser-use): Run replayed (%s).", replay.name)
+        return True
+    agent = Agent(task=task, llm=llm, browser=browser, **portal_agent_kwargs())
     history = await agent.run()
     if history and history.final_result:
         logger.info("DoorDash (browser-use): %s", history.final_result)
     else:
         logger.info("DoorDash (browser-use): Run completed.")
+    if replay is not None:
+        replay.record(history)
+    return False
 
 
 async def run_reports_only(
@@ -358,8 +530,14 @@ async def run_reports_only(
         end_date=end_date,
     )
     logger.info("DoorDash (browser-use): Starting reports-only run (login, reports, download)")
-    await _run_agent(download_dir, task)
+    replay = _reports_replay(download_dir, email, password, start_date, end_date)
+    replayed = await _run_agent(download_dir, task, replay)
     marketing_path, financial_path = _discover_downloads(download_dir)
+    if replayed and not (marketing_path and financial_path):
+        logger.info("DoorDash (browser-use): Replayed run did not download both reports; running the agent.")
+        replay.discard()
+        await _run_agent(download_dir, task, replay)
+        marketing_path, financial_path = _discover_downloads(download_dir)
     if financial_path:
         logger.info("DoorDash (browser-use): Financial report at %s", financial_path)
     if marketing_path:
@@ -397,6 +575,10 @@ async def run_reports_then_analysis_then_campaign(
     start_date: str,
     end_date: str,
     analysis_callback: Callable[[Optional[Path], Optional[Path]], Awaitable[Optional[Path]]],
+    user_data_dir: Optional[Path] = None,
+    partitions: Optional[ReportPartitionStore] = None,
+    on_report_ready: Optional[Callable[[str, Path], None]] = None,
+    attach_browser: bool = True,
 ) -> None:
     """
     Single browser session: login → reports → download → (browser stays open) →
@@ -404,6 +586,15 @@ async def run_reports_then_analysis_then_campaign(
     for each (store, day, slot) combo from combined_analysis Day-Slot sheets, run campaign (no login again) → close browser.
 
     Store IDs come only from the logged-in account's combined_analysis sheets ("Day-Slot - {StoreID}"). No env store IDs.
+    user_data_dir: browser profile directory for this session (default: browser-use's shared profile). A profile
+    kept from an earlier run is checked for a still-valid session first; the login is then skipped.
+    partitions: month partition store of this account; the portal is then only asked for the months it does not
+    hold yet (Phase 1 is skipped when it holds them all) and analysis gets the whole window assembled from it.
+    on_report_ready(report, path): called during Phase 1 as soon as the financial or marketing report has finished
+    downloading (see download_watcher), e.g. to start its analysis while the other download is still running.
+    With CAMPAIGN_WORKERS > 1 the campaigns are spread over that many browsers sharing the logged-in session
+    (see _run_campaign_workers) instead of being chained in this one.
+    attach_browser=False: launch a browser on user_data_dir even with USE_LOCAL_BROWSER=true (see _get_browser).
     """
     from browser_use import Agent
 
@@ -412,82 +603,490 @@ async def run_reports_then_analysis_then_campaign(
             get_all_campaign_combos_from_combined_analysis,
             ensure_campaigns_executed_csv,
             log_campaign_executed,
+            account_run_dirs,
+            campaign_in_ledger,
+            combo_cells,
+            load_campaign_ledger,
         )
     except ImportError:
         get_all_campaign_combos_from_combined_analysis = None
         ensure_campaigns_executed_csv = None
         log_campaign_executed = None
+        load_campaign_ledger = None
 
     download_dir = Path(download_dir)
     download_dir.mkdir(parents=True, exist_ok=True)
-
-    reports_task = get_task_description_reports_only(
-        email=email,
-        password=password,
-        start_date=start_date,
-        end_date=end_date,
-    )
+    checkpoint = RunCheckpoint(download_dir)
 
     llm = _get_llm()
-    browser = _get_browser(download_dir, keep_alive=True)
-    agent = Agent(task=reports_task, llm=llm, browser=browser)
+    browser = None
+    agent = None
+    try:
+        reports = checkpoint.reports()
+        if reports is None:
+            fetch = (start_date, end_date) if partitions is None else partitions.fetch_range(start_date, end_date)
+            if fetch is None:
+                logger.info("DoorDash (browser-use): All months of %s to %s already stored; skipping Phase 1.", start_date, end_date)
+                with span("partitions.assemble", report_start=start_date, report_end=end_date):
+                    marketing_path = partitions.assemble("marketing", start_date, end_date, download_dir)
+                    financial_path = partitions.assemble("financial", start_date, end_date, download_dir)
+            else:
+                browser = _get_browser(download_dir, keep_alive=True, user_data_dir=user_data_dir, attach=attach_browser)
+                logged_in = await _session_valid(browser, user_data_dir)
+                reports_task = get_task_description_reports_only(
+                    email=email,
+                    password=password,
+                    start_date=fetch[0],
+                    end_date=fetch[1],
+                    logged_in=logged_in,
+                )
+                agent = Agent(task=reports_task, llm=llm, browser=browser, **portal_agent_kwargs())
+
+                logger.info(
+                    "DoorDash (browser-use): Phase 1 — reports %s to %s (%s, create, download); browser will stay open.",
+                    fetch[0],
+                    fetch[1],
+                    "session still valid, no login" if logged_in else "login",
+                )
+                replay = _reports_replay(download_dir, email, password, fetch[0], fetch[1], logged_in=logged_in)
+                ready, agent_ran = await _run_reports_task(
+                    agent, download_dir, fetch, start_date, end_date, partitions, on_report_ready,
+                    replay=replay, replay_run=lambda: _replay(replay, reports_task, llm, browser),
+                )
+                if not agent_ran:
+                    # Replayed: this agent never ran; Phase 2 starts one in the logged-in browser
+                    agent = None
+                marketing_path, financial_path = ready.get("marketing"), ready.get("financial")
+            checkpoint.mark_reports(marketing_path, financial_path)
+        else:
+            marketing_path, financial_path = reports
+            logger.info("DoorDash (browser-use): Resuming — reports already downloaded (checkpoint); skipping Phase 1.")
+        if financial_path:
+            logger.info("DoorDash (browser-use): Financial report at %s", financial_path)
+        if marketing_path:
+            logger.info("DoorDash (browser-use): Marketing report at %s", marketing_path)
+
+        combined_path = checkpoint.combined_path() if reports is not None else None
+        if combined_path is None:
+            logger.info("DoorDash (browser-use): Pausing browser agent; running analysis callback.")
+            combined_path = await analysis_callback(marketing_path, financial_path)
+            if combined_path and Path(combined_path).is_file():
+                checkpoint.mark_analysis(Path(combined_path))
+        else:
+            logger.info("DoorDash (browser-use): Resuming — analysis already done (checkpoint): %s", combined_path.name)
 
-    logger.info("DoorDash (browser-use): Phase 1 — reports (login, create, download); browser will stay open.")
-    await agent.run()
+        if not combined_path or not Path(combined_path).is_file():
+            logger.warning(
+                "DoorDash (browser-use): No combined_analysis file returned. Set DOORDASH_* credentials and ensure financial/marketing analysis run; campaigns will use fallback env only if set."
+            )
 
-    marketing_path, financial_path = _discover_downloads(download_dir)
-    if financial_path:
-        logger.info("DoorDash (browser-use): Financial report at %s", financial_path)
-    if marketing_path:
-        logger.info("DoorDash (browser-use): Marketing report at %s", marketing_path)
+        combos = []
+        found = skipped = resumed = 0
+        if combined_path and Path(combined_path).is_file() and get_all_campaign_combos_from_combined_analysis:
+            combos = get_all_campaign_combos_from_combined_analysis(Path(combined_path))
+            found = len(combos)
+            logger.info("DoorDash (browser-use): Found %s campaign combos from Day-Slot sheets (store IDs from sheets).", len(combos))
+            if load_campaign_ledger:
+                # Cells already created with the same incentive (this run or the account's recent runs) are not redone
+                ledger = load_campaign_ledger(account_run_dirs(download_dir))
+                combos = [combo for combo in combos if not campaign_in_ledger(ledger, combo)]
+                skipped = found - len(combos)
+            # Cells covered by campaigns this run already completed are dropped before planning: once cells drop
+            # out, planning renumbers the campaigns, so a planned name can stand for other cells on a retry
+            completed = checkpoint.completed_combos()
+            remaining = [combo for combo in combos if str(combo.get("campaign_name", "")) not in completed]
+            resumed = len(combos) - len(remaining)
+            if resumed:
+                logger.info(
+                    "DoorDash (browser-use): Resuming — %s/%s combos already in completed campaigns (checkpoint).",
+                    resumed,
+                    len(combos),
+                )
+            # Cells and stores with the same incentive share one campaign (CAMPAIGN_CONSOLIDATION)
+            combos = plan_campaigns(remaining)
+
+        if found:
+            logger.info(
+                "DoorDash (browser-use): Campaigns — %s combos planned, %s skipped (already completed, campaigns_executed ledger / checkpoint), %s campaigns to execute.",
+                found,
+                skipped + resumed,
+                len(combos),
+            )
+        if not combos and (skipped or resumed):
+            return
+        if not combos:
+            logger.warning(
+                "DoorDash (browser-use): No campaign combos from combined_analysis. Store IDs come only from that file (Day-Slot - {StoreID} sheets). Skip campaigns until combined_analysis is created for this account."
+            )
+            return
+
+        if browser is None:
+            # Resumed past Phase 1: open the browser just to log in, then chain the campaigns as usual
+            browser = _get_browser(download_dir, keep_alive=True, user_data_dir=user_data_dir, attach=attach_browser)
+            login_task = get_task_description_login_only(email, password)
+            login = _login_replay(download_dir, email, password)
+            if await _session_valid(browser, user_data_dir):
+                logger.info("DoorDash (browser-use): Session in the browser profile still valid; no login for the remaining campaigns.")
+            elif await _replay(login, login_task, llm, browser):
+                logger.info("DoorDash (browser-use): Logged in for the remaining campaigns (replayed).")
+            else:
+                agent = Agent(task=login_task, llm=llm, browser=browser, **portal_agent_kwargs())
+                logger.info("DoorDash (browser-use): Logging in for the remaining campaigns.")
+                with span("portal.login") as s:
+                    history = await agent.run()
+                    _record_history(s, history)
+                login.record(history)
+
+        if not hasattr(Agent, "add_new_task"):
+            logger.warning(
+                "Agent.add_new_task not found. Store IDs come only from combined_analysis; cannot run campaigns without chaining. Skip campaign phase."
+            )
+            return
+
+        if ensure_campaigns_executed_csv:
+            ensure_campaigns_executed_csv(download_dir)
+        done = 0
+        executed: dict = {}
+
+        def record(combo: dict, status: str) -> None:
+            # Called as each campaign finishes, so the checkpoint and the ledger are current even if the run dies
+            nonlocal done
+            campaign_name = str(combo.get("campaign_name", ""))
+            checkpoint.mark_campaign(campaign_name, status, combos=combo.get("combos"))
+            if log_campaign_executed:
+                log_campaign_executed(
+                    download_dir,
+                    store_id=str(combo.get("store_id", "")),
+                    campaign_name=campaign_name,
+                    min_subtotal=float(combo.get("min_subtotal", 10)),
+                    status=status,
+                    cells=combo_cells(combo),
+                )
+            executed[status] = executed.get(status, 0) + 1
+            done += 1
+            logger.info("DoorDash (browser-use): Campaign %s/%s %s: %s", done, len(combos), status.lower(), campaign_name)
+
+        workers = min(campaign_workers(), len(combos))
+        if workers > 1:
+            storage_state = await _export_storage_state(browser, download_dir / STORAGE_STATE_FILE)
+            if storage_state is None:
+                logger.info("DoorDash (browser-use): Could not export the logged-in session; each campaign worker logs in.")
+            # The workers have their own browsers; this one is not needed any more
+            await _close_browser(browser)
+            browser = None
+            logger.info(
+                "DoorDash (browser-use): Phase 2 — %s campaigns from combined_analysis, %s workers.", len(combos), workers
+            )
+            try:
+                await _run_campaign_workers(
+                    combos, workers, download_dir, user_data_dir, storage_state, email, password, llm, record
+                )
+            finally:
+                if storage_state is not None:
+                    storage_state.unlink(missing_ok=True)
+        else:
+            logger.info("DoorDash (browser-use): Phase 2 — %s campaigns from combined_analysis (same session).", len(combos))
+            # The reports or login agent, if it ran, has done one task; a replayed login leaves no agent
+            chained = 0 if agent is None else 1
+            for combo in combos:
+                agent, chained = _campaign_agent(agent, chained, combo, llm, browser)
+                record(combo, await _run_campaign(agent, combo))
+        logger.info(
+            "DoorDash (browser-use): Phase 2 done — %s campaigns executed (%s).",
+            sum(executed.values()),
+            ", ".join(f"{n} {status.lower()}" for status, n in sorted(executed.items())) or "none",
+        )
+    finally:
+        if browser is not None:
+            await _close_browser(browser)
 
-    logger.info("DoorDash (browser-use): Pausing browser agent; running analysis callback.")
-    combined_path = await analysis_callback(marketing_path, financial_path)
 
-    if not combined_path or not Path(combined_path).is_file():
-        logger.warning(
-            "DoorDash (browser-use): No combined_analysis file returned. Set DOORDASH_* credentials and ensure financial/marketing analysis run; campaigns will use fallback env only if set."
-        )
+async def _run_reports_task(
+    agent,
+    download_dir: Path,
+    fetch: Tuple[str, str],
+    start_date: str,
+    end_date: str,
+    partitions: Optional[ReportPartitionStore],
+    on_report_ready: Optional[Callable[[str, Path], None]],
+    replay: Optional[ActionReplay] = None,
+    replay_run: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> Tuple[dict, bool]:
+    """
+    Run the reports task while a DownloadWatcher hands each finished report on (stored in the partitions and
+    assembled into the start_date..end_date window first, when given) to on_report_ready.
+    With replay, replay_run() (the recorded reports flow) is tried first; if it fails or the reports do not
+    arrive, the script is discarded and agent runs, and an agent run that got both reports is recorded.
+    Returns ({"financial": path, "marketing": path} for the reports found, whether agent ran).
+    """
+    ready = {}
+    all_ready = asyncio.Event()
+    agent_ran = True
+    task_start = time.perf_counter()
+
+    async def report_ready(report: str, path: Optional[Path], source: str = "watcher") -> None:
+        if report in ready:
+            return
+        # waited_ms: from the start of the reports task until the file had finished downloading
+        with span("portal.download", report=report, file=path.name, bytes=file_size(path), source=source) as s:
+            s.set(waited_ms=round((time.perf_counter() - task_start) * 1000, 1))
+        whole_window = fetch == (start_date, end_date)
+        if partitions is not None and not whole_window:
+            with span("partitions.merge", report=report):
+                path = await asyncio.to_thread(
+                    partitions.merge_download, report, path, fetch[0], fetch[1], start_date, end_date, download_dir
+                )
+        ready[report] = path
+        if path and on_report_ready is not None:
+            on_report_ready(report, path)
+        if partitions is not None and whole_window and path:
+            # The download is the whole window already: its analysis starts first, storing it only serves later runs
+            with span("partitions.store", report=report):
+                await asyncio.to_thread(partitions.store, report, path, fetch[0], fetch[1])
+        if all(r in ready for r in REPORTS):
+            all_ready.set()
+
+    async with DownloadWatcher(download_dir) as watcher:
+
+        async def consume() -> None:
+            while True:
+                report, path = await watcher.get()
+                await report_ready(report, path)
+
+        consumer = asyncio.create_task(consume())
+        try:
+            async def wait_for_downloads() -> None:
+                # The task can finish while the last download is still being written
+                if not all_ready.is_set():
+                    try:
+                        await asyncio.wait_for(all_ready.wait(), DOWNLOAD_WAIT_SEC)
+                    except asyncio.TimeoutError:
+                        pass
+
+            if replay_run is not None and await replay_run():
+                await wait_for_downloads()
+                if all_ready.is_set():
+                    agent_ran = False
+                else:
+                    logger.info("DoorDash (browser-use): Replayed reports flow did not download both reports; running the agent.")
+                    replay.discard()
+            if agent_ran:
+                # One agent task logs in, creates both reports and downloads them; it is timed as a whole
+                with span("portal.reports", report_start=fetch[0], report_end=fetch[1]) as s:
+                    history = await agent.run()
+                    _record_history(s, history)
+                await wait_for_downloads()
+                if replay is not None and all_ready.is_set():
+                    replay.record(history)
+        finally:
+            consumer.cancel()
+            try:
+                await consumer
+            except asyncio.CancelledError:
+                pass
+
+    if not all_ready.is_set():
+        # Not seen finishing (e.g. saved under an unexpected name): fall back to the newest files in the folder
+        marketing_path, financial_path = _discover_downloads(download_dir)
+        for report, path in (("financial", financial_path), ("marketing", marketing_path)):
+            if report not in ready and path is not None:
+                await report_ready(report, path, source="folder")
+    return {r: p for r, p in ready.items() if p}, agent_ran
+
+
+def campaign_workers() -> int:
+    """Number of campaign workers per account (CAMPAIGN_WORKERS, default DEFAULT_CAMPAIGN_WORKERS)."""
+    try:
+        return max(1, int(os.getenv("CAMPAIGN_WORKERS", "") or DEFAULT_CAMPAIGN_WORKERS))
+    except ValueError:
+        return DEFAULT_CAMPAIGN_WORKERS
 
-    combos = []
-    if combined_path and Path(combined_path).is_file() and get_all_campaign_combos_from_combined_analysis:
-        combos = get_all_campaign_combos_from_combined_analysis(Path(combined_path))
-        logger.info("DoorDash (browser-use): Found %s campaign combos from Day-Slot sheets (store IDs from sheets).", len(combos))
 
-    if hasattr(agent, "add_new_task"):
-        if combos:
-            if ensure_campaigns_executed_csv:
-                ensure_campaigns_executed_csv(download_dir)
-            logger.info("DoorDash (browser-use): Phase 2 — %s campaigns from combined_analysis (same session).", len(combos))
-            for i, combo in enumerate(combos, 1):
-                task = get_task_description_campaign_for_combo(combo)
-                agent.add_new_task(task)
-                try:
-                    await agent.run()
-                    status = "Completed"
-                except Exception as e:
-                    logger.warning("Campaign %s failed: %s", combo.get("campaign_name"), e)
-                    status = "Failed"
-                if log_campaign_executed:
-                    log_campaign_executed(
-                        download_dir,
-                        store_id=str(combo.get("store_id", "")),
-                        campaign_name=str(combo.get("campaign_name", "")),
-                        pct_value=15,
-                        min_subtotal=float(combo.get("min_subtotal", 10)),
-                        max_discount="Always lowest",
-                        status=status,
-                    )
-                logger.info("DoorDash (browser-use): Campaign %s/%s done: %s", i, len(combos), combo.get("campaign_name"))
-        else:
-            logger.warning(
-                "DoorDash (browser-use): No campaign combos from combined_analysis. Store IDs come only from that file (Day-Slot - {StoreID} sheets). Skip campaigns until combined_analysis is created for this account."
+def campaign_chain_tasks() -> int:
+    """Tasks per agent before a fresh one takes over (CAMPAIGN_CHAIN_TASKS, default DEFAULT_CAMPAIGN_CHAIN_TASKS)."""
+    try:
+        return max(0, int(os.getenv("CAMPAIGN_CHAIN_TASKS", "") or DEFAULT_CAMPAIGN_CHAIN_TASKS))
+    except ValueError:
+        return DEFAULT_CAMPAIGN_CHAIN_TASKS
+
+
+def _campaign_agent(agent, chained: int, combo: dict, llm, browser) -> Tuple[object, int]:
+    """
+    Agent whose next task is combo's campaign: agent itself (add_new_task, same conversation) while it has run
+    fewer than campaign_chain_tasks() tasks, else a new Agent in the same browser (logged-in session, empty
+    conversation). Returns (agent, tasks it has been given).
+    """
+    from browser_use import Agent
+
+    limit = campaign_chain_tasks()
+    if agent is not None and (not limit or chained < limit):
+        agent.add_new_task(get_task_description_campaign_for_combo(combo))
+        return agent, chained + 1
+    if agent is not None:
+        logger.info("DoorDash (browser-use): %s tasks chained; starting a fresh agent in the same browser.", chained)
+    task = get_task_description_campaign_for_combo(combo, start_url=MERCHANT_PORTAL_URL)
+    return Agent(task=task, llm=llm, browser=browser, **portal_agent_kwargs()), 1
+
+
+def _history_steps(history) -> list:
+    return list(getattr(history, "history", None) or [])
+
+
+def _task_usage(history, first_step: int) -> dict:
+    """Steps and tokens of the task whose steps start at history index first_step (a chained agent's history holds all its tasks)."""
+    steps = _history_steps(history)[first_step:]
+    prompts = [getattr(getattr(step, "metadata", None), "input_tokens", None) for step in steps]
+    prompts = [t for t in prompts if isinstance(t, int)]
+    return {
+        "task_steps": len(steps),
+        "task_input_tokens": sum(prompts) if prompts else None,
+        "prompt_tokens": max(prompts) if prompts else None,
+    }
+
+
+async def _run_campaign(agent, combo: dict, **attrs) -> str:
+    """Run the agent's current task (the campaign for combo); returns the status to record, "Completed" or "Failed"."""
+    campaign_name = str(combo.get("campaign_name", ""))
+    first_step = len(_history_steps(getattr(agent, "history", None)))
+    try:
+        with span("portal.campaign", campaign=campaign_name, store_id=str(combo.get("store_id", "")), **attrs) as s:
+            history = await agent.run()
+            _record_history(s, history)
+            usage = _task_usage(history, first_step)
+            s.set(**usage)
+        if usage["prompt_tokens"] is not None:
+            logger.info(
+                "DoorDash (browser-use): Campaign %s — %s steps, prompt up to %s tokens, %s input tokens.",
+                campaign_name,
+                usage["task_steps"],
+                usage["prompt_tokens"],
+                usage["task_input_tokens"],
             )
-    else:
-        logger.warning(
-            "Agent.add_new_task not found. Store IDs come only from combined_analysis; cannot run campaigns without chaining. Skip campaign phase."
-        )
+        return "Completed"
+    except Exception as e:
+        logger.warning("Campaign %s failed: %s", campaign_name, e)
+        return "Failed"
+
 
+async def _export_storage_state(browser, path: Path) -> Optional[Path]:
+    """
+    Save the logged-in browser's cookies and local storage to path (readable by the owner only), for other
+    browsers to start logged in. None if this browser-use version cannot export it.
+    """
+    for method in ("export_storage_state", "save_storage_state"):
+        fn = getattr(browser, method, None)
+        if not callable(fn):
+            continue
+        try:
+            result = fn(str(path))
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.debug("Browser %s: %s", method, e)
+            continue
+        if path.is_file():
+            os.chmod(path, 0o600)
+            return path
+    return None
+
+
+def _campaign_worker_profile(download_dir: Path, user_data_dir: Optional[Path], worker: int) -> Path:
+    """Browser profile directory of campaign worker `worker` (each concurrent browser needs its own)."""
+    if user_data_dir is not None:
+        base = Path(user_data_dir)
+        return base.with_name(f"{base.name}-campaign-{worker}")
+    return Path(download_dir).resolve().parent / ".browser_profiles" / f"campaign-{worker}"
+
+
+async def _run_campaign_workers(
+    combos: list,
+    workers: int,
+    download_dir: Path,
+    user_data_dir: Optional[Path],
+    storage_state: Optional[Path],
+    email: str,
+    password: str,
+    llm,
+    on_done: Callable[[dict, str], None],
+) -> None:
+    """
+    Create the campaigns for combos with `workers` browsers at once. Each worker has its own browser and profile,
+    started with the logged-in session from storage_state (or logging in itself when there is none), takes the
+    next combo from a shared queue and chains its campaigns in one agent; on_done(combo, status) is called as
+    each campaign finishes. A worker whose login fails puts its combo back and stops; combos left over when
+    every worker has stopped stay pending for the next attempt (see run_checkpoint).
+    """
+    from browser_use import Agent
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for combo in combos:
+        queue.put_nowait(combo)
+
+    async def worker(i: int) -> None:
+        browser = _get_browser(
+            download_dir,
+            keep_alive=True,
+            user_data_dir=_campaign_worker_profile(download_dir, user_data_dir, i),
+            storage_state=storage_state,
+            # Workers need browsers of their own next to the attached Chrome
+            attach=False,
+        )
+        agent = None
+        chained = 0
+        try:
+            while not queue.empty():
+                combo = queue.get_nowait()
+                if agent is None and storage_state is None:
+                    login_task = get_task_description_login_only(email, password)
+                    agent = Agent(task=login_task, llm=llm, browser=browser, **portal_agent_kwargs())
+                    try:
+                        with span("portal.login", worker=i) as s:
+                            _record_history(s, await agent.run())
+                    except Exception as e:
+                        logger.warning("DoorDash (browser-use): Campaign worker %s could not log in: %s", i, e)
+                        queue.put_nowait(combo)
+                        return
+                    chained = 1
+                agent, chained = _campaign_agent(agent, chained, combo, llm, browser)
+                on_done(combo, await _run_campaign(agent, combo, worker=i))
+        finally:
+            await _close_browser(browser)
+
+    results = await asyncio.gather(*(worker(i) for i in range(1, workers + 1)), return_exceptions=True)
+    for i, result in enumerate(results, 1):
+        if isinstance(result, Exception):
+            logger.warning("DoorDash (browser-use): Campaign worker %s stopped: %s", i, result)
+
+
+def _record_history(s, history) -> None:
+    """Add what the agent's run history reports (steps, tokens, success) to tracing span s."""
+    for attr, method in (
+        ("steps", "number_of_steps"),
+        ("agent_seconds", "total_duration_seconds"),
+        ("input_tokens", "total_input_tokens"),
+        ("successful", "is_successful"),
+    ):
+        fn = getattr(history, method, None)
+        if callable(fn):
+            try:
+                s.set(**{attr: fn()})
+            except Exception:
+                pass
+
+
+async def _close_browser(browser) -> None:
+    if id(browser) in _attached_browsers:
+        # Attached over CDP: disconnect and leave the Chrome (and its other tabs) running
+        _attached_browsers.discard(id(browser))
+        try:
+            stop_fn = getattr(browser, "stop", None)
+            if callable(stop_fn):
+                result = stop_fn()
+                if asyncio.iscoroutine(result):
+                    await result
+        except Exception as e:
+            logger.debug("Browser disconnect: %s", e)
+        return
     try:
         kill_fn = getattr(browser, "kill", None)
         if callable(kill_fn):
@@ -0,0 +1,171 @@
+"""
+DownloadWatcher: watches the browser's download directory while the agent runs and reports each finished
+financial / marketing report as soon as it lands, instead of globbing the folder after agent.run() returns.
+
+A file counts as finished when it has no partial-download marker (Chrome's .crdownload and similar, on the
+file itself or a sibling) and its size has stayed the same for STABLE_POLLS checks; a zip must also open.
+Reports are classified by what is inside the zip (FINANCIAL_DETAILED_* vs MARKETING_* members), falling
+back to the file name and, for a CSV, its header. inotify (inotify_simple) wakes the watcher when the
+directory changes; without it the directory is polled every POLL_INTERVAL_SEC.
+"""
+
+import asyncio
+import logging
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from agents.report_partitions import REPORT_KINDS, report_kind
+
+logger = logging.getLogger(__name__)
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+    inotify_flags = None
+
+# Files the workflow itself writes into a run directory (analysis_agent's extracted CSV, the combined
+# report, the campaign log); never mistaken for a downloaded report
+GENERATED_FILE_PREFIXES = ("financial_detailed_report", "combined_analysis_", "campaigns_executed")
+REPORT_SUFFIXES = (".zip", ".csv", ".xlsx")
+# Markers browsers use for downloads in progress
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".partial", ".download", ".tmp")
+POLL_INTERVAL_SEC = 0.5
+STABLE_POLLS = 2
+
+
+def _is_candidate(path: Path) -> bool:
+    name = path.name.lower()
+    return name.endswith(REPORT_SUFFIXES) and not name.startswith(GENERATED_FILE_PREFIXES) and not name.startswith(".")
+
+
+def classify_report(path: Path) -> Optional[str]:
+    """"financial" or "marketing" for a downloaded report file, or None if it is neither (or an unreadable zip)."""
+    path = Path(path)
+    name = path.name.lower()
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            reports = {REPORT_KINDS[k]["report"] for k in map(report_kind, z.namelist()) if k}
+        if len(reports) == 1:
+            return reports.pop()
+    elif name.endswith(".zip"):
+        return None
+    kind = report_kind(path.name)
+    if kind:
+        return REPORT_KINDS[kind]["report"]
+    if "financial" in name:
+        return "financial"
+    if "marketing" in name:
+        return "marketing"
+    if name.endswith(".csv"):
+        return _classify_csv_header(path)
+    return None
+
+
+def _classify_csv_header(path: Path) -> Optional[str]:
+    from agents.report_schemas import DD_FINANCIAL, DD_MARKETING, read_report_header, resolve_columns
+
+    try:
+        header = read_report_header(path, DD_FINANCIAL)
+    except Exception:
+        return None
+    if resolve_columns(header, DD_FINANCIAL)["order_id"]:
+        return "financial"
+    if resolve_columns(header, DD_MARKETING)["campaign_name"]:
+        return "marketing"
+    return None
+
+
+class DownloadWatcher:
+    """
+    async with DownloadWatcher(download_dir) as watcher: ... await watcher.get() -> (report, path).
+    Files already in the directory when the watcher starts are ignored.
+    """
+
+    def __init__(self, directory: Path, poll_interval: float = POLL_INTERVAL_SEC, stable_polls: int = STABLE_POLLS) -> None:
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self.stable_polls = stable_polls
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._seen = set()
+        self._sizes: Dict[Path, Tuple[int, int]] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._inotify = None
+
+    async def __aenter__(self) -> "DownloadWatcher":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._seen = {p for p in self.directory.iterdir()}
+        if INotify is not None:
+            try:
+                self._inotify = INotify()
+                mask = inotify_flags.CREATE | inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                self._inotify.add_watch(str(self.directory), mask)
+                asyncio.get_running_loop().add_reader(self._inotify.fileno(), self._on_inotify)
+            except OSError as e:
+                logger.info("DownloadWatcher: inotify unavailable (%s); polling %s", e, self.directory)
+                self._inotify = None
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._inotify is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify.fileno())
+            self._inotify.close()
+            self._inotify = None
+
+    def _on_inotify(self) -> None:
+        self._inotify.read(timeout=0)
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                for event in await asyncio.to_thread(self._scan):
+                    self._queue.put_nowait(event)
+            except Exception as e:
+                logger.debug("DownloadWatcher: scan failed: %s", e)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _scan(self) -> List[Tuple[str, Path]]:
+        """(report, path) for each file that finished downloading since the last scan (runs in a worker thread)."""
+        events = []
+        names = {p.name.lower() for p in self.directory.iterdir()}
+        for path in self.directory.iterdir():
+            if path in self._seen or not path.is_file() or not _is_candidate(path):
+                continue
+            if any(f"{path.name.lower()}{suffix}" in names for suffix in PARTIAL_SUFFIXES):
+                self._sizes.pop(path, None)
+                continue
+            size = path.stat().st_size
+            prev_size, polls = self._sizes.get(path, (-1, 0))
+            polls = polls + 1 if size == prev_size and size > 0 else 0
+            self._sizes[path] = (size, polls)
+            if polls < self.stable_polls:
+                continue
+            if path.name.lower().endswith(".zip") and not zipfile.is_zipfile(path):
+                continue
+            self._seen.add(path)
+            self._sizes.pop(path, None)
+            report = classify_report(path)
+            if report is None:
+                logger.info("DownloadWatcher: %s is not a financial or marketing report; ignored", path.name)
+                continue
+            logger.info("DownloadWatcher: %s report downloaded: %s", report.capitalize(), path.name)
+            events.append((report, path))
+        return events
+
+    async def get(self, timeout: Optional[float] = None) -> Tuple[str, Path]:
+        """Next finished report as (report, path); raises asyncio.TimeoutError after timeout seconds."""
+        return await asyncio.wait_for(self._queue.get(), timeout)
@@ -0,0 +1,183 @@
+"""
+ReportWorkbook: the .xlsx writer behind the financial, marketing and combined report workbooks.
+
+Every sheet has the same layout: a bold title in row 1 and the bold header in row 3 (row 1 when there is
+no title), then the data. Columns marked with report_format.mark_currency get the $ number format.
+Rows are streamed to disk with one shared style object per kind of cell: xlsxwriter in constant-memory
+mode when it is installed, otherwise openpyxl in write-only mode. EXCEL_WRITER=openpyxl|xlsxwriter
+picks the backend explicitly.
+"""
+
+import datetime as dt
+import logging
+import math
+import os
+from pathlib import Path
+from typing import List, Optional, Union
+
+from agents.report_format import EXCEL_CURRENCY_FORMAT, cell_value, currency_columns
+from agents.tracing import annotate, file_size
+
+logger = logging.getLogger(__name__)
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+ENGINES = ("xlsxwriter", "openpyxl")
+# Excel sheet name limit
+SHEET_NAME_MAX_LEN = 31
+# Header row (1-based) when the sheet has a title in row 1
+HEADER_ROW_WITH_TITLE = 3
+# Number formats openpyxl gives date / datetime cells; used for xlsxwriter too so both backends match
+DATE_FORMAT = "yyyy-mm-dd"
+DATETIME_FORMAT = "yyyy-mm-dd h:mm:ss"
+
+
+def default_engine() -> str:
+    """EXCEL_WRITER if set (and installed), else xlsxwriter when installed, else openpyxl."""
+    engine = os.getenv("EXCEL_WRITER", "").strip().lower()
+    if engine == "xlsxwriter" and xlsxwriter is None:
+        logger.warning("ExcelWriter: EXCEL_WRITER=xlsxwriter but xlsxwriter is not installed; using openpyxl")
+        return "openpyxl"
+    if engine in ENGINES:
+        return engine
+    return "xlsxwriter" if xlsxwriter is not None else "openpyxl"
+
+
+def unique_sheet_name(name: str, existing: List[str]) -> str:
+    """name cut to the Excel limit, with _1, _2, ... appended if a sheet of that name already exists."""
+    name = (name or "Sheet")[:SHEET_NAME_MAX_LEN]
+    if name in existing:
+        base, n = name, 1
+        while f"{base}_{n}"[:SHEET_NAME_MAX_LEN] in existing:
+            n += 1
+        name = f"{base}_{n}"[:SHEET_NAME_MAX_LEN]
+    return name
+
+
+class ReportWorkbook:
+    """
+    Write-once workbook: add sheets in order with add_sheet, then save(). Sheets cannot be revisited
+    (both backends stream each sheet's rows to disk).
+    """
+
+    def __init__(self, path: Union[str, Path], engine: Optional[str] = None) -> None:
+        self.path = Path(path)
+        self.engine = engine or default_engine()
+        self.sheet_names: List[str] = []
+        if self.engine == "xlsxwriter":
+            if xlsxwriter is None:
+                raise RuntimeError("xlsxwriter is required for engine='xlsxwriter'. Install with: pip install xlsxwriter")
+            # strings_to_urls off: openpyxl stores URL-like text as plain text, keep both backends the same
+            self._book = xlsxwriter.Workbook(str(self.path), {"constant_memory": True, "strings_to_urls": False})
+            self._styles = {
+                "title": self._book.add_format({"bold": True, "font_size": 12}),
+                "header": self._book.add_format({"bold": True}),
+                "currency": self._book.add_format({"num_format": EXCEL_CURRENCY_FORMAT}),
+                "date": self._book.add_format({"num_format": DATE_FORMAT}),
+                "datetime": self._book.add_format({"num_format": DATETIME_FORMAT}),
+            }
+        elif self.engine == "openpyxl":
+            try:
+                from openpyxl import Workbook
+                from openpyxl.styles import Font
+            except ImportError:
+                raise RuntimeError("openpyxl is required. Install with: pip install openpyxl")
+            self._book = Workbook(write_only=True)
+            self._styles = {"title": Font(bold=True, size=12), "header": Font(bold=True)}
+        else:
+            raise ValueError(f"Unknown Excel writer engine {self.engine!r} (expected one of {ENGINES})")
+
+    def add_sheet(self, sheet_name: str, df=None, title: Optional[str] = None) -> str:
+        """
+        Add a sheet with an optional title and df (header + rows, no index). A sheet with neither is left
+        blank. The name is cut to 31 characters and de-duplicated; returns the name used.
+        """
+        name = unique_sheet_name(sheet_name, self.sheet_names)
+        self.sheet_names.append(name)
+        has_data = df is not None and not getattr(df, "empty", True)
+        header = [cell_value(c) for c in df.columns] if has_data else []
+        # Column lists rather than itertuples: one tolist() per column converts numpy scalars to Python in bulk
+        columns = [df.iloc[:, i].tolist() for i in range(df.shape[1])] if has_data else []
+        currency = set(currency_columns(df)) if has_data else set()
+        currency_idx = [i for i, c in enumerate(df.columns) if c in currency] if has_data else []
+        if self.engine == "xlsxwriter":
+            numeric = [df.dtypes.iloc[i].kind in "iuf" for i in range(df.shape[1])] if has_data else []
+            self._add_xlsxwriter_sheet(name, title, header, columns, currency_idx, numeric)
+        else:
+            self._add_openpyxl_sheet(name, title, header, columns, currency_idx)
+        return name
+
+    def _add_xlsxwriter_sheet(self, name, title, header, columns, currency_idx, numeric) -> None:
+        ws = self._book.add_worksheet(name)
+        styles = self._styles
+        row = 0
+        if title:
+            ws.write(0, 0, title, styles["title"])
+            row = HEADER_ROW_WITH_TITLE - 1
+        if not header:
+            return
+        ws.write_row(row, 0, header, styles["header"])
+        formats = [None] * len(columns)
+        for i in currency_idx:
+            formats[i] = styles["currency"]
+        # Numeric columns go straight to write_number, skipping write()'s per-cell type dispatch
+        writers = [ws.write_number if is_numeric else None for is_numeric in numeric]
+        for values in zip(*columns):
+            row += 1
+            for c, value in enumerate(values):
+                write = writers[c]
+                if write is not None:
+                    # NaN / pd.NA (nullable Int64, Float64) are missing values; write_number rejects inf, which
+                    # is left blank as well (how openpyxl's inf cells read back)
+                    try:
+                        if math.isfinite(value):
+                            write(row, c, value, formats[c])
+                    except TypeError:
+                        pass
+                    continue
+                value = cell_value(value)
+                if value is None or (isinstance(value, float) and not math.isfinite(value)):
+                    continue
+                fmt = formats[c]
+                if fmt is None and isinstance(value, dt.date):
+                    fmt = styles["datetime"] if isinstance(value, dt.datetime) else styles["date"]
+                ws.write(row, c, value, fmt)
+
+    def _add_openpyxl_sheet(self, name, title, header, columns, currency_idx) -> None:
+        from openpyxl.cell import WriteOnlyCell
+
+        ws = self._book.create_sheet(name)
+        styles = self._styles
+        if title:
+            cell = WriteOnlyCell(ws, value=title)
+            cell.font = styles["title"]
+            ws.append([cell])
+            ws.append([])
+        if not header:
+            return
+        header_cells = []
+        for value in header:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.font = styles["header"]
+            header_cells.append(cell)
+        ws.append(header_cells)
+        for values in zip(*columns):
+            row = [cell_value(v) for v in values]
+            for i in currency_idx:
+                if row[i] is not None:
+                    cell = WriteOnlyCell(ws, value=row[i])
+                    cell.number_format = EXCEL_CURRENCY_FORMAT
+                    row[i] = cell
+            ws.append(row)
+
+    def save(self) -> Path:
+        """Write the workbook to disk and return its path (recording sheets and bytes on the open tracing span)."""
+        if self.engine == "xlsxwriter":
+            self._book.close()
+        else:
+            self._book.save(self.path)
+        annotate(engine=self.engine, sheets=len(self.sheet_names), bytes=file_size(self.path))
+        return self.path
@@ -0,0 +1,138 @@
+"""
+FinancialRollup: one aggregate of a FINANCIAL_DETAILED report at its finest grain (date x slot x store),
+from which every AnalysisAgent table is derived by re-aggregating the (small) grain instead of the raw rows.
+
+Orders are distinct DoorDash order IDs. An order usually lands in a single grain cell, in which case
+cell order counts simply add up; when some order's rows span several cells (e.g. an adjustment posted
+on a later date) the distinct (cell, order) keys are kept so coarser tables can count each order once.
+"""
+
+from typing import List, Optional
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from agents.time_slots import classify_weekdays
+
+# Finest grain every financial table is a coarsening of
+GRAIN = ["date", "slot", "store"]
+
+
+class FinancialRollup:
+    """Grain cells (date, slot, store, weekday, Sales, Payouts, Orders) plus optional distinct order keys."""
+
+    def __init__(self, cells: "pd.DataFrame", order_cells: Optional["pd.DataFrame"] = None) -> None:
+        self.cells = cells
+        # Distinct (date, slot, store, weekday, order) rows; None when order counts are additive across cells
+        self.order_cells = order_cells
+
+    @classmethod
+    def from_fact(cls, fact: "pd.DataFrame", count_distinct_orders: bool = True) -> "FinancialRollup":
+        """
+        Aggregate a fact frame (see analysis_agent._build_fact_frame) to the grain in one pass.
+        count_distinct_orders=False counts rows instead of distinct order IDs (report has no order ID column).
+        """
+        accumulator = RollupAccumulator(count_distinct_orders=count_distinct_orders)
+        accumulator.add(fact)
+        return accumulator.result()
+
+    @classmethod
+    def from_grouped(cls, grouped: "pd.DataFrame", count_distinct_orders: bool = True) -> "FinancialRollup":
+        """Build from RollupAccumulator.grouped() output (e.g. a cached copy of it)."""
+        if count_distinct_orders:
+            return cls.from_order_cells(grouped)
+        return cls._with_weekday(grouped.copy(), None)
+
+    @classmethod
+    def from_order_cells(cls, per_order: "pd.DataFrame") -> "FinancialRollup":
+        """Build from (date, slot, store, order, Sales, Payouts) rows that are unique per (cell, order)."""
+        cells = per_order.groupby(GRAIN, observed=True, dropna=False, sort=False).agg(
+            Sales=("Sales", "sum"),
+            Payouts=("Payouts", "sum"),
+            Orders=("order", "count"),
+        ).reset_index()
+        keys = per_order.loc[per_order["order"].notna(), GRAIN + ["order"]]
+        order_cells = keys if keys["order"].duplicated().any() else None
+        return cls._with_weekday(cells, order_cells)
+
+    @classmethod
+    def _with_weekday(cls, cells: "pd.DataFrame", order_cells: Optional["pd.DataFrame"]) -> "FinancialRollup":
+        cells["weekday"] = classify_weekdays(cells["date"]).array
+        if order_cells is not None:
+            order_cells = order_cells.assign(weekday=classify_weekdays(order_cells["date"]).array)
+        return cls(cells.reset_index(drop=True), order_cells)
+
+    def rollup(self, keys: List[str]) -> "pd.DataFrame":
+        """
+        Sales, Payouts and Orders per group of grain keys (any of date, weekday, slot, store).
+        Rows with a missing value in any of the keys are left out, as a groupby on the raw rows would.
+        """
+        cells = self.cells.dropna(subset=keys)
+        agg = cells.groupby(keys, observed=True).agg(
+            Sales=("Sales", "sum"),
+            Payouts=("Payouts", "sum"),
+            Orders=("Orders", "sum"),
+        ).reset_index()
+        if self.order_cells is not None:
+            orders = self.order_cells.dropna(subset=keys).drop_duplicates(keys + ["order"])
+            counts = orders.groupby(keys, observed=True).size().rename("Orders").reset_index()
+            agg = agg.drop(columns=["Orders"]).merge(counts, on=keys, how="left")
+            agg["Orders"] = agg["Orders"].fillna(0).astype("int64")
+        return agg
+
+
+class RollupAccumulator:
+    """
+    Folds fact-frame chunks into a FinancialRollup. Each chunk is reduced to its (cell, order) sums
+    (or cell sums when orders are counted as rows) and partials are merged every few chunks, so memory
+    follows the number of distinct groups rather than the number of raw rows.
+    """
+
+    # Merge partial aggregates once this many have been collected
+    COMPACT_EVERY = 8
+
+    def __init__(self, count_distinct_orders: bool = True) -> None:
+        self.count_distinct_orders = count_distinct_orders
+        self.keys = GRAIN + ["order"] if count_distinct_orders else GRAIN
+        self.rows = 0
+        self._partials: List["pd.DataFrame"] = []
+
+    def add(self, fact: "pd.DataFrame") -> None:
+        """Aggregate one fact-frame chunk and keep the partial result."""
+        self.rows += len(fact)
+        if self.count_distinct_orders:
+            partial = self._group(fact, Sales=("subtotal", "sum"), Payouts=("payout", "sum"))
+        else:
+            partial = self._group(fact, Sales=("subtotal", "sum"), Payouts=("payout", "sum"), Orders=("subtotal", "size"))
+        self._partials.append(partial)
+        if len(self._partials) >= self.COMPACT_EVERY:
+            self._compact()
+
+    def _group(self, frame: "pd.DataFrame", **aggs) -> "pd.DataFrame":
+        return frame.groupby(self.keys, observed=True, dropna=False, sort=False).agg(**aggs).reset_index()
+
+    def _compact(self) -> None:
+        if len(self._partials) < 2:
+            return
+        combined = pd.concat(self._partials, ignore_index=True)
+        sums = {c: (c, "sum") for c in combined.columns if c not in self.keys}
+        self._partials = [self._group(combined, **sums)]
+
+    def grouped(self) -> Optional["pd.DataFrame"]:
+        """
+        Every chunk added so far merged into one frame: (date, slot, store, order, Sales, Payouts) per
+        (cell, order), or (date, slot, store, Sales, Payouts, Orders) per cell. None if nothing was added.
+        """
+        if not self._partials:
+            return None
+        self._compact()
+        return self._partials[0]
+
+    def result(self) -> Optional[FinancialRollup]:
+        """Final rollup over every chunk added so far; None if nothing was added."""
+        grouped = self.grouped()
+        if grouped is None:
+            return None
+        return FinancialRollup.from_grouped(grouped, self.count_distinct_orders)
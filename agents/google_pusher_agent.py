@@ -18,6 +18,9 @@ import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from agents.report_format import SHEETS_CURRENCY_FORMAT, is_currency_format
+from agents.tracing import annotate, traced
+
 logger = logging.getLogger(__name__)
 
 # Sheet title max length (Google Sheets limit)
@@ -102,14 +105,21 @@ def _sanitize_sheet_title(title: str) -> str:
     return s[:SHEET_TITLE_MAX_LEN]
 
 
-def _excel_to_sheet_data(excel_path: Path) -> Dict[str, List[List[Any]]]:
+def _sheet_cell_value(value: Any) -> Any:
+    """Cell value for the Sheets API: numbers stay numbers, empty cells are "", anything else is text."""
+    if value is None:
+        return ""
+    if isinstance(value, (bool, int, float)):
+        return value
+    return str(value)
+
+
+def _excel_to_sheet_data(excel_path: Path) -> Tuple[Dict[str, List[List[Any]]], Dict[str, List[Tuple[int, int]]]]:
     """
-    Read an Excel file and return a dict mapping sheet name -> list of rows (each row is list of cell values).
+    Read an Excel file and return (sheet name -> list of rows, sheet name -> currency cells).
+    Rows keep numeric cells numeric; currency cells are (row, column) 0-based indexes of cells with a
+    dollar number format, so push_to_sheets can apply the same format in Google Sheets.
     """
-    try:
-        import pandas as pd
-    except ImportError:
-        raise RuntimeError("pandas is required for GooglePusherAgent. Install with: pip install pandas")
     try:
         import openpyxl
     except ImportError:
@@ -117,30 +127,41 @@ def _excel_to_sheet_data(excel_path: Path) -> Dict[str, List[List[Any]]]:
 
     excel_path = Path(excel_path)
     if not excel_path.is_file():
-        return {}
+        return {}, {}
     out = {}
-    xl = pd.ExcelFile(excel_path)
-    for sheet_name in xl.sheet_names:
-        df = pd.read_excel(xl, sheet_name=sheet_name, header=None)
-        # Convert to list of lists; replace NaN with empty string
-        rows = df.fillna("").astype(str).values.tolist()
-        out[sheet_name] = rows
-    return out
+    currency = {}
+    wb = openpyxl.load_workbook(excel_path, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            rows = []
+            cells = []
+            for r_idx, row in enumerate(ws.iter_rows()):
+                rows.append([_sheet_cell_value(cell.value) for cell in row])
+                cells.extend(
+                    (r_idx, c_idx) for c_idx, cell in enumerate(row)
+                    if isinstance(cell.value, (int, float)) and is_currency_format(cell.number_format)
+                )
+            out[ws.title] = rows
+            currency[ws.title] = cells
+    finally:
+        wb.close()
+    return out, currency
 
 
 def _build_combined_sheets(
     financial_xlsx: Optional[Path],
     marketing_xlsx: Optional[Path],
-) -> Tuple[List[str], Dict[str, List[List[Any]]]]:
+) -> Tuple[List[str], Dict[str, List[List[Any]]], Dict[str, List[Tuple[int, int]]]]:
     """
-    Build ordered list of sheet titles and map title -> rows.
+    Build ordered list of sheet titles, map title -> rows and map title -> currency cells.
     Financial sheets first, then marketing. Sheet names are sanitized and de-duplicated.
     """
     seen = set()
     order = []
     data: Dict[str, List[List[Any]]] = {}
+    currency: Dict[str, List[Tuple[int, int]]] = {}
 
-    def add(name: str, rows: List[List[Any]]) -> None:
+    def add(name: str, rows: List[List[Any]], cells: List[Tuple[int, int]]) -> None:
         safe = _sanitize_sheet_title(name)
         if not safe or not rows:
             return
@@ -153,17 +174,49 @@ def _build_combined_sheets(
         seen.add(key)
         order.append(key)
         data[key] = rows
-
-    if financial_xlsx and financial_xlsx.is_file():
-        for sheet_name, rows in _excel_to_sheet_data(financial_xlsx).items():
-            add(sheet_name, rows)
-    if marketing_xlsx and marketing_xlsx.is_file():
-        for sheet_name, rows in _excel_to_sheet_data(marketing_xlsx).items():
-            add(sheet_name, rows)
-
-    return order, data
-
-
+        currency[key] = cells
+
+    for xlsx in (financial_xlsx, marketing_xlsx):
+        if xlsx and xlsx.is_file():
+            sheets, cells = _excel_to_sheet_data(xlsx)
+            for sheet_name, rows in sheets.items():
+                add(sheet_name, rows, cells.get(sheet_name, []))
+
+    return order, data, currency
+
+
+def _currency_format_requests(sheet_id: int, cells: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """repeatCell requests applying the currency number format, one per run of consecutive rows in a column."""
+    requests = []
+    by_column: Dict[int, List[int]] = {}
+    for r, c in cells:
+        by_column.setdefault(c, []).append(r)
+    for c, rows in sorted(by_column.items()):
+        rows.sort()
+        start = prev = rows[0]
+        for r in rows[1:] + [None]:
+            if r is not None and r == prev + 1:
+                prev = r
+                continue
+            requests.append({
+                "repeatCell": {
+                    "range": {
+                        "sheetId": sheet_id,
+                        "startRowIndex": start,
+                        "endRowIndex": prev + 1,
+                        "startColumnIndex": c,
+                        "endColumnIndex": c + 1,
+                    },
+                    "cell": {"userEnteredFormat": {"numberFormat": SHEETS_CURRENCY_FORMAT}},
+                    "fields": "userEnteredFormat.numberFormat",
+                }
+            })
+            if r is not None:
+                start = prev = r
+    return requests
+
+
+@traced("sheets.push")
 def push_to_sheets(
     financial_xlsx_path: Optional[Path] = None,
     marketing_xlsx_path: Optional[Path] = None,
@@ -184,10 +237,11 @@ def push_to_sheets(
     from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
 
-    order, data = _build_combined_sheets(
+    order, data, currency = _build_combined_sheets(
         Path(financial_xlsx_path) if financial_xlsx_path else None,
         Path(marketing_xlsx_path) if marketing_xlsx_path else None,
     )
+    annotate(sheets=len(order), rows=sum(len(rows) for rows in data.values()))
     if not order or not data:
         logger.warning("GooglePusherAgent: No sheet data to push (missing or empty Excel files)")
         return None
@@ -217,6 +271,7 @@ def push_to_sheets(
 
     spreadsheet_id = create_res["spreadsheetId"]
     spreadsheet_url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit"
+    annotate(spreadsheet_id=spreadsheet_id)
 
     # Write data to each sheet
     value_ranges = []
@@ -238,6 +293,25 @@ def push_to_sheets(
         except HttpError as e:
             logger.warning("GooglePusherAgent: Failed to write sheet values: %s", e)
             # Spreadsheet was created; still return link
+
+    # Values are written as numbers; show the dollar columns as $X.XX like the Excel reports
+    sheet_ids = {
+        sheet["properties"]["title"]: sheet["properties"]["sheetId"]
+        for sheet in create_res.get("sheets", [])
+    }
+    format_requests = []
+    for title in order:
+        sheet_id = sheet_ids.get(_sanitize_sheet_title(title))
+        if sheet_id is not None and currency.get(title):
+            format_requests.extend(_currency_format_requests(sheet_id, currency[title]))
+    if format_requests:
+        try:
+            sheets_service.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={"requests": format_requests},
+            ).execute()
+        except HttpError as e:
+            logger.warning("GooglePusherAgent: Failed to apply number formats: %s", e)
     logger.info("GooglePusherAgent: Pushed %s sheets to %s", len(order), spreadsheet_url)
     return {
         "spreadsheet_id": spreadsheet_id,
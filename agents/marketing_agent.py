@@ -10,7 +10,7 @@ import sys
 import zipfile
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +19,10 @@ try:
 except ImportError:
     pd = None
 
+from agents import report_cache
+from agents.excel_writer import ReportWorkbook
+from agents.tracing import annotate, file_size, span, timed, traced
+
 
 def _mock_streamlit() -> None:
     """Install a minimal streamlit mock so analysis-app modules can be imported without Streamlit."""
@@ -41,6 +45,7 @@ def _is_zip(path: Path) -> bool:
         return f.read(4) == b"PK\x03\x04"
 
 
+@traced("marketing.extract")
 def _extract_marketing_zip(zip_path: Path, output_dir: Path) -> Optional[Path]:
     """
     Extract marketing ZIP to output_dir/marketing_extract_<timestamp>.
@@ -52,6 +57,7 @@ def _extract_marketing_zip(zip_path: Path, output_dir: Path) -> Optional[Path]:
     extract_dir.mkdir(parents=True, exist_ok=True)
     with zipfile.ZipFile(zip_path, "r") as z:
         z.extractall(extract_dir)
+        annotate(files=len(z.namelist()), bytes=sum(i.file_size for i in z.infolist()))
     # Check structure: any dir named marketing_*?
     subdirs = [d for d in extract_dir.iterdir() if d.is_dir() and d.name.lower().startswith("marketing_")]
     if subdirs:
@@ -74,6 +80,7 @@ def _extract_marketing_zip(zip_path: Path, output_dir: Path) -> Optional[Path]:
     return extract_dir
 
 
+@traced("marketing.workbook")
 def _write_marketing_excel(
     output_dir: Path,
     promotion_table,
@@ -87,20 +94,11 @@ def _write_marketing_excel(
     operator_name: Optional[str] = None,
 ) -> Path:
     """Write promotion, sponsored, combined, by-campaign, and by-store tables to an Excel file. Returns path to file."""
-    try:
-        import openpyxl
-    except ImportError:
-        raise RuntimeError("openpyxl is required. Install with: pip install openpyxl")
-    from openpyxl import Workbook
-    from openpyxl.styles import Font
-    from openpyxl.utils.dataframe import dataframe_to_rows
-
-    wb = Workbook()
-    wb.remove(wb.active)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     tag = (operator_name.strip() if operator_name and isinstance(operator_name, str) else None)
     filename = f"{tag}_marketing_analysis_{timestamp}.xlsx" if tag else f"marketing_analysis_{timestamp}.xlsx"
     filepath = output_dir / filename
+    book = ReportWorkbook(filepath)
 
     def _normalize_store_column(df):
         """Rename Store ID / Merchant store ID to Merchant Store ID for consistent output."""
@@ -113,87 +111,53 @@ def _write_marketing_excel(
                 break
         return out
 
-    def add_sheet(ws, df, title):
+    def add_sheet(name, df, title):
+        """Title in row 1, table (header in row 3) below it; skipped when df is empty."""
         if df is None or (hasattr(df, "empty") and df.empty):
             return
         if hasattr(df, "reset_index") and df.index.name:
             df_export = df.reset_index()
         else:
             df_export = df
-        df_export = _normalize_store_column(df_export)
-        for r_idx, row in enumerate(dataframe_to_rows(df_export, index=False, header=True), start=1):
-            for c_idx, value in enumerate(row, start=1):
-                cell = ws.cell(row=r_idx, column=c_idx, value=value)
-                if r_idx == 1:
-                    cell.font = Font(bold=True)
+        book.add_sheet(name, _normalize_store_column(df_export), title)
 
-    if combined_table is not None and not (getattr(combined_table, "empty", True)):
-        ws = wb.create_sheet("Corporate vs TODC (Combined)")
-        ws.cell(row=1, column=1, value="Combined: Corporate vs TODC").font = Font(bold=True, size=12)
-        add_sheet(ws, combined_table, "Combined")
-    if promotion_table is not None and not (getattr(promotion_table, "empty", True)):
-        ws = wb.create_sheet("Promotion")
-        ws.cell(row=1, column=1, value="Promotion by Campaign").font = Font(bold=True, size=12)
-        add_sheet(ws, promotion_table, "Promotion")
-    if sponsored_table is not None and not (getattr(sponsored_table, "empty", True)):
-        ws = wb.create_sheet("Sponsored Listing")
-        ws.cell(row=1, column=1, value="Sponsored Listing by Campaign").font = Font(bold=True, size=12)
-        add_sheet(ws, sponsored_table, "Sponsored")
-    if promotion_by_campaign is not None and not (getattr(promotion_by_campaign, "empty", True)):
-        ws = wb.create_sheet("Promotion by Campaign Name")
-        ws.cell(row=1, column=1, value="Promotion: Campaign name, Spend, Sales, Orders, ROAS, Cost per Order").font = Font(bold=True, size=12)
-        add_sheet(ws, promotion_by_campaign, "Promotion by Campaign")
-    if promotion_by_store is not None and not (getattr(promotion_by_store, "empty", True)):
-        ws = wb.create_sheet("Promotion by Store")
-        ws.cell(row=1, column=1, value="Promotion: Merchant Store ID, Spend, Sales, Orders, ROAS, Cost per Order").font = Font(bold=True, size=12)
-        add_sheet(ws, promotion_by_store, "Promotion by Store")
-    if sponsored_by_campaign is not None and not (getattr(sponsored_by_campaign, "empty", True)):
-        ws = wb.create_sheet("Sponsored by Campaign Name")
-        ws.cell(row=1, column=1, value="Sponsored: Campaign name, Spend, Sales, Orders, ROAS, Cost per Order").font = Font(bold=True, size=12)
-        add_sheet(ws, sponsored_by_campaign, "Sponsored by Campaign")
-    if sponsored_by_store is not None and not (getattr(sponsored_by_store, "empty", True)):
-        ws = wb.create_sheet("Sponsored by Store")
-        ws.cell(row=1, column=1, value="Sponsored: Merchant Store ID, Spend, Sales, Orders, ROAS, Cost per Order").font = Font(bold=True, size=12)
-        add_sheet(ws, sponsored_by_store, "Sponsored by Store")
-    if store_wise_marketing is not None and not (getattr(store_wise_marketing, "empty", True)):
-        ws = wb.create_sheet("Store-wise")
-        ws.cell(row=1, column=1, value="Store-wise (Combined): Merchant Store ID, Orders, Sales, Spend, ROAS, Cost per Order").font = Font(bold=True, size=12)
-        add_sheet(ws, store_wise_marketing, "Store-wise")
-    if not wb.sheetnames:
-        ws = wb.create_sheet("Summary")
-        ws.cell(row=1, column=1, value="No marketing data found for the selected date range.")
-
-    wb.save(filepath)
+    add_sheet("Corporate vs TODC (Combined)", combined_table, "Combined: Corporate vs TODC")
+    add_sheet("Promotion", promotion_table, "Promotion by Campaign")
+    add_sheet("Sponsored Listing", sponsored_table, "Sponsored Listing by Campaign")
+    add_sheet("Promotion by Campaign Name", promotion_by_campaign, "Promotion: Campaign name, Spend, Sales, Orders, ROAS, Cost per Order")
+    add_sheet("Promotion by Store", promotion_by_store, "Promotion: Merchant Store ID, Spend, Sales, Orders, ROAS, Cost per Order")
+    add_sheet("Sponsored by Campaign Name", sponsored_by_campaign, "Sponsored: Campaign name, Spend, Sales, Orders, ROAS, Cost per Order")
+    add_sheet("Sponsored by Store", sponsored_by_store, "Sponsored: Merchant Store ID, Spend, Sales, Orders, ROAS, Cost per Order")
+    add_sheet("Store-wise", store_wise_marketing, "Store-wise (Combined): Merchant Store ID, Orders, Sales, Spend, ROAS, Cost per Order")
+    if not book.sheet_names:
+        book.add_sheet("Summary", title="No marketing data found for the selected date range.")
+
+    book.save()
     logger.info("MarketingAgent: Wrote %s", filepath.name)
     return filepath
 
 
-def run(
+# Keys of the dict returned by _compute_marketing_tables (and stored in report_cache)
+MARKETING_TABLES = [
+    "promotion_table",
+    "sponsored_table",
+    "combined_table",
+    "promotion_by_campaign",
+    "promotion_by_store",
+    "sponsored_by_campaign",
+    "sponsored_by_store",
+    "store_wise_marketing",
+]
+
+
+def _compute_marketing_tables(
     downloaded_path: Path,
     output_dir: Path,
     post_start_date: str,
     post_end_date: str,
-    excluded_dates: Optional[list] = None,
-    operator_name: Optional[str] = None,
-    write_file: bool = True,
-):
-    """
-    Run marketing analysis on the downloaded report. If it's a ZIP, extract it first.
-    Uses analysis-app marketing_analysis.create_corporate_vs_todc_table.
-    If write_file=True, writes marketing_analysis_<timestamp>.xlsx and returns path.
-    If write_file=False, returns list of (sheet_name, DataFrame) for combined report.
-    """
-    if pd is None:
-        raise RuntimeError("pandas is required for MarketingAgent. Install with: pip install pandas")
-    try:
-        import openpyxl  # noqa: F401
-    except ImportError:
-        raise RuntimeError("openpyxl is required. Install with: pip install openpyxl")
-
-    downloaded_path = Path(downloaded_path)
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
+    excluded_dates: list,
+) -> Optional[Dict[str, object]]:
+    """Extract the download if needed and build every marketing table with analysis-app. None on failure."""
     # Resolve marketing folder: extract ZIP if needed
     if downloaded_path.is_file() and _is_zip(downloaded_path):
         marketing_folder = _extract_marketing_zip(downloaded_path, output_dir)
@@ -228,7 +192,6 @@ def run(
         logger.warning("MarketingAgent: Failed to import marketing_analysis: %s", e)
         return None
 
-    excluded_dates = excluded_dates or []
     kwargs = dict(
         excluded_dates=excluded_dates,
         post_start_date=post_start_date,
@@ -236,7 +199,9 @@ def run(
         marketing_folder_path=marketing_folder,
     )
     try:
-        promotion_table, sponsored_table, combined_table = create_corporate_vs_todc_table(
+        promotion_table, sponsored_table, combined_table = timed(
+            "marketing.corporate_vs_todc",
+            create_corporate_vs_todc_table,
             excluded_dates=excluded_dates,
             pre_start_date=post_start_date,
             pre_end_date=post_end_date,
@@ -250,14 +215,80 @@ def run(
 
     promotion_by_campaign = promotion_by_store = sponsored_by_campaign = sponsored_by_store = store_wise_marketing = None
     try:
-        promotion_by_campaign = get_promotion_by_campaign_table(**kwargs)
-        promotion_by_store = get_promotion_by_store_table(**kwargs)
-        sponsored_by_campaign = get_sponsored_by_campaign_table(**kwargs)
-        sponsored_by_store = get_sponsored_by_store_table(**kwargs)
-        store_wise_marketing = get_marketing_by_store_combined(**kwargs)
+        promotion_by_campaign = timed("marketing.promotion_by_campaign", get_promotion_by_campaign_table, **kwargs)
+        promotion_by_store = timed("marketing.promotion_by_store", get_promotion_by_store_table, **kwargs)
+        sponsored_by_campaign = timed("marketing.sponsored_by_campaign", get_sponsored_by_campaign_table, **kwargs)
+        sponsored_by_store = timed("marketing.sponsored_by_store", get_sponsored_by_store_table, **kwargs)
+        store_wise_marketing = timed("marketing.store_wise", get_marketing_by_store_combined, **kwargs)
     except Exception as e:
         logger.debug("MarketingAgent: By-campaign/by-store tables failed (non-fatal): %s", e)
 
+    return {
+        "promotion_table": promotion_table,
+        "sponsored_table": sponsored_table,
+        "combined_table": combined_table,
+        "promotion_by_campaign": promotion_by_campaign,
+        "promotion_by_store": promotion_by_store,
+        "sponsored_by_campaign": sponsored_by_campaign,
+        "sponsored_by_store": sponsored_by_store,
+        "store_wise_marketing": store_wise_marketing,
+    }
+
+
+@traced("marketing.analysis")
+def run(
+    downloaded_path: Path,
+    output_dir: Path,
+    post_start_date: str,
+    post_end_date: str,
+    excluded_dates: Optional[list] = None,
+    operator_name: Optional[str] = None,
+    write_file: bool = True,
+    use_cache: bool = True,
+):
+    """
+    Run marketing analysis on the downloaded report. If it's a ZIP, extract it first.
+    Uses analysis-app marketing_analysis.create_corporate_vs_todc_table.
+    If write_file=True, writes marketing_analysis_<timestamp>.xlsx and returns path.
+    If write_file=False, returns list of (sheet_name, DataFrame) for combined report.
+    If use_cache=True (and pyarrow is installed), the tables are cached by the download's SHA-256 and date range.
+    """
+    if pd is None:
+        raise RuntimeError("pandas is required for MarketingAgent. Install with: pip install pandas")
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        raise RuntimeError("openpyxl is required. Install with: pip install openpyxl")
+
+    downloaded_path = Path(downloaded_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    excluded_dates = excluded_dates or []
+
+    key = None
+    if use_cache and report_cache.available() and downloaded_path.exists():
+        key = report_cache.cache_key(
+            downloaded_path, "marketing_tables",
+            post_start_date=post_start_date, post_end_date=post_end_date, excluded_dates=sorted(map(str, excluded_dates)),
+        )
+    with span("marketing.load", bytes=file_size(downloaded_path)) as s:
+        cached = report_cache.load_frames(downloaded_path, key) if key else None
+        s.set(cached=bool(cached))
+        if cached:
+            tables = dict.fromkeys(MARKETING_TABLES)
+            tables.update(cached[0])
+        else:
+            tables = _compute_marketing_tables(downloaded_path, output_dir, post_start_date, post_end_date, excluded_dates)
+            if tables is None:
+                return None
+            frames = {name: t for name, t in tables.items() if t is not None}
+            if key and all(isinstance(t, pd.DataFrame) for t in frames.values()):
+                report_cache.save_frames(downloaded_path, key, frames)
+    promotion_table, sponsored_table, combined_table = tables["promotion_table"], tables["sponsored_table"], tables["combined_table"]
+    promotion_by_campaign, promotion_by_store = tables["promotion_by_campaign"], tables["promotion_by_store"]
+    sponsored_by_campaign, sponsored_by_store = tables["sponsored_by_campaign"], tables["sponsored_by_store"]
+    store_wise_marketing = tables["store_wise_marketing"]
+
     sheets_list: List[Tuple[str, object]] = []
     if combined_table is not None and not (getattr(combined_table, "empty", True)):
         sheets_list.append(("Corporate vs TODC (Combined)", combined_table))
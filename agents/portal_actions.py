@@ -0,0 +1,440 @@
+"""
+Deterministic custom actions (browser-use tools) for the Merchant Portal widgets the LLM agent spends most of
+its steps on:
+
+  - two_step_login(email, password): email screen, "Continue to Log In", password screen, "Log In".
+  - set_report_date_range(start_date, end_date): "By date range" and both date fields of the report modal.
+  - set_schedule_cells(cells): the "Set custom schedule" grid; ticks exactly the given [day, slot] cells and
+    clears every other one (no Weekdays / Weekends clearing clicks).
+  - set_incentive(percent, min_subtotal): "%" off, the percentage, a custom minimum subtotal and the lowest
+    maximum discount in the Customer incentive modal.
+
+Each action does its whole interaction in one step by running a script in the page, and reads the result
+back; when the page does not look as expected it returns an error and the task templates tell the agent to
+do those steps by hand. portal_agent_kwargs() is passed to every Agent; the *_hint() functions give the task
+template lines. PORTAL_ACTIONS=0 turns the actions (and the hints) off.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import List, Tuple
+
+from agents.time_slots import SLOT_ORDER
+from agents.tracing import span
+
+logger = logging.getLogger(__name__)
+
+LOGIN_URL = "https://merchant-portal.doordash.com/merchant/login"
+REPORTS_URL = "https://merchant-portal.doordash.com/merchant/reports"
+# Seconds to wait for the next login screen / for the portal to leave the login page
+LOGIN_WAIT_SEC = 20
+# Seconds for the session check to see either the portal or the login page
+SESSION_CHECK_SEC = 15
+POLL_SEC = 0.5
+
+# Runs in the page: payload is a JSON string {"op": ..., ...}; returns a JSON string.
+_PAGE_SCRIPT = r"""
+(payload) => {
+  const p = JSON.parse(payload);
+  const norm = (s) => (s || "").replace(/\s+/g, " ").trim().toLowerCase();
+  const box = (el) => {
+    // Custom checkboxes hide the input; use the nearest ancestor that has a size
+    for (let e = el; e && e !== document.body; e = e.parentElement) {
+      const r = e.getBoundingClientRect();
+      if (r.width > 0 && r.height > 0) return r;
+    }
+    return null;
+  };
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0 && getComputedStyle(el).visibility !== "hidden";
+  };
+  const scope = () => {
+    const dialogs = [...document.querySelectorAll('[role="dialog"], [aria-modal="true"]')].filter(visible);
+    return dialogs.length ? dialogs[dialogs.length - 1] : document.body;
+  };
+  const CLICKABLE = 'button, a, label, [role="button"], [role="radio"], [role="tab"], [role="option"], [role="checkbox"], input[type="radio"]';
+  const byText = (root, texts, selector) => {
+    const wanted = texts.map(norm);
+    const els = [...root.querySelectorAll(selector || CLICKABLE)].filter((el) => box(el));
+    return els.find((el) => wanted.includes(norm(el.innerText || el.value || el.getAttribute("aria-label"))))
+      || els.find((el) => wanted.some((t) => norm(el.innerText || el.getAttribute("aria-label")).startsWith(t)));
+  };
+  const labelEl = (root, texts) => {
+    const wanted = texts.map(norm);
+    return [...root.querySelectorAll("label, span, p, div, h1, h2, h3, h4, legend")]
+      .filter((el) => visible(el) && el.children.length <= 2)
+      .find((el) => wanted.some((t) => norm(el.innerText).startsWith(t)));
+  };
+  const INPUTS = 'input:not([type="hidden"]):not([type="checkbox"]):not([type="radio"]), textarea';
+  const inputAfter = (root, el) => {
+    if (!el) return null;
+    if (el.htmlFor) return document.getElementById(el.htmlFor);
+    const inner = el.querySelector && el.querySelector(INPUTS);
+    if (inner) return inner;
+    return [...root.querySelectorAll(INPUTS)].filter(visible)
+      .find((i) => el.compareDocumentPosition(i) & Node.DOCUMENT_POSITION_FOLLOWING) || null;
+  };
+  const setValue = (input, value) => {
+    const proto = input instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    input.focus();
+    Object.getOwnPropertyDescriptor(proto, "value").set.call(input, value);
+    for (const type of ["input", "change"]) input.dispatchEvent(new Event(type, { bubbles: true }));
+    input.blur();
+    return input.value;
+  };
+  const isChecked = (el) => el.checked === true || el.getAttribute("aria-checked") === "true";
+  const click = (el) => { el.scrollIntoView({ block: "center" }); el.click(); };
+
+  const ops = {
+    has(p) {
+      return { ok: p.selectors.some((s) => [...document.querySelectorAll(s)].some(visible)) };
+    },
+    session(p) {
+      const login = !location.hostname.startsWith("merchant-portal.") || /login|sign-?in/i.test(location.pathname)
+        || [...document.querySelectorAll('input[type="password"]')].some(visible);
+      const portal = !login && document.readyState === "complete"
+        && [...document.querySelectorAll('nav a[href], aside a[href], a[href*="/merchant/"]')].some(visible);
+      return { ok: true, login, portal, url: location.href };
+    },
+    fill(p) {
+      let input = null;
+      for (const s of p.selectors) {
+        input = [...document.querySelectorAll(s)].find(visible);
+        if (input) break;
+      }
+      if (!input) return { ok: false, error: "field not found: " + p.selectors.join(", ") };
+      setValue(input, p.value);
+      return { ok: input.value === p.value };
+    },
+    click(p) {
+      const el = byText(scope(), p.texts, p.selector);
+      if (!el) return { ok: false, error: "not found: " + p.texts.join(" / ") };
+      click(el);
+      return { ok: true };
+    },
+    date_range(p) {
+      const root = scope();
+      const byRange = byText(root, ["By date range"]);
+      if (byRange) click(byRange);
+      let start = inputAfter(root, labelEl(root, ["Start date", "Start"]));
+      let end = inputAfter(root, labelEl(root, ["End date", "End"]));
+      if (!start || !end || start === end) {
+        const dates = [...root.querySelectorAll(INPUTS)].filter(visible)
+          .filter((i) => i.type === "date" || /date|mm|dd/i.test(i.placeholder + i.name + (i.getAttribute("aria-label") || "")));
+        [start, end] = dates;
+      }
+      if (!start || !end) return { ok: false, error: "start/end date fields not found in the report modal" };
+      const asValue = (d) => {
+        if (start.type !== "date") return d;
+        const [m, day, y] = d.split("/");
+        return `${y}-${m.padStart(2, "0")}-${day.padStart(2, "0")}`;
+      };
+      const got = [setValue(start, asValue(p.start)), setValue(end, asValue(p.end))];
+      return { ok: got[0] === asValue(p.start) && got[1] === asValue(p.end), values: got };
+    },
+    schedule(p) {
+      const root = scope();
+      const days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"];
+      const isDay = (t) => t.length >= 3 && days.some((d) => d.startsWith(t.replace(/\.$/, "")));
+      const slots = p.slots.map(norm);
+      const texts = [...root.querySelectorAll("th, td, div, span, p, label")].filter((el) => visible(el) && !el.querySelector("input"));
+      const heads = texts.filter((el) => isDay(norm(el.innerText)));
+      const rows = texts.filter((el) => slots.includes(norm(el.innerText).split(" (")[0]) || slots.some((s) => norm(el.innerText).startsWith(s + " ")));
+      if (!heads.length || !rows.length) return { ok: false, error: "schedule grid (day columns / slot rows) not found" };
+      const center = (r) => [r.left + r.width / 2, r.top + r.height / 2];
+      const nearest = (els, pos, axis) => {
+        let best = null, dist = Infinity;
+        for (const el of els) {
+          const r = el.getBoundingClientRect(), d = Math.abs(center(r)[axis] - pos);
+          if (d < dist) { best = el; dist = d; }
+        }
+        const r = best.getBoundingClientRect();
+        return dist <= Math.max(axis ? r.height : r.width, 24) ? best : null;
+      };
+      const cells = {};
+      for (const cb of root.querySelectorAll('input[type="checkbox"], [role="checkbox"]')) {
+        const r = box(cb);
+        if (!r) continue;
+        const [x, y] = center(r);
+        const head = nearest(heads, x, 0), row = nearest(rows, y, 1);
+        if (!head || !row) continue;
+        const slot = p.slots.find((s) => norm(row.innerText).startsWith(norm(s)));
+        const key = norm(head.innerText).slice(0, 3) + "|" + norm(slot);
+        if (!(key in cells)) cells[key] = cb;
+      }
+      const want = new Set(p.cells.map(([d, s]) => norm(d).slice(0, 3) + "|" + norm(s)));
+      const missing = [...want].filter((k) => !(k in cells));
+      if (missing.length) return { ok: false, error: "cells not found in the grid: " + missing.join(", ") };
+      let toggled = 0;
+      if (p.apply) {
+        for (const [key, cb] of Object.entries(cells)) {
+          if (isChecked(cb) !== want.has(key)) {
+            const target = cb.getBoundingClientRect().width ? cb : (cb.closest("label") || cb.parentElement);
+            click(target);
+            toggled += 1;
+          }
+        }
+      }
+      const selected = Object.entries(cells).filter(([, cb]) => isChecked(cb)).map(([key]) => key).sort();
+      return { ok: selected.join(",") === [...want].sort().join(","), selected, toggled, grid: Object.keys(cells).length };
+    },
+    incentive(p) {
+      const root = scope();
+      const pct = byText(root, ["%", "Percentage", "% off"]);
+      if (pct) click(pct);
+      const pctInput = inputAfter(root, labelEl(root, ["Percentage", "Discount", "% off"]))
+        || [...root.querySelectorAll(INPUTS)].find(visible);
+      if (!pctInput) return { ok: false, error: "percentage field not found" };
+      setValue(pctInput, String(p.percent));
+      const minLabel = labelEl(root, ["Minimum subtotal"]);
+      if (!minLabel) return { ok: false, error: "Minimum subtotal section not found" };
+      const after = (el) => minLabel.compareDocumentPosition(el) & Node.DOCUMENT_POSITION_FOLLOWING;
+      const custom = [...root.querySelectorAll(CLICKABLE)].filter((el) => box(el) && after(el))
+        .find((el) => norm(el.innerText || el.getAttribute("aria-label") || el.value) === "custom");
+      if (!custom) return { ok: false, error: '"Custom" minimum subtotal option not found' };
+      click(custom);
+      const minInput = inputAfter(root, custom);
+      if (!minInput || minInput === pctInput) return { ok: false, error: "minimum subtotal amount field not found" };
+      setValue(minInput, String(p.min_subtotal));
+      const maxLabel = labelEl(root, ["Maximum discount"]);
+      if (maxLabel) {
+        const first = [...root.querySelectorAll(CLICKABLE)].filter((el) => box(el))
+          .filter((el) => maxLabel.compareDocumentPosition(el) & Node.DOCUMENT_POSITION_FOLLOWING)
+          .sort((a, b) => box(a).top - box(b).top || box(a).left - box(b).left)[0];
+        if (first) click(first);
+      }
+      return { ok: pctInput.value === String(p.percent) && minInput.value === String(p.min_subtotal), percent: pctInput.value, min_subtotal: minInput.value };
+    },
+  };
+  try {
+    return JSON.stringify(ops[p.op](p));
+  } catch (e) {
+    return JSON.stringify({ ok: false, error: String(e) });
+  }
+}
+"""
+
+_tools = None
+
+
+def portal_actions_enabled() -> bool:
+    return os.getenv("PORTAL_ACTIONS", "1").strip().lower() not in ("0", "false", "no")
+
+
+async def _page(browser_session):
+    for name in ("must_get_current_page", "get_current_page"):
+        method = getattr(browser_session, name, None)
+        if callable(method):
+            page = await method()
+            if page is not None:
+                return page
+    raise RuntimeError("no open page")
+
+
+async def _run(browser_session, op: str, **args) -> dict:
+    """Run _PAGE_SCRIPT's op in the current page; returns its result dict."""
+    page = await _page(browser_session)
+    result = await page.evaluate(_PAGE_SCRIPT, json.dumps({"op": op, **args}))
+    return json.loads(result) if isinstance(result, str) else dict(result or {})
+
+
+async def _wait_for(browser_session, selectors: List[str], present: bool = True) -> bool:
+    """Poll until an element matching selectors is visible (present=False: until none is); False on timeout."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LOGIN_WAIT_SEC
+    while loop.time() < deadline:
+        try:
+            if bool((await _run(browser_session, "has", selectors=selectors)).get("ok")) == present:
+                return True
+        except Exception:
+            # The page is navigating
+            pass
+        await asyncio.sleep(POLL_SEC)
+    return False
+
+
+async def _checked(browser_session, op: str, **args) -> dict:
+    result = await _run(browser_session, op, **args)
+    if not result.get("ok"):
+        raise RuntimeError(result.get("error") or f"page shows {result}")
+    return result
+
+
+async def _goto(browser_session, url: str) -> None:
+    page = await _page(browser_session)
+    if callable(getattr(page, "goto", None)):
+        await page.goto(url)
+    else:
+        await browser_session.navigate_to(url)
+
+
+async def portal_session_valid(browser, url: str = REPORTS_URL) -> bool:
+    """
+    Whether browser (started on a persistent profile) is still logged in to the portal, without the LLM: opens
+    url and waits until the portal either shows it (True; the browser stays there) or redirects to the login.
+    """
+    with span("portal.session_check") as s:
+        valid = False
+        try:
+            start = getattr(browser, "start", None)
+            if callable(start):
+                await start()
+            await _goto(browser, url)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + SESSION_CHECK_SEC
+            while loop.time() < deadline:
+                try:
+                    state = await _run(browser, "session")
+                except Exception:
+                    # The page is navigating (e.g. redirecting to the login)
+                    state = {}
+                if state.get("login"):
+                    break
+                if state.get("portal"):
+                    valid = True
+                    break
+                await asyncio.sleep(POLL_SEC)
+        except Exception as e:
+            logger.info("PortalActions: session check failed: %s", e)
+        s.set(valid=valid)
+    return valid
+
+
+async def _two_step_login(browser_session, email: str, password: str) -> str:
+    await _goto(browser_session, LOGIN_URL)
+    email_fields = ['input[type="email"]', 'input[name*="email" i]', 'input[autocomplete="username"]']
+    password_fields = ['input[type="password"]']
+    if not await _wait_for(browser_session, email_fields):
+        raise RuntimeError("email field did not appear")
+    await _checked(browser_session, "fill", selectors=email_fields, value=email)
+    await _checked(browser_session, "click", texts=["Continue to Log In", "Continue"])
+    if not await _wait_for(browser_session, password_fields):
+        raise RuntimeError("password screen did not appear")
+    await _checked(browser_session, "fill", selectors=password_fields, value=password)
+    await _checked(browser_session, "click", texts=["Log In", "Sign in"])
+    # Logged in once the password field is gone (the dashboard has loaded)
+    if not await _wait_for(browser_session, password_fields, present=False):
+        raise RuntimeError("still on the password screen after Log In (wrong password or a verification step?)")
+    return "Logged in."
+
+
+async def _set_report_date_range(browser_session, start_date: str, end_date: str) -> str:
+    await _checked(browser_session, "date_range", start=start_date, end=end_date)
+    return f"Report date range set to {start_date} - {end_date}."
+
+
+async def _set_schedule_cells(browser_session, cells: List[List[str]]) -> str:
+    cells = [[str(c[0]), str(c[1])] for c in cells]
+    result = await _run(browser_session, "schedule", cells=cells, slots=SLOT_ORDER, apply=True)
+    if result.get("error"):
+        raise RuntimeError(result["error"])
+    await asyncio.sleep(POLL_SEC)
+    # Read the grid back once the clicks have re-rendered it
+    await _checked(browser_session, "schedule", cells=cells, slots=SLOT_ORDER, apply=False)
+    return f"Schedule set to {len(cells)} cells: " + "; ".join(f"{d} {s}" for d, s in cells) + "."
+
+
+async def _set_incentive(browser_session, percent: int, min_subtotal: int) -> str:
+    await _checked(browser_session, "incentive", percent=int(percent), min_subtotal=int(min_subtotal))
+    return f"Incentive set to {percent}% off, minimum subtotal ${min_subtotal}, lowest maximum discount."
+
+
+def portal_tools():
+    """browser-use Tools (Controller in older versions) with the portal actions registered; None if unavailable."""
+    global _tools
+    if _tools is not None:
+        return _tools
+    try:
+        from browser_use import ActionResult, BrowserSession
+
+        try:
+            from browser_use import Tools
+        except ImportError:
+            from browser_use import Controller as Tools
+    except ImportError:
+        return None
+
+    tools = Tools()
+
+    async def act(name: str, coro) -> ActionResult:
+        with span("portal.action", action=name) as s:
+            try:
+                message = await coro
+            except Exception as e:
+                s.set(action_error=str(e))
+                logger.info("PortalActions: %s failed: %s", name, e)
+                return ActionResult(error=f"{name} failed: {e}. Do these steps by hand instead.")
+        return ActionResult(extracted_content=message, long_term_memory=message)
+
+    @tools.action("Log in to the DoorDash Merchant Portal in one step (email, Continue to Log In, password, Log In).")
+    async def two_step_login(email: str, password: str, browser_session: BrowserSession) -> ActionResult:
+        return await act("two_step_login", _two_step_login(browser_session, email, password))
+
+    @tools.action("In the open Create report modal: choose By date range and set the start and end dates (MM/DD/YYYY).")
+    async def set_report_date_range(start_date: str, end_date: str, browser_session: BrowserSession) -> ActionResult:
+        return await act("set_report_date_range", _set_report_date_range(browser_session, start_date, end_date))
+
+    @tools.action('In the open Set custom schedule modal: select exactly these [day, slot] cells (e.g. [["Mon", "Lunch"]]), clearing all others.')
+    async def set_schedule_cells(cells: List[List[str]], browser_session: BrowserSession) -> ActionResult:
+        return await act("set_schedule_cells", _set_schedule_cells(browser_session, cells))
+
+    @tools.action("In the open Customer incentive modal: % off with this percentage, a Custom minimum subtotal in dollars, lowest maximum discount.")
+    async def set_incentive(percent: int, min_subtotal: int, browser_session: BrowserSession) -> ActionResult:
+        return await act("set_incentive", _set_incentive(browser_session, percent, min_subtotal))
+
+    _tools = tools
+    return tools
+
+
+def portal_agent_kwargs() -> dict:
+    """Keyword arguments for browser_use.Agent that register the portal actions ({} when they are off)."""
+    if not portal_actions_enabled():
+        return {}
+    tools = portal_tools()
+    if tools is None:
+        return {}
+    return {"tools": tools} if type(tools).__name__ == "Tools" else {"controller": tools}
+
+
+def login_hint(email: str, password: str) -> str:
+    """Task line (before the manual login steps) telling the agent to use two_step_login; "" when off."""
+    if not portal_actions_enabled():
+        return ""
+    return (
+        f'Use the two_step_login action with email="{email}" and password="{password}"; it does the whole login in one step. '
+        "Only if it returns an error, log in by hand as follows.\n"
+    )
+
+
+def date_range_step(start_date: str, end_date: str) -> str:
+    """Task sentence for setting a report's date range."""
+    if not portal_actions_enabled():
+        return f'Choose "By date range". Set Start date: {start_date}, End date: {end_date}.'
+    return (
+        f'Use the set_report_date_range action with start_date="{start_date}" and end_date="{end_date}" (only if it '
+        f'returns an error, choose "By date range" and set Start date {start_date} and End date {end_date} by hand).'
+    )
+
+
+def schedule_hint(cells: List[Tuple[str, str]]) -> str:
+    """Task bullet (before the manual schedule bullets) telling the agent to use set_schedule_cells; "" when off."""
+    if not portal_actions_enabled():
+        return ""
+    listed = json.dumps([[day[:3], slot] for day, slot in cells])
+    return (
+        f"   - Use the set_schedule_cells action with cells={listed}; it clears the grid and selects exactly those cells "
+        "in one step. Only if it returns an error, do the next two points by hand.\n"
+    )
+
+
+def incentive_hint(percent: int, min_subtotal: int) -> str:
+    """Task sentence (before the manual incentive steps) telling the agent to use set_incentive; "" when off."""
+    if not portal_actions_enabled():
+        return ""
+    return (
+        f' Use the set_incentive action with percent={percent} and min_subtotal={min_subtotal}, then click "Save".'
+        " Only if it returns an error, do it by hand:"
+    )
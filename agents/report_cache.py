@@ -0,0 +1,128 @@
+"""
+Content-addressed cache of parsed report data.
+
+A downloaded report (ZIP, CSV or folder) is keyed by the SHA-256 of its bytes, plus the kind of data and
+any parameters that shape it. The parsed, typed frames are written uncompressed as Arrow IPC (Feather v2)
+files under <download dir>/.report_cache/<key>/, so a retry or re-analysis of the same download
+memory-maps them instead of parsing the CSVs again.
+
+Needs pyarrow; without it (or with REPORT_CACHE=0) nothing is cached and callers parse as before.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+CACHE_DIR_NAME = ".report_cache"
+# Bump when the layout of cached frames changes so older entries are ignored
+CACHE_VERSION = 2
+_MANIFEST = "manifest.json"
+_HASH_BLOCK_BYTES = 1 << 20
+
+
+def available() -> bool:
+    """True if pandas and pyarrow are installed and REPORT_CACHE is not turned off."""
+    enabled = os.getenv("REPORT_CACHE", "1").strip().lower() not in ("0", "false", "no")
+    return enabled and pd is not None and feather is not None
+
+
+def content_sha256(path: Path) -> str:
+    """SHA-256 of a file's bytes; for a folder, of every file in it (relative path and bytes, in sorted order)."""
+    path = Path(path)
+    h = hashlib.sha256()
+    if path.is_file():
+        files = [path]
+    else:
+        files = sorted(p for p in path.rglob("*") if p.is_file() and CACHE_DIR_NAME not in p.parts)
+    for f in files:
+        if f != path:
+            h.update(f.relative_to(path).as_posix().encode())
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(_HASH_BLOCK_BYTES), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(source: Path, kind: str, **params) -> str:
+    """Key for `kind` data parsed from `source` with `params` (e.g. a date range)."""
+    payload = {"version": CACHE_VERSION, "kind": kind, "sha256": content_sha256(source), "params": params}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def cache_dir_for(source: Path) -> Path:
+    """Cache folder next to the download."""
+    return Path(source).resolve().parent / CACHE_DIR_NAME
+
+
+def save_frames(source: Path, key: str, frames: Dict[str, "pd.DataFrame"], meta: Optional[dict] = None) -> bool:
+    """
+    Store named DataFrames (and JSON-serializable meta) under `key`. Non-default indexes are kept.
+    Returns False, leaving nothing behind, if any frame cannot be written as Arrow.
+    """
+    target = cache_dir_for(source) / key
+    if (target / _MANIFEST).is_file():
+        return True
+    tmp = None
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=target.parent))
+        entries = []
+        for i, (name, df) in enumerate(frames.items()):
+            if not all(isinstance(c, str) for c in df.columns):
+                raise ValueError(f"frame {name!r} has non-string column labels")
+            index_cols, index_names = [], []
+            if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1 and df.index.name is None):
+                index_names = list(df.index.names)
+                df = df.reset_index()
+                index_cols = list(df.columns[: len(index_names)])
+            filename = f"{i}.arrow"
+            feather.write_feather(df, tmp / filename, compression="uncompressed")
+            entries.append({"name": name, "file": filename, "index": index_cols, "index_names": index_names})
+        (tmp / _MANIFEST).write_text(json.dumps({"frames": entries, "meta": meta or {}}, default=str))
+        os.replace(tmp, target)
+        logger.info("ReportCache: Cached %s (%s)", Path(source).name, key[:12])
+        return True
+    except Exception as e:
+        logger.warning("ReportCache: Could not cache %s: %s", Path(source).name, e)
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return False
+
+
+def load_frames(source: Path, key: str) -> Optional[Tuple[Dict[str, "pd.DataFrame"], dict]]:
+    """Memory-map the frames stored under `key`; returns (frames by name, meta) or None on a miss."""
+    entry = cache_dir_for(source) / key
+    manifest_path = entry / _MANIFEST
+    if not manifest_path.is_file():
+        return None
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        frames = {}
+        for item in manifest["frames"]:
+            df = feather.read_table(entry / item["file"], memory_map=True).to_pandas()
+            if item["index"]:
+                df = df.set_index(item["index"])
+                df.index.names = item["index_names"]
+            frames[item["name"]] = df
+    except Exception as e:
+        logger.warning("ReportCache: Ignoring unreadable cache entry %s: %s", key[:12], e)
+        return None
+    logger.info("ReportCache: Loaded %s from cache (%s)", Path(source).name, key[:12])
+    return frames, manifest.get("meta", {})
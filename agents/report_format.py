@@ -0,0 +1,46 @@
+"""
+Presentation of analysis tables. DataFrames stay numeric end to end and only record which columns
+are currency amounts (df.attrs["currency_columns"]); number formats are applied when a sheet is written
+(xlsx via excel_writer.ReportWorkbook, Google Sheets via google_pusher_agent).
+"""
+
+import math
+from typing import Iterable, List
+
+CURRENCY_COLUMNS_ATTR = "currency_columns"
+# $1,234.56 in Excel / openpyxl
+EXCEL_CURRENCY_FORMAT = '"$"#,##0.00'
+# Same display as a Google Sheets numberFormat
+SHEETS_CURRENCY_FORMAT = {"type": "CURRENCY", "pattern": '"$"#,##0.00'}
+
+
+def mark_currency(df, columns: Iterable[str]):
+    """Record which of `columns` (those present in df) hold dollar amounts. Returns df."""
+    df.attrs[CURRENCY_COLUMNS_ATTR] = [c for c in columns if c in df.columns]
+    return df
+
+
+def currency_columns(df) -> List[str]:
+    """Columns marked with mark_currency (empty if none)."""
+    return list(getattr(df, "attrs", {}).get(CURRENCY_COLUMNS_ATTR, []))
+
+
+def is_currency_format(number_format) -> bool:
+    """True for an xlsx number format that displays a dollar amount."""
+    return bool(number_format) and "$" in str(number_format)
+
+
+def cell_value(value):
+    """Value to store in a sheet cell: missing values (NaN/NaT/None) become empty cells."""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    try:
+        import pandas as pd
+        if value is pd.NaT or value is pd.NA:
+            return None
+    except ImportError:
+        pass
+    return value
+
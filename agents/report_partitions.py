@@ -0,0 +1,337 @@
+"""
+ReportPartitionStore: downloaded DoorDash reports kept per account and calendar month, so a run only asks the
+portal for the months it does not have yet (the report window is the last three months, two of which have
+usually not changed since the previous run).
+
+Layout under <root>/<account>/:
+  <YYYY-MM>/<KIND>.csv   rows of that month for each report file kind (FINANCIAL_DETAILED, MARKETING_PROMOTION,
+                         MARKETING_SPONSORED_LISTING), with the export's original header and cell text
+  manifest.json          when each month of the financial / marketing report was stored and whether it is final
+
+A month is final ("closed") once it was downloaded at least REPORT_SETTLE_DAYS (default 7) days after it ended;
+until then DoorDash may still post adjustments, so it is requested again. assemble() writes a window of months
+back into one zip per report shaped like the portal download; the bytes only depend on the stored months,
+so report_cache hits across runs.
+"""
+
+import calendar
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from agents.report_schemas import DD_FINANCIAL, DD_MARKETING, read_report_header, resolve_columns
+from agents.time_slots import parse_datetimes
+
+PARTITIONS_DIR_NAME = ".partitions"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_SETTLE_DAYS = 7
+# MM/DD/YYYY, as passed to the portal task
+DATE_FORMAT = "%m/%d/%Y"
+SPLIT_CHUNK_ROWS = 200_000
+# Fixed member timestamp so assembled zips are identical for identical months
+_ZIP_DATE_TIME = (2000, 1, 1, 0, 0, 0)
+
+# File kind (report CSV name prefix) -> report it comes in and the schema locating its date column
+REPORT_KINDS = {
+    "FINANCIAL_DETAILED": {"report": "financial", "schema": DD_FINANCIAL},
+    "MARKETING_PROMOTION": {"report": "marketing", "schema": DD_MARKETING},
+    "MARKETING_SPONSORED_LISTING": {"report": "marketing", "schema": DD_MARKETING},
+}
+REPORTS = ("financial", "marketing")
+
+
+def parse_report_date(value: str) -> date:
+    return datetime.strptime(value, DATE_FORMAT).date()
+
+
+def format_report_date(value: date) -> str:
+    return value.strftime(DATE_FORMAT)
+
+
+def month_bounds(month: str) -> Tuple[date, date]:
+    """(first day, last day) of a YYYY-MM month."""
+    year, mon = int(month[:4]), int(month[5:7])
+    return date(year, mon, 1), date(year, mon, calendar.monthrange(year, mon)[1])
+
+
+def months_in_range(start: date, end: date, whole_only: bool = False) -> List[str]:
+    """YYYY-MM months overlapping start..end (only those entirely inside it with whole_only)."""
+    months = []
+    year, mon = start.year, start.month
+    while (year, mon) <= (end.year, end.month):
+        month = f"{year:04d}-{mon:02d}"
+        first, last = month_bounds(month)
+        if not whole_only or (start <= first and last <= end):
+            months.append(month)
+        year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return months
+
+
+def report_kind(name: str) -> Optional[str]:
+    """REPORT_KINDS key of a report CSV file name (e.g. FINANCIAL_DETAILED_2026_01.csv), or None."""
+    base = Path(name).name.upper()
+    if not base.endswith(".CSV"):
+        return None
+    return next((kind for kind in REPORT_KINDS if base.startswith(kind)), None)
+
+
+def _report_files(path: Path, report: str) -> List[Tuple[str, str, Callable]]:
+    """(kind, name, opener) for every CSV of `report` in a downloaded zip, folder or CSV file."""
+    path = Path(path)
+    files = []
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            names = sorted(n for n in z.namelist() if not n.endswith("/"))
+        for name in names:
+            kind = report_kind(name)
+            if kind and REPORT_KINDS[kind]["report"] == report:
+                files.append((kind, name, lambda name=name: _ZipMember(path, name)))
+    elif path.is_dir():
+        for f in sorted(path.rglob("*.csv")):
+            kind = report_kind(f.name)
+            if kind and REPORT_KINDS[kind]["report"] == report:
+                files.append((kind, f.name, lambda f=f: open(f, "rb")))
+    elif path.is_file():
+        # A bare financial CSV download is the detailed report whatever it is called
+        kind = report_kind(path.name) or ("FINANCIAL_DETAILED" if report == "financial" else None)
+        if kind:
+            files.append((kind, path.name, lambda: open(path, "rb")))
+    return files
+
+
+class _ZipMember:
+    """Context manager opening one zip member (and closing the archive with it)."""
+
+    def __init__(self, zip_path: Path, name: str) -> None:
+        self._zip = zipfile.ZipFile(zip_path)
+        self._file = self._zip.open(name)
+
+    def __enter__(self):
+        return self._file
+
+    def __exit__(self, *exc) -> None:
+        self._file.close()
+        self._zip.close()
+
+
+def _split_by_month(kind: str, name: str, opener: Callable, staging: Path, months: List[str]) -> bool:
+    """
+    Append the rows of one report CSV to staging/<YYYY-MM>/<kind>.csv for the given months. Rows of other
+    months (partial months at the edges of the download) are dropped; rows without a parseable date are kept
+    with the last month. Returns False when the file cannot be split (no date column, or a header that
+    differs from another file of the same kind).
+    """
+    schema = REPORT_KINDS[kind]["schema"]
+    header = read_report_header(opener, schema)
+    date_field = resolve_columns(header, schema)["date"]
+    if date_field is None:
+        logger.warning("ReportPartitions: No date column in %s; cannot split it by month", name)
+        return False
+    date_col = next(c for c in header if str(c).strip() == date_field)
+    last = int(months[-1][:4]) * 100 + int(months[-1][5:7])
+    undated = 0
+    with opener() as f:
+        for chunk in pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=SPLIT_CHUNK_ROWS):
+            dates = parse_datetimes(chunk[date_col])
+            # YYYYMM as an integer: much cheaper than strftime per row
+            keys = (dates.dt.year * 100 + dates.dt.month).fillna(last).astype(int)
+            undated += int(dates.isna().sum())
+            for key, part in chunk.groupby(keys.to_numpy(), sort=True):
+                month = f"{key // 100:04d}-{key % 100:02d}"
+                if month not in months:
+                    continue
+                out = staging / month / f"{kind}.csv"
+                if out.exists():
+                    existing = list(pd.read_csv(out, nrows=0, dtype=str).columns)
+                    if existing != list(part.columns):
+                        logger.warning("ReportPartitions: %s has a different header than other %s files", name, kind)
+                        return False
+                else:
+                    out.parent.mkdir(parents=True, exist_ok=True)
+                part.to_csv(out, mode="a", header=not out.exists(), index=False)
+    if undated:
+        logger.info("ReportPartitions: %s rows of %s have no parseable date; kept with %s", undated, name, months[-1])
+    return True
+
+
+class ReportPartitionStore:
+    """Month partitions of one account's financial and marketing reports (see module docstring)."""
+
+    def __init__(self, root: Path, account: str, settle_days: Optional[int] = None) -> None:
+        self.dir = Path(root) / account
+        if settle_days is None:
+            try:
+                settle_days = int(os.getenv("REPORT_SETTLE_DAYS", "") or DEFAULT_SETTLE_DAYS)
+            except ValueError:
+                logger.warning("ReportPartitions: invalid REPORT_SETTLE_DAYS; using %s", DEFAULT_SETTLE_DAYS)
+                settle_days = DEFAULT_SETTLE_DAYS
+        self.settle_days = settle_days
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        empty = {"version": MANIFEST_VERSION, "months": {}}
+        path = self.dir / MANIFEST_FILE
+        if not path.is_file():
+            return empty
+        try:
+            manifest = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning("ReportPartitions: Ignoring unreadable %s: %s", path, e)
+            return empty
+        return manifest if manifest.get("version") == MANIFEST_VERSION else empty
+
+    def _save_manifest(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".manifest-", dir=self.dir)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.dir / MANIFEST_FILE)
+
+    def has_month(self, month: str, report: str) -> bool:
+        return report in self.manifest["months"].get(month, {}) and (self.dir / month).is_dir()
+
+    def is_final(self, month: str, report: str) -> bool:
+        return self.has_month(month, report) and self.manifest["months"][month][report].get("closed", False)
+
+    def fetch_range(self, start_date: str, end_date: str) -> Optional[Tuple[str, str]]:
+        """
+        (start, end) MM/DD/YYYY span the portal still has to provide for the start_date..end_date window:
+        from the first month that is missing or not final to the last such month. None if every month is stored.
+        """
+        start, end = parse_report_date(start_date), parse_report_date(end_date)
+        needed = [
+            m for m in months_in_range(start, end)
+            if not all(self.is_final(m, report) for report in REPORTS)
+        ]
+        if not needed:
+            return None
+        return (
+            format_report_date(max(start, month_bounds(needed[0])[0])),
+            format_report_date(min(end, month_bounds(needed[-1])[1])),
+        )
+
+    def store(self, report: str, path: Path, start_date: str, end_date: str, today: Optional[date] = None) -> List[str]:
+        """
+        Split a download of `report` covering start_date..end_date into month partitions (whole months only),
+        replacing what was stored for those months. Returns the months stored ([] if the download could not be split).
+        """
+        today = today or date.today()
+        months = months_in_range(parse_report_date(start_date), parse_report_date(end_date), whole_only=True)
+        files = _report_files(path, report) if path else []
+        if not months or not files:
+            return []
+        self.dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{report}-", dir=self.dir))
+        try:
+            for kind, name, opener in files:
+                try:
+                    if not _split_by_month(kind, name, opener, staging, months):
+                        return []
+                except Exception as e:
+                    logger.warning("ReportPartitions: Could not split %s by month: %s", name, e)
+                    return []
+            kinds = [k for k, spec in REPORT_KINDS.items() if spec["report"] == report]
+            for month in months:
+                target = self.dir / month
+                target.mkdir(exist_ok=True)
+                for kind in kinds:
+                    src, dest = staging / month / f"{kind}.csv", target / f"{kind}.csv"
+                    if src.exists():
+                        os.replace(src, dest)
+                    else:
+                        # No rows of this kind in the month
+                        dest.unlink(missing_ok=True)
+                closed = today >= month_bounds(month)[1] + timedelta(days=self.settle_days)
+                self.manifest["months"].setdefault(month, {})[report] = {
+                    "downloaded_on": today.isoformat(),
+                    "closed": closed,
+                }
+            self._save_manifest()
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        logger.info("ReportPartitions: Stored %s report for %s", report, ", ".join(months))
+        return months
+
+    def assemble(self, report: str, start_date: str, end_date: str, output_dir: Path) -> Optional[Path]:
+        """
+        output_dir/<report>_<start>_<end>.zip with one CSV per file kind holding every stored month of the window,
+        or None if a month of the window is not stored (or no month has rows).
+        """
+        start, end = parse_report_date(start_date), parse_report_date(end_date)
+        months = months_in_range(start, end)
+        missing = [m for m in months if not self.has_month(m, report)]
+        if missing:
+            logger.info("ReportPartitions: %s report not stored for %s", report, ", ".join(missing))
+            return None
+        kinds = [k for k, spec in REPORT_KINDS.items() if spec["report"] == report]
+        members: Dict[str, List[Path]] = {}
+        for kind in kinds:
+            parts = [self.dir / m / f"{kind}.csv" for m in months if (self.dir / m / f"{kind}.csv").is_file()]
+            if parts:
+                members[kind] = parts
+        if not members:
+            return None
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        out_path = output_dir / f"{report}_{start:%Y%m%d}_{end:%Y%m%d}.zip"
+        with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            for kind, parts in members.items():
+                info = zipfile.ZipInfo(f"{kind}_{start:%Y%m%d}_{end:%Y%m%d}.csv", date_time=_ZIP_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with z.open(info, "w") as out:
+                    _concat_csv(parts, out)
+        logger.info("ReportPartitions: Assembled %s from %s months", out_path.name, len(months))
+        return out_path
+
+    def merge_download(
+        self,
+        report: str,
+        downloaded: Optional[Path],
+        fetch_start: str,
+        fetch_end: str,
+        start_date: str,
+        end_date: str,
+        output_dir: Path,
+    ) -> Optional[Path]:
+        """
+        Store a `report` download covering fetch_start..fetch_end, then return the whole start_date..end_date
+        window assembled from the partitions. Falls back to the download when the window cannot be assembled.
+        """
+        if downloaded:
+            self.store(report, downloaded, fetch_start, fetch_end)
+        assembled = self.assemble(report, start_date, end_date, output_dir)
+        if assembled is not None:
+            return assembled
+        if downloaded and (fetch_start, fetch_end) != (start_date, end_date):
+            logger.warning(
+                "ReportPartitions: Using the %s download as is; it only covers %s to %s", report, fetch_start, fetch_end
+            )
+        return downloaded
+
+
+def _concat_csv(parts: List[Path], out) -> None:
+    """Write CSV parts to a binary stream as one CSV. Same headers are joined as bytes; otherwise via pandas (union of columns)."""
+    headers = [pd.read_csv(p, nrows=0, dtype=str).columns.tolist() for p in parts]
+    if all(h == headers[0] for h in headers):
+        for i, p in enumerate(parts):
+            with open(p, "rb") as f:
+                if i:
+                    f.readline()
+                shutil.copyfileobj(f, out)
+        return
+    df = pd.concat([pd.read_csv(p, dtype=str, keep_default_na=False) for p in parts], ignore_index=True)
+    out.write(df.to_csv(index=False).encode())
@@ -0,0 +1,219 @@
+"""
+Column schemas for the CSV exports the agents and analysis-app/New-store-app read:
+DoorDash FINANCIAL_DETAILED, DoorDash MARKETING_PROMOTION / MARKETING_SPONSORED_LISTING and UberEats.
+
+Each schema lists the fields a pipeline uses, the header aliases seen in exports (matched exactly, then
+case-insensitively) and a dtype. read_report_csv peeks at the header, reads only the matching columns
+with those dtypes (multithreaded pyarrow CSV engine when installed), and strips column names. Original header names
+are kept, so code that looks columns up by name keeps working on the smaller frame.
+
+dtypes: money stays float64 (sums are reported to the cent, which float32 cannot hold for large totals);
+counts are left to the engine (int64, float64 when values are missing) since callers do `value or 0`
+on single cells, which pd.NA would break; store and transaction type are category (with text values:
+analysis_agent turns all-digit store IDs back into numbers for its outputs); IDs, dates and times are
+strings and are parsed downstream (see agents.time_slots).
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import pyarrow  # noqa: F401
+    # pyarrow's reader wins by parsing on several threads; on a single core the C engine is faster
+    CSV_ENGINE = "pyarrow" if (os.cpu_count() or 1) > 1 else "c"
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    CSV_ENGINE = "c"
+    STRING_DTYPE = "string"
+
+MONEY = "float64"
+# Inferred by the CSV engine
+COUNT = None
+CATEGORY = "category"
+STRING = STRING_DTYPE
+_NUMERIC_DTYPES = (MONEY, COUNT)
+
+
+def _field(aliases: List[str], dtype: str, contains: Optional[str] = None) -> dict:
+    """
+    One schema field. `contains` also keeps every column whose lower-cased name contains that text, for
+    callers that fall back to substring lookups (e.g. any column with 'store' in it); those extra
+    columns are strings for text fields and inferred for numeric ones.
+    """
+    return {"aliases": aliases, "dtype": dtype, "contains": contains}
+
+
+DD_FINANCIAL = {
+    "name": "DoorDash financial",
+    "header_row": 0,
+    "fields": {
+        "date": _field(
+            ["Timestamp local date", "Timestamp Local Date", "Timestamp Local date", "Date", "date", "Timestamp"],
+            STRING, contains="date",
+        ),
+        "time": _field(
+            ["Timestamp local time", "Timestamp Local Time", "Order received local time"], STRING, contains="time",
+        ),
+        "store_id": _field(["Merchant store ID", "Store ID", "Shop ID"], CATEGORY),
+        "store_name": _field(["Store name"], CATEGORY, contains="store"),
+        "transaction_type": _field(["Transaction type"], CATEGORY),
+        "order_id": _field(["DoorDash order ID"], STRING),
+        "subtotal": _field(["Subtotal"], MONEY),
+        "commission": _field(["Commission"], MONEY),
+        "processing_fee": _field(["Payment processing fee"], MONEY),
+        "marketing_fees": _field(["Marketing fees | (including any applicable taxes)"], MONEY),
+        "cust_discounts": _field(["Customer discounts from marketing | (Funded by you)"], MONEY),
+        "net_total": _field(["Net total", "Net total (for historical reference only)"], MONEY, contains="net"),
+    },
+}
+
+DD_MARKETING = {
+    "name": "DoorDash marketing",
+    "header_row": 0,
+    "fields": {
+        "date": _field(["Date"], STRING),
+        "campaign": _field(["Is self serve campaign"], CATEGORY),
+        "campaign_name": _field(["Campaign name", "Campaign Name"], CATEGORY),
+        "store_id": _field(["Merchant store ID", "Store ID"], CATEGORY),
+        "store_name": _field(["Store name"], CATEGORY),
+        "orders": _field(["Orders"], COUNT),
+        "sales": _field(["Sales"], MONEY),
+        "promo_spend": _field(["Customer discounts from marketing | (Funded by you)"], MONEY),
+        "ads_spend": _field(["Marketing fees | (including any applicable taxes)"], MONEY),
+        "new_customers": _field(["New customers acquired"], COUNT),
+    },
+}
+
+UBER_EATS = {
+    "name": "UberEats",
+    # First line of the export is a title row; the header is on the second line
+    "header_row": 1,
+    # The order date is read by position (9th column); keep the leading columns so df.columns[8] is unchanged
+    "keep_leading": 9,
+    "fields": {
+        "accept_time": _field(["Order Accept Time"], STRING, contains="accept"),
+        "store_name": _field(["Store Name"], CATEGORY, contains="store"),
+        "order_id": _field(["Order ID"], STRING),
+        "sales": _field(["Sales (excl. tax)", "Total item sales excl tax"], MONEY, contains="sales"),
+        "payout": _field(["Total payout"], MONEY, contains="total payout"),
+        "marketplace_fee": _field(["Marketplace Fee"], MONEY),
+        "marketplace_fee_pct": _field(["Marketplace fee %"], MONEY),
+    },
+}
+
+
+def resolve_columns(columns, schema: dict) -> Dict[str, Optional[str]]:
+    """Field name -> first matching column (aliases in order, exact then case-insensitive), or None."""
+    stripped = [str(c).strip() for c in columns]
+    by_lower = {}
+    for c in stripped:
+        by_lower.setdefault(c.lower(), c)
+    resolved = {}
+    for name, field in schema["fields"].items():
+        match = next((a for a in field["aliases"] if a in stripped), None)
+        if match is None:
+            match = next((by_lower[a.lower()] for a in field["aliases"] if a.lower() in by_lower), None)
+        resolved[name] = match
+    return resolved
+
+
+def _plan_columns(header: List[str], schema: dict) -> Tuple[List[str], Dict[str, str]]:
+    """(raw column names to read, in file order; dtype per raw column name) for a file's header."""
+    resolved = resolve_columns(header, schema)
+    dtypes = {}
+    for name, column in resolved.items():
+        if column is not None:
+            dtypes[column] = schema["fields"][name]["dtype"]
+    keep = set(dtypes)
+    dtypes = {c: t for c, t in dtypes.items() if t is not None}
+    for field in schema["fields"].values():
+        if not field["contains"]:
+            continue
+        for c in (c.strip() for c in header):
+            if field["contains"] in c.lower() and c not in keep:
+                keep.add(c)
+                if field["dtype"] not in _NUMERIC_DTYPES:
+                    dtypes[c] = STRING
+    leading = schema.get("keep_leading", 0)
+    usecols = [c for i, c in enumerate(header) if i < leading or c.strip() in keep]
+    return usecols, {c: dtypes[c.strip()] for c in usecols if c.strip() in dtypes}
+
+
+def read_report_header(source: Union[str, Path, Callable], schema: dict) -> List[str]:
+    """Raw header names of a report CSV (see read_report_csv for `source`)."""
+    header_row = schema.get("header_row", 0)
+    if callable(source):
+        with source() as f:
+            return list(pd.read_csv(f, nrows=0, header=header_row).columns)
+    return list(pd.read_csv(source, nrows=0, header=header_row).columns)
+
+
+def _finish(df: "pd.DataFrame", categories: List[str]) -> "pd.DataFrame":
+    """Strip column names and turn the (string-read) category columns into categoricals."""
+    for c in categories:
+        df[c] = df[c].astype(CATEGORY)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def _iter_chunks(source, chunksize: int, categories: List[str], **kwargs) -> Iterator["pd.DataFrame"]:
+    if callable(source):
+        with source() as f:
+            for chunk in pd.read_csv(f, chunksize=chunksize, **kwargs):
+                yield _finish(chunk, categories)
+        return
+    for chunk in pd.read_csv(source, chunksize=chunksize, **kwargs):
+        yield _finish(chunk, categories)
+
+
+def read_report_csv(
+    source: Union[str, Path, Callable],
+    schema: dict,
+    chunksize: Optional[int] = None,
+) -> Union["pd.DataFrame", Iterator["pd.DataFrame"]]:
+    """
+    Read the schema's columns from a CSV path (or a zero-argument callable returning a fresh binary file
+    object, e.g. lambda: zip.open(member)). Column names are stripped.
+
+    Without chunksize the whole file is read with CSV_ENGINE; if a money/count
+    column holds text that does not parse, it is re-read with those columns untyped (callers already
+    coerce with pd.to_numeric), and finally with the C engine. With chunksize an iterator of frames is returned (C engine); numbers are
+    inferred per chunk so one malformed row cannot fail the stream halfway.
+    """
+    # header=N rather than skiprows=N: the pyarrow engine applies skiprows after the header line
+    header_row = schema.get("header_row", 0)
+    usecols, dtypes = _plan_columns(read_report_header(source, schema), schema)
+    # Categories are read as strings first: the pyarrow engine would otherwise keep numeric store IDs as ints
+    categories = [c for c, t in dtypes.items() if t == CATEGORY]
+    dtypes = {c: STRING if t == CATEGORY else t for c, t in dtypes.items()}
+    if chunksize:
+        dtypes = {c: t for c, t in dtypes.items() if t not in _NUMERIC_DTYPES}
+        return _iter_chunks(source, chunksize, categories, header=header_row, usecols=usecols, dtype=dtypes)
+
+    untyped_numbers = {c: t for c, t in dtypes.items() if t not in _NUMERIC_DTYPES}
+    attempts = [(CSV_ENGINE, dtypes), (CSV_ENGINE, untyped_numbers)]
+    if CSV_ENGINE != "c":
+        # The C engine is more lenient with malformed quoting/encoding than pyarrow's reader
+        attempts.append(("c", untyped_numbers))
+    for i, (engine, attempt_dtypes) in enumerate(attempts):
+        try:
+            if callable(source):
+                with source() as f:
+                    df = pd.read_csv(f, engine=engine, header=header_row, usecols=usecols, dtype=attempt_dtypes)
+            else:
+                df = pd.read_csv(source, engine=engine, header=header_row, usecols=usecols, dtype=attempt_dtypes)
+            break
+        except (ValueError, TypeError) as e:
+            if i == len(attempts) - 1:
+                raise
+            logger.info("ReportSchemas: Re-reading %s CSV (%s engine failed: %s)", schema["name"], engine, e)
+    return _finish(df, categories)
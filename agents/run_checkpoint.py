@@ -0,0 +1,134 @@
+"""
+RunCheckpoint: checkpoint.json in a run directory recording which phases of the DoorDash workflow are done,
+so a retry (or a re-run on the same run_dir) continues from the first unfinished phase:
+
+  reports    marketing / financial download paths with their SHA-256 (a file that changed or vanished
+             invalidates the phase and the analysis after it)
+  analysis   combined_analysis_*.xlsx path
+  campaigns  status per campaign name, and completed_combos: the per-cell combos covered by "Completed"
+             campaigns, which are skipped on resume (before the remaining ones are planned again)
+
+The manifest is rewritten atomically (temp file + os.replace) after every change.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from agents.report_cache import content_sha256
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+CAMPAIGN_COMPLETED = "Completed"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _file_entry(path: Optional[Path]) -> Optional[dict]:
+    if path is None:
+        return None
+    path = Path(path)
+    return {"path": str(path.resolve()), "sha256": content_sha256(path)}
+
+
+def _entry_path(entry: Optional[dict]) -> Tuple[bool, Optional[Path]]:
+    """(still valid, path) for a recorded file; valid means it exists with the recorded hash."""
+    if entry is None:
+        return True, None
+    path = Path(entry["path"])
+    if not path.exists() or content_sha256(path) != entry.get("sha256"):
+        return False, None
+    return True, path
+
+
+class RunCheckpoint:
+    """Phase manifest of one run directory (see module docstring)."""
+
+    def __init__(self, run_dir: Path) -> None:
+        self.path = Path(run_dir) / CHECKPOINT_FILE
+        self.data = self._load()
+
+    def _load(self) -> dict:
+        empty = {"version": CHECKPOINT_VERSION, "reports": None, "analysis": None, "campaigns": {}}
+        if not self.path.is_file():
+            return empty
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning("RunCheckpoint: Ignoring unreadable %s: %s", self.path, e)
+            return empty
+        if data.get("version") != CHECKPOINT_VERSION:
+            return empty
+        data.setdefault("campaigns", {})
+        return data
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".checkpoint-", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def reports(self) -> Optional[Tuple[Optional[Path], Optional[Path]]]:
+        """(marketing_path, financial_path) if the reports phase is done and its files are unchanged, else None."""
+        reports = self.data.get("reports")
+        if not reports:
+            return None
+        ok_m, marketing = _entry_path(reports.get("marketing"))
+        ok_f, financial = _entry_path(reports.get("financial"))
+        if not (ok_m and ok_f):
+            logger.info("RunCheckpoint: Downloaded reports changed or missing; reports phase will run again")
+            return None
+        return marketing, financial
+
+    def mark_reports(self, marketing_path: Optional[Path], financial_path: Optional[Path]) -> None:
+        """Record the downloads (nothing is recorded if neither exists). Clears the analysis recorded for older downloads."""
+        if marketing_path is None and financial_path is None:
+            return
+        self.data["reports"] = {
+            "marketing": _file_entry(marketing_path),
+            "financial": _file_entry(financial_path),
+            "completed_at": _now(),
+        }
+        self.data["analysis"] = None
+        self._save()
+
+    def combined_path(self) -> Optional[Path]:
+        """Combined analysis workbook if the analysis phase is done and the file still exists, else None."""
+        analysis = self.data.get("analysis")
+        if not analysis:
+            return None
+        path = Path(analysis["combined_path"])
+        return path if path.is_file() else None
+
+    def mark_analysis(self, combined_path: Path) -> None:
+        self.data["analysis"] = {"combined_path": str(Path(combined_path).resolve()), "completed_at": _now()}
+        self._save()
+
+    def mark_campaign(self, campaign_name: str, status: str, combos: Optional[List[str]] = None) -> None:
+        """combos: names of the per-cell combos a consolidated campaign (campaign_planner) covers."""
+        self.data["campaigns"][campaign_name] = {"status": status, "at": _now()}
+        if status == CAMPAIGN_COMPLETED:
+            # Kept apart from the per-name entries: a later plan can reuse a name for other cells
+            done = self.data.setdefault("completed_combos", [])
+            done.extend(c for c in (combos or [campaign_name]) if c not in done)
+        self._save()
+
+    def completed_combos(self) -> Set[str]:
+        """Names of the per-cell combos covered by completed campaigns (a campaign without combos covers itself)."""
+        done = set(self.data.get("completed_combos") or [])
+        # Checkpoints written before completed_combos was recorded
+        done.update(name for name, entry in self.data["campaigns"].items() if entry.get("status") == CAMPAIGN_COMPLETED)
+        return done
@@ -0,0 +1,143 @@
+"""
+Time-slot and day-type classification shared by the agents and analysis-app/New-store-app.
+
+Times and dates are parsed once per distinct value (a 3-month report has ~1,440 distinct minutes
+and ~90 distinct dates), converted to minute-of-day / weekday, and mapped through precomputed
+lookup tables instead of parsing every row with pd.to_datetime.
+
+Slot boundaries (minutes since midnight):
+  - Early morning: 12:00 AM – 4:59 AM
+  - Breakfast: 5:00 AM – 10:59 AM
+  - Lunch: 11:00 AM – 1:59 PM
+  - Afternoon: 2:00 PM – 4:59 PM
+  - Dinner: 5:00 PM – 7:59 PM
+  - Late night: 8:00 PM – 11:59 PM
+"""
+
+from typing import Optional
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+SLOT_ORDER = ["Early morning", "Breakfast", "Lunch", "Afternoon", "Dinner", "Late night"]
+# (first minute of slot, slot name), ascending
+SLOT_BOUNDARIES = [
+    (0, "Early morning"),
+    (300, "Breakfast"),
+    (660, "Lunch"),
+    (840, "Afternoon"),
+    (1020, "Dinner"),
+    (1200, "Late night"),
+]
+WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_TYPE_ORDER = ["Weekday", "Weekend"]
+# weekday (0=Monday .. 6=Sunday) -> index into DAY_TYPE_ORDER
+_DAY_TYPE_BY_WEEKDAY = [0, 0, 0, 0, 0, 1, 1]
+
+_TIME_FORMAT = "%H:%M:%S"
+
+
+def _build_slot_table():
+    """1440-entry table: minute of day -> index into SLOT_ORDER."""
+    table = np.zeros(24 * 60, dtype=np.int8)
+    for start, name in SLOT_BOUNDARIES:
+        table[start:] = SLOT_ORDER.index(name)
+    return table
+
+
+if pd is not None:
+    SLOT_TABLE = _build_slot_table()
+    DAY_TYPE_TABLE = np.array(_DAY_TYPE_BY_WEEKDAY, dtype=np.int8)
+    SLOT_DTYPE = pd.CategoricalDtype(SLOT_ORDER, ordered=True)
+    WEEKDAY_DTYPE = pd.CategoricalDtype(WEEKDAY_ORDER, ordered=True)
+    DAY_TYPE_DTYPE = pd.CategoricalDtype(DAY_TYPE_ORDER, ordered=True)
+
+
+def _as_series(values) -> "pd.Series":
+    return values if isinstance(values, pd.Series) else pd.Series(values)
+
+
+def _index_of(values) -> "pd.Index":
+    return values.index if isinstance(values, pd.Series) else pd.RangeIndex(len(values))
+
+
+def _parse_unique(uniques: "pd.Index", fmt: Optional[str] = None) -> "np.ndarray":
+    """Parse distinct values; anything the fast path misses is parsed element-wise (format='mixed')."""
+    parsed = pd.DatetimeIndex(pd.to_datetime(uniques, errors="coerce", format=fmt)).to_numpy(dtype="datetime64[ns]")
+    missing = np.isnat(parsed) & np.asarray(uniques.astype(str).str.strip() != "")
+    if missing.any():
+        retry = pd.to_datetime(uniques[missing], errors="coerce", format="mixed")
+        parsed[missing] = pd.DatetimeIndex(retry).to_numpy(dtype="datetime64[ns]")
+    return parsed
+
+
+def parse_datetimes(values, fmt: Optional[str] = None) -> "pd.Series":
+    """
+    Parse a column of date/time strings to datetime64, one pd.to_datetime call per distinct value set.
+    Unparseable values become NaT. Already-datetime input is returned as-is.
+    """
+    s = _as_series(values)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    codes, uniques = pd.factorize(s, sort=False)
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    parsed = _parse_unique(pd.Index(uniques), fmt)
+    table = np.append(parsed, np.datetime64("NaT", "ns"))
+    return pd.Series(table[codes], index=s.index)
+
+
+def minute_of_day(values) -> "pd.Series":
+    """Minutes since midnight (float, NaN where the value is missing or unparseable)."""
+    times = parse_datetimes(values, fmt=_TIME_FORMAT)
+    return (times.dt.hour * 60 + times.dt.minute).astype(float)
+
+
+def classify_slots(values) -> "pd.Series":
+    """Map a column of time strings (or datetimes) to an ordered categorical of SLOT_ORDER; NaN if unparseable."""
+    minutes = minute_of_day(values).to_numpy()
+    valid = ~np.isnan(minutes)
+    codes = np.full(len(minutes), -1, dtype=np.int8)
+    codes[valid] = SLOT_TABLE[minutes[valid].astype(np.int16)]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=SLOT_DTYPE), index=_index_of(values))
+
+
+def _weekday_codes(values) -> "np.ndarray":
+    """Weekday (0=Monday) per row, -1 where the date is missing or unparseable."""
+    dates = parse_datetimes(values)
+    weekday = dates.dt.weekday.to_numpy(dtype=float, na_value=np.nan)
+    codes = np.full(len(weekday), -1, dtype=np.int8)
+    valid = ~np.isnan(weekday)
+    codes[valid] = weekday[valid].astype(np.int8)
+    return codes
+
+
+def classify_weekdays(values) -> "pd.Series":
+    """Map a column of dates to an ordered categorical of weekday names (Monday..Sunday)."""
+    codes = _weekday_codes(values)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=WEEKDAY_DTYPE), index=_index_of(values))
+
+
+def classify_day_types(values) -> "pd.Series":
+    """Map a column of dates to an ordered categorical: Monday-Friday = Weekday, Saturday-Sunday = Weekend."""
+    weekday = _weekday_codes(values)
+    codes = np.full(len(weekday), -1, dtype=np.int8)
+    valid = weekday >= 0
+    codes[valid] = DAY_TYPE_TABLE[weekday[valid]]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=DAY_TYPE_DTYPE), index=_index_of(values))
+
+
+def get_time_slot(time_str) -> Optional[str]:
+    """Scalar form of classify_slots for single values."""
+    slot = classify_slots([time_str]).iloc[0]
+    return None if pd.isna(slot) else slot
+
+
+def get_day_type(dt) -> Optional[str]:
+    """Scalar form of classify_day_types for single values."""
+    day_type = classify_day_types([dt]).iloc[0]
+    return None if pd.isna(day_type) else day_type
@@ -0,0 +1,215 @@
+"""
+Tracing spans for the workflow phases (portal tasks, downloads, analysis builders, workbook writing, the
+Sheets push, campaign tasks), written as JSON lines to the run's metrics.jsonl:
+
+  {"name": "financial.load", "trace_id": ..., "span_id": ..., "parent_id": ..., "start": "...",
+   "duration_ms": 812.4, "outcome": "ok", "rows": 200000, "bytes": 8080520}
+
+outcome is "ok" or "error" (with "error": message). Spans nest through a context variable, so spans opened in
+asyncio tasks and asyncio.to_thread workers land in the same file with the right parent; a process pool
+worker needs call_with_metrics(trace_context(), fn, ...). Nothing is written outside a metrics_file block.
+
+When OpenTelemetry is installed, every span is also sent to the global tracer provider; with
+opentelemetry-sdk and the OTLP exporter installed and OTEL_EXPORTER_OTLP_ENDPOINT set, that provider is
+configured to export over OTLP.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+METRICS_FILE = "metrics.jsonl"
+
+# (metrics path, trace id) of the current run, and the innermost open span
+_sink: contextvars.ContextVar = contextvars.ContextVar("tracing_sink", default=None)
+_current: contextvars.ContextVar = contextvars.ContextVar("tracing_span", default=None)
+_write_lock = threading.Lock()
+_otel_tracer = None
+_otel_configured = False
+
+
+class Span:
+    """An open span; set() adds attributes (rows, bytes, ...) recorded when it ends."""
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: dict) -> None:
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = dict(attrs)
+
+    def set(self, **attrs) -> None:
+        self.attrs.update({k: v for k, v in attrs.items() if v is not None})
+
+
+def _get_otel_tracer():
+    """Global OpenTelemetry tracer (configuring an OTLP exporter the first time, if available), or None."""
+    global _otel_tracer, _otel_configured
+    if otel_trace is None:
+        return None
+    if not _otel_configured:
+        _otel_configured = True
+        if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+                provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "doordash-reports")}))
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+                otel_trace.set_tracer_provider(provider)
+            except ImportError as e:
+                logger.info("Tracing: OTEL_EXPORTER_OTLP_ENDPOINT is set but the OTLP exporter is not installed (%s)", e)
+        _otel_tracer = otel_trace.get_tracer("doordash-reports")
+    return _otel_tracer
+
+
+@contextmanager
+def metrics_file(path: Path, trace_id: Optional[str] = None) -> Iterator[Path]:
+    """Write the spans of everything run inside this block (one run) to path (appending)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    token = _sink.set((path, trace_id or uuid.uuid4().hex))
+    try:
+        yield path
+    finally:
+        _sink.reset(token)
+
+
+def trace_context() -> Optional[Tuple[str, str, Optional[str]]]:
+    """(metrics path, trace id, open span id) to hand to another process, or None outside a metrics_file block."""
+    sink = _sink.get()
+    if sink is None:
+        return None
+    current = _current.get()
+    return (str(sink[0]), sink[1], current.span_id if current else None)
+
+
+def call_with_metrics(context: Optional[Tuple[str, str, Optional[str]]], fn: Callable, *args):
+    """fn(*args) with its spans recorded under trace_context() of the caller; for functions run in another process."""
+    if context is None:
+        return fn(*args)
+    path, trace_id, parent_id = context
+    parent = Span("remote", None, {})
+    parent.span_id = parent_id
+    token = _current.set(parent if parent_id else None)
+    try:
+        with metrics_file(Path(path), trace_id):
+            return fn(*args)
+    finally:
+        _current.reset(token)
+
+
+def _write(record: dict) -> None:
+    sink = _sink.get()
+    if sink is None:
+        return
+    path, trace_id = sink
+    record["trace_id"] = trace_id
+    line = json.dumps(record, default=str) + "\n"
+    try:
+        with _write_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        logger.debug("Tracing: could not write %s: %s", path, e)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """Time the block as span `name` with attrs; the span's outcome is "error" if the block raises."""
+    if _sink.get() is None and otel_trace is None:
+        yield Span(name, None, attrs)
+        return
+    parent = _current.get()
+    current = Span(name, parent, attrs)
+    token = _current.set(current)
+    start_wall = datetime.now()
+    start = time.perf_counter()
+    outcome, error = "ok", None
+    tracer = _get_otel_tracer()
+    otel_cm = tracer.start_as_current_span(name) if tracer is not None else None
+    otel_span = otel_cm.__enter__() if otel_cm is not None else None
+    try:
+        yield current
+    except BaseException as e:
+        outcome, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        _current.reset(token)
+        record = {
+            "name": name,
+            "span_id": current.span_id,
+            "parent_id": current.parent_id,
+            "start": start_wall.isoformat(timespec="milliseconds"),
+            "duration_ms": duration_ms,
+            "outcome": outcome,
+        }
+        if error:
+            record["error"] = error
+        record.update({k: v for k, v in current.attrs.items() if k not in record})
+        _write(record)
+        if otel_span is not None:
+            for key, value in current.attrs.items():
+                if isinstance(value, (str, bool, int, float)):
+                    otel_span.set_attribute(key, value)
+            otel_span.set_attribute("outcome", outcome)
+            if error:
+                otel_span.set_attribute("error", error)
+            otel_cm.__exit__(None, None, None)
+
+
+def annotate(**attrs) -> None:
+    """Add attrs (rows, bytes, ...) to the innermost open span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def traced(name: str) -> Callable:
+    """Decorator: run the (sync) function inside span `name`."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed(name: str, fn: Callable, *args, **kwargs):
+    """fn(*args, **kwargs) inside span `name`, recording the result's row count (len) when it has one."""
+    with span(name) as s:
+        result = fn(*args, **kwargs)
+        try:
+            s.set(rows=len(result))
+        except TypeError:
+            pass
+        return result
+
+
+def file_size(path) -> Optional[int]:
+    """Size in bytes of path, or None if it is not a file."""
+    try:
+        return Path(path).stat().st_size if path else None
+    except OSError:
+        return None
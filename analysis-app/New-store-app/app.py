@@ -1,6 +1,7 @@
 """
 New-store-app: Pivot by Store, Slot, Days. Metrics per group (Self vs Corp for DoorDash; no Corp for UberEats).
 """
+import io
 import streamlit as st
 import pandas as pd
 from pathlib import Path
@@ -70,20 +71,18 @@ def get_marketing_for_period():
           'spend': 'Marketing fees | (including any applicable taxes)'}
 
     if mkt_promo_files or mkt_sponsored_files:
-        from utils import filter_excluded_dates
+        from utils import filter_excluded_dates, read_report_csv, DD_MARKETING
         post_s = pd.to_datetime(post_start, format='%m/%d/%Y').date()
         post_e = pd.to_datetime(post_end, format='%m/%d/%Y').date()
         for f in mkt_promo_files or []:
-            df = pd.read_csv(f)
-            df.columns = df.columns.str.strip()
+            df = read_report_csv(lambda: io.BytesIO(f.getvalue()), DD_MARKETING)
             if 'Date' not in df.columns or not all(c in df.columns for c in [pc['campaign'], pc['orders'], pc['sales'], pc['spend']]):
                 continue
             df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
             df = df.dropna(subset=['Date'])
             post_promo = pd.concat([post_promo, df[(df['Date'].dt.date >= post_s) & (df['Date'].dt.date <= post_e)]], ignore_index=True)
         for f in mkt_sponsored_files or []:
-            df = pd.read_csv(f)
-            df.columns = df.columns.str.strip()
+            df = read_report_csv(lambda: io.BytesIO(f.getvalue()), DD_MARKETING)
             if 'Date' not in df.columns or not all(c in df.columns for c in [sc['campaign'], sc['orders'], sc['sales'], sc['spend']]):
                 continue
             df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
@@ -5,9 +5,13 @@ from pathlib import Path
 from utils import (
     filter_master_file_by_date_range,
     filter_excluded_dates,
-    get_time_slot,
-    get_day_type,
+    classify_slots,
+    classify_day_types,
+    SLOT_ORDER,
     DD_DATE_COLUMN_VARIATIONS,
+    DD_MARKETING,
+    UBER_EATS,
+    read_report_csv,
 )
 
 
@@ -127,8 +131,7 @@ def load_promotion_data(marketing_folder_path, pre_start, pre_end, post_start, p
     for mdir in find_marketing_folders(marketing_folder_path):
         for f in mdir.glob('MARKETING_PROMOTION*.csv'):
             try:
-                df = pd.read_csv(f)
-                df.columns = df.columns.str.strip()
+                df = read_report_csv(f, DD_MARKETING)
                 if 'Date' not in df.columns:
                     continue
                 df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
@@ -159,8 +162,7 @@ def load_sponsored_data(marketing_folder_path, pre_start, pre_end, post_start, p
     for mdir in find_marketing_folders(marketing_folder_path):
         for f in mdir.glob('MARKETING_SPONSORED_LISTING*.csv'):
             try:
-                df = pd.read_csv(f)
-                df.columns = df.columns.str.strip()
+                df = read_report_csv(f, DD_MARKETING)
                 if 'Date' not in df.columns:
                     continue
                 df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
@@ -277,7 +279,7 @@ def build_dd_promotions_metrics_table(pre_promo, post_promo, pre_sponsored, post
 
 def process_dd_slot_analysis_pre_post(file_path, pre_start, pre_end, post_start, post_end, excluded_dates=None):
     """DoorDash slot analysis - Pre vs Post only (no YoY). Uses Timestamp local time."""
-    slot_order = ['Early morning', 'Breakfast', 'Lunch', 'Afternoon', 'Dinner', 'Late night']
+    slot_order = SLOT_ORDER
     pre_df = filter_master_file_by_date_range(file_path, pre_start, pre_end, DD_DATE_COLUMN_VARIATIONS, excluded_dates)
     post_df = filter_master_file_by_date_range(file_path, post_start, post_end, DD_DATE_COLUMN_VARIATIONS, excluded_dates)
 
@@ -306,11 +308,11 @@ def process_dd_slot_analysis_pre_post(file_path, pre_start, pre_end, post_start,
         if df.empty or time_col not in df.columns or sales_col not in df.columns:
             return {s: {'sales': 0, 'payouts': 0} for s in slot_order}
         d = df.copy()
-        d['Slot'] = d[time_col].apply(get_time_slot)
+        d['Slot'] = classify_slots(d[time_col])
         d = d.dropna(subset=['Slot'])
         d[sales_col] = pd.to_numeric(d[sales_col], errors='coerce').fillna(0)
         d[payout_col] = pd.to_numeric(d[payout_col], errors='coerce').fillna(0) if payout_col in d.columns else 0
-        agg = d.groupby('Slot').agg({sales_col: 'sum', payout_col: 'sum'}).reset_index()
+        agg = d.groupby('Slot', observed=True).agg({sales_col: 'sum', payout_col: 'sum'}).reset_index()
         result = {s: {'sales': 0, 'payouts': 0} for s in slot_order}
         for _, row in agg.iterrows():
             s = row['Slot']
@@ -340,13 +342,12 @@ def process_dd_slot_analysis_pre_post(file_path, pre_start, pre_end, post_start,
 
 def process_ue_slot_analysis_pre_post(file_path, pre_start, pre_end, post_start, post_end, excluded_dates=None):
     """UberEats slot analysis - Pre vs Post only. Uses 'Order Accept Time' for slots."""
-    slot_order = ['Early morning', 'Breakfast', 'Lunch', 'Afternoon', 'Dinner', 'Late night']
+    slot_order = SLOT_ORDER
     time_col = 'Order Accept Time'
     date_col_variations = ['Order date', 'Order Date', 'Date', 'date']
 
     try:
-        df = pd.read_csv(file_path, skiprows=[0], header=0)
-        df.columns = df.columns.str.strip()
+        df = read_report_csv(file_path, UBER_EATS)
         if time_col not in df.columns:
             time_col_alt = next((c for c in df.columns if 'order accept' in c.lower() or 'accept time' in c.lower()), None)
             if time_col_alt:
@@ -378,11 +379,11 @@ def process_ue_slot_analysis_pre_post(file_path, pre_start, pre_end, post_start,
             if d.empty:
                 return {s: {'sales': 0, 'payouts': 0} for s in slot_order}
             dd = d.copy()
-            dd['Slot'] = dd[time_col].apply(get_time_slot)
+            dd['Slot'] = classify_slots(dd[time_col])
             dd = dd.dropna(subset=['Slot'])
             dd[sales_col] = pd.to_numeric(dd[sales_col], errors='coerce').fillna(0)
             dd[payout_col] = pd.to_numeric(dd[payout_col], errors='coerce').fillna(0)
-            agg = dd.groupby('Slot').agg({sales_col: 'sum', payout_col: 'sum'}).reset_index()
+            agg = dd.groupby('Slot', observed=True).agg({sales_col: 'sum', payout_col: 'sum'}).reset_index()
             result = {s: {'sales': 0, 'payouts': 0} for s in slot_order}
             for _, row in agg.iterrows():
                 s = row['Slot']
@@ -416,8 +417,7 @@ def process_ue_slot_analysis_pre_post(file_path, pre_start, pre_end, post_start,
 def _load_ue_by_date_range(file_path, start_date, end_date, excluded_dates=None):
     """Load UE file and filter by date range."""
     try:
-        df = pd.read_csv(file_path, skiprows=[0], header=0)
-        df.columns = df.columns.str.strip()
+        df = read_report_csv(file_path, UBER_EATS)
         date_col = df.columns[8] if len(df.columns) > 8 else None
         if not date_col:
             return pd.DataFrame()
@@ -493,7 +493,7 @@ def build_day_type_table(file_path, start_date, end_date, excluded_dates=None):
         date_col = next((c for c in df.columns if 'date' in c.lower()), None)
     if not date_col:
         return None
-    df['Day Type'] = df[date_col].apply(get_day_type)
+    df['Day Type'] = classify_day_types(df[date_col])
     df = df.dropna(subset=['Day Type'])
     sub_col = _find_col(df, DD_FINANCIAL_COLS['subtotal'])
     net_col = _find_col(df, DD_FINANCIAL_COLS['net_total'])
@@ -504,14 +504,14 @@ def build_day_type_table(file_path, start_date, end_date, excluded_dates=None):
     if net_col:
         df[net_col] = pd.to_numeric(df[net_col], errors='coerce').fillna(0)
     if order_col:
-        grp = df.groupby('Day Type').agg({sub_col: 'sum', order_col: 'nunique'}).reset_index()
+        grp = df.groupby('Day Type', observed=True).agg({sub_col: 'sum', order_col: 'nunique'}).reset_index()
         grp.columns = ['Day Type', 'Sales', 'Orders']
     else:
-        grp = df.groupby('Day Type').agg({sub_col: 'sum'}).reset_index()
+        grp = df.groupby('Day Type', observed=True).agg({sub_col: 'sum'}).reset_index()
         grp.columns = ['Day Type', 'Sales']
         grp['Orders'] = len(df)
     if net_col:
-        net_grp = df.groupby('Day Type')[net_col].sum().reset_index()
+        net_grp = df.groupby('Day Type', observed=True)[net_col].sum().reset_index()
         net_grp.columns = ['Day Type', 'Net Payout']
         grp = grp.merge(net_grp, on='Day Type')
     grp['AOV'] = grp['Sales'] / grp['Orders'].replace(0, 1)
@@ -527,7 +527,7 @@ def build_day_type_table_ue(file_path, start_date, end_date, excluded_dates=None
     if df.empty:
         return None
     date_col = df.columns[8] if len(df.columns) > 8 else 'Order date'
-    df['Day Type'] = df[date_col].apply(get_day_type)
+    df['Day Type'] = classify_day_types(df[date_col])
     df = df.dropna(subset=['Day Type'])
     sales_col = _find_ue_col(df, ['Sales (excl. tax)', 'Total item sales excl tax']) or 'Sales (excl. tax)'
     payout_col = _find_ue_col(df, ['Total payout', 'Total payout ']) or next((c for c in df.columns if 'total payout' in c.lower()), None)
@@ -538,14 +538,14 @@ def build_day_type_table_ue(file_path, start_date, end_date, excluded_dates=None
     if payout_col in df.columns:
         df[payout_col] = pd.to_numeric(df[payout_col], errors='coerce').fillna(0)
     if order_col:
-        grp = df.groupby('Day Type').agg({sales_col: 'sum', order_col: 'nunique'}).reset_index()
+        grp = df.groupby('Day Type', observed=True).agg({sales_col: 'sum', order_col: 'nunique'}).reset_index()
         grp.columns = ['Day Type', 'Sales', 'Orders']
     else:
-        grp = df.groupby('Day Type')[sales_col].sum().reset_index()
+        grp = df.groupby('Day Type', observed=True)[sales_col].sum().reset_index()
         grp.columns = ['Day Type', 'Sales']
         grp['Orders'] = len(df)
     if payout_col in df.columns:
-        net_grp = df.groupby('Day Type')[payout_col].sum().reset_index()
+        net_grp = df.groupby('Day Type', observed=True)[payout_col].sum().reset_index()
         net_grp.columns = ['Day Type', 'Net Payout']
         grp = grp.merge(net_grp, on='Day Type')
     grp['AOV'] = grp['Sales'] / grp['Orders'].replace(0, 1)
@@ -567,10 +567,10 @@ def _dd_financial_with_dims(file_path, start_date, end_date, excluded_dates=None
     store_col = 'Store name' if 'Store name' in df.columns else (next((c for c in df.columns if 'store' in c.lower()), None))
     if not date_col:
         return pd.DataFrame()
-    df['Day Type'] = df[date_col].apply(get_day_type)
+    df['Day Type'] = classify_day_types(df[date_col])
     df = df.dropna(subset=['Day Type'])
     if time_col:
-        df['Slot'] = df[time_col].apply(get_time_slot)
+        df['Slot'] = classify_slots(df[time_col])
         df = df.dropna(subset=['Slot'])
     else:
         df['Slot'] = 'All'
@@ -653,11 +653,11 @@ def build_pivot_metrics_dd(dd_path, promo_df, sponsored_df, start_date, end_date
             agg[net_col] = 'sum'
         if order_col:
             agg[order_col] = 'nunique'
-        g = df.groupby(group_cols).agg(agg).reset_index()
+        g = df.groupby(group_cols, observed=True).agg(agg).reset_index()
         if order_col:
             g = g.rename(columns={order_col: 'Orders'})
         else:
-            g['Orders'] = df.groupby(group_cols).size().values
+            g['Orders'] = df.groupby(group_cols, observed=True).size().values
         g['Sales'] = g[sub_col]
         g['Net Payout'] = g[net_col] if net_col else 0
         g['AOV'] = g['Sales'] / g['Orders'].replace(0, 1)
@@ -690,7 +690,7 @@ def build_pivot_metrics_dd(dd_path, promo_df, sponsored_df, start_date, end_date
         end_dt = pd.to_datetime(end_date, errors='coerce')
         if pd.notna(start_dt) and pd.notna(end_dt):
             promo_df = promo_df[(promo_df['Date'] >= start_dt) & (promo_df['Date'] <= end_dt)]
-        promo_df['Day Type'] = promo_df['Date'].apply(get_day_type)
+        promo_df['Day Type'] = classify_day_types(promo_df['Date'])
         store_id_mkt = 'Merchant store ID' if 'Merchant store ID' in promo_df.columns else ('Store ID' if 'Store ID' in promo_df.columns else None)
         store_name_mkt = 'Store name' if 'Store name' in promo_df.columns else None
         for _, row in promo_df.iterrows():
@@ -730,7 +730,7 @@ def build_pivot_metrics_dd(dd_path, promo_df, sponsored_df, start_date, end_date
         end_dt = pd.to_datetime(end_date, errors='coerce')
         if pd.notna(start_dt) and pd.notna(end_dt):
             sponsored_df = sponsored_df[(sponsored_df['Date'] >= start_dt) & (sponsored_df['Date'] <= end_dt)]
-        sponsored_df['Day Type'] = sponsored_df['Date'].apply(get_day_type)
+        sponsored_df['Day Type'] = classify_day_types(sponsored_df['Date'])
         store_id_mkt = 'Merchant store ID' if 'Merchant store ID' in sponsored_df.columns else ('Store ID' if 'Store ID' in sponsored_df.columns else None)
         store_name_mkt = 'Store name' if 'Store name' in sponsored_df.columns else None
         for _, row in sponsored_df.iterrows():
@@ -824,10 +824,10 @@ def build_pivot_metrics_ue(ue_path, start_date, end_date, pivot_by, excluded_dat
         df[payout_col] = pd.to_numeric(df[payout_col], errors='coerce').fillna(0)
     else:
         payout_col = None
-    df['Day Type'] = df[date_col].apply(get_day_type)
+    df['Day Type'] = classify_day_types(df[date_col])
     df = df.dropna(subset=['Day Type'])
     if time_col:
-        df['Slot'] = df[time_col].apply(get_time_slot)
+        df['Slot'] = classify_slots(df[time_col])
         df = df.dropna(subset=['Slot'])
     else:
         df['Slot'] = 'All'
@@ -875,11 +875,11 @@ def build_pivot_metrics_ue(ue_path, start_date, end_date, pivot_by, excluded_dat
             agg[payout_col] = 'sum'
         if order_col:
             agg[order_col] = 'nunique'
-        g = df.groupby(group_cols).agg(agg).reset_index()
+        g = df.groupby(group_cols, observed=True).agg(agg).reset_index()
         if order_col:
             g = g.rename(columns={order_col: 'Orders'})
         else:
-            g['Orders'] = df.groupby(group_cols).size().values
+            g['Orders'] = df.groupby(group_cols, observed=True).size().values
         g['Sales'] = g[sales_col]
         g['Net Payout'] = g[payout_col] if payout_col and payout_col in g.columns else 0
         g['AOV'] = g['Sales'] / g['Orders'].replace(0, 1)
@@ -1,63 +1,32 @@
 """Utility functions for New-store-app - same column definitions as main app"""
+import sys
 import pandas as pd
 import streamlit as st
 from pathlib import Path
 
+# Slot / day-type classification and CSV column schemas are shared with the agents
+# (agents/time_slots.py, agents/report_schemas.py)
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+from agents.time_slots import (  # noqa: E402
+    SLOT_ORDER,
+    classify_slots,
+    classify_day_types,
+    get_time_slot,
+    get_day_type,
+)
+from agents.report_schemas import (  # noqa: E402
+    DD_FINANCIAL,
+    DD_MARKETING,
+    UBER_EATS,
+    read_report_csv,
+)
+
 DD_DATE_COLUMN_VARIATIONS = ['Timestamp local date', 'Timestamp Local Date', 'Timestamp Local date',
                              'timestamp local date', 'Date', 'date', 'Timestamp', 'timestamp']
 
 
-def get_time_slot(time_str):
-    """
-    Categorize a time string into a slot.
-    - Early morning: 12:00 AM – 4:59 AM
-    - Breakfast: 5:00 AM – 10:59 AM
-    - Lunch: 11:00 AM – 1:59 PM
-    - Afternoon: 2:00 PM – 4:59 PM
-    - Dinner: 5:00 PM – 7:59 PM
-    - Late night: 8:00 PM – 11:59 PM
-    """
-    try:
-        if pd.isna(time_str) or time_str == '':
-            return None
-        time_obj = pd.to_datetime(time_str, errors='coerce')
-        if pd.isna(time_obj):
-            return None
-        hour = time_obj.hour
-        minute = time_obj.minute
-        total_minutes = hour * 60 + minute
-        if total_minutes >= 0 and total_minutes < 300:      # 12am-4:59am
-            return 'Early morning'
-        elif total_minutes >= 300 and total_minutes < 660:  # 5am-10:59am
-            return 'Breakfast'
-        elif total_minutes >= 660 and total_minutes < 840:  # 11am-1:59pm
-            return 'Lunch'
-        elif total_minutes >= 840 and total_minutes < 1020: # 2pm-4:59pm
-            return 'Afternoon'
-        elif total_minutes >= 1020 and total_minutes < 1200: # 5pm-7:59pm
-            return 'Dinner'
-        elif total_minutes >= 1200:                         # 8pm-11:59pm
-            return 'Late night'
-        return None
-    except Exception:
-        return None
-
-
-def get_day_type(dt):
-    """Monday-Friday = Weekday, Saturday-Sunday = Weekend."""
-    try:
-        if pd.isna(dt):
-            return None
-        d = pd.to_datetime(dt, errors='coerce')
-        if pd.isna(d):
-            return None
-        # 0=Monday, 6=Sunday
-        wd = d.weekday()
-        return 'Weekend' if wd >= 5 else 'Weekday'
-    except Exception:
-        return None
-
-
 def filter_excluded_dates(df, date_col, excluded_dates):
     """Filter out excluded dates from a DataFrame."""
     if not excluded_dates or date_col not in df.columns or df.empty:
@@ -122,11 +91,7 @@ def filter_master_file_by_date_range(file_path, start_date, end_date, date_col_v
     """Load CSV and filter by date range. Same logic as main app utils."""
     try:
         is_ue = 'ue' in str(file_path).lower() or 'ubereats' in str(file_path).lower()
-        if is_ue:
-            df = pd.read_csv(file_path, skiprows=[0], header=0)
-        else:
-            df = pd.read_csv(file_path)
-        df.columns = df.columns.str.strip()
+        df = read_report_csv(file_path, UBER_EATS if is_ue else DD_FINANCIAL)
         if is_ue:
             if len(df.columns) <= 8:
                 return pd.DataFrame()
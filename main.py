@@ -4,20 +4,31 @@ Orchestrator: runs DoorDash workflow via browser-use (login, reports, download,
 then runs analysis agents and combined report. No Playwright; browser-use drives the browser.
 """
 
+import argparse
 import asyncio
+import csv
+import json
 import logging
+import multiprocessing
 import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-from agents.doordash_agent import run_reports_then_analysis_then_campaign
+from agents.doordash_agent import _discover_downloads, run_reports_then_analysis_then_campaign, use_local_browser
 from agents.marketing_agent import run as marketing_run
 from agents.analysis_agent import run as analysis_run
 from agents.google_pusher_agent import run as google_pusher_run
 from agents.combined_report_agent import run as combined_report_run
+from agents.campaign_params import count_campaigns_executed
+from agents.report_partitions import PARTITIONS_DIR_NAME, ReportPartitionStore
+from agents.run_checkpoint import RunCheckpoint
+from agents.tracing import METRICS_FILE, call_with_metrics, metrics_file, span, trace_context
 
 # Load environment variables from .env
 load_dotenv()
@@ -26,20 +37,40 @@ load_dotenv()
 LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 DOWNLOADS_ROOT = Path(__file__).resolve().parent / "downloads"
+PROFILES_DIR_NAME = ".browser_profiles"
 
 
-def _run_dir_for_email(email: str) -> Path:
-    """downloads/{email_sanitized}-{timestamp} so data is clean per run."""
+def _account_slug(email: str) -> str:
+    """Email made safe for a directory name (max 50 chars)."""
     safe = (email or "run").strip()
     for c in ("@", ".", " ", "/", "\\"):
         safe = safe.replace(c, "_")
-    safe = safe[:50] if len(safe) > 50 else safe
+    return safe[:50] if len(safe) > 50 else safe
+
+
+def _run_dir_for_email(email: str) -> Path:
+    """downloads/{email_sanitized}-{timestamp} so data is clean per run."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return DOWNLOADS_ROOT / f"{safe}-{timestamp}"
+    return DOWNLOADS_ROOT / f"{_account_slug(email)}-{timestamp}"
+
+
+def _profile_dir_for_email(email: str) -> Path:
+    """
+    downloads/.browser_profiles/{email_sanitized}: the account's persistent browser profile, so its session
+    cookies (no login while they are valid) and HTTP cache carry over between runs and retries.
+    """
+    root = DOWNLOADS_ROOT / PROFILES_DIR_NAME
+    # The profiles hold logged-in sessions
+    root.mkdir(parents=True, exist_ok=True, mode=0o700)
+    return root / _account_slug(email)
 
 # Retry configuration
 MAX_RETRIES = 3
 RETRY_DELAY_SEC = 5
+# Multi-account mode (--accounts): live browsers at once unless MAX_CONCURRENT_BROWSERS is set
+DEFAULT_MAX_CONCURRENT_BROWSERS = 2
+# Run directory names end in the run's timestamp (see _run_dir_for_email)
+RUN_DIR_TIMESTAMP_RE = re.compile(r"-(\d{8})_\d{6}$")
 
 
 def setup_logging(level: int = logging.INFO) -> None:
@@ -68,12 +99,13 @@ def get_optional_env(name: str, default: str = "") -> str:
     return value.strip() if value else default
 
 
-def get_last_three_months_date_range():
+def get_last_three_months_date_range(today=None):
     """
-    Return (start_date, end_date) as MM/DD/YYYY for the 3 months previous to current month.
+    Return (start_date, end_date) as MM/DD/YYYY for the 3 months previous to current month
+    (or to the month of `today`, a date, when given).
     Example: if today is Feb 2026 → start 11/01/2025, end 01/31/2026 (Nov, Dec, Jan).
     """
-    today = datetime.now().date()
+    today = today or datetime.now().date()
     first_this_month = today.replace(day=1)
     last_prev_month = first_this_month - timedelta(days=1)  # last day of previous month
     # First day of month 3 months before current month (e.g. Feb → Nov previous year)
@@ -88,65 +120,189 @@ def get_last_three_months_date_range():
     return start_str, end_str
 
 
+def _run_marketing_analysis(
+    marketing_path: Path,
+    run_dir: Path,
+    report_start_date: str,
+    report_end_date: str,
+    operator_name: str,
+) -> list | None:
+    """MarketingAgent sheets for the combined report, or None (failures are logged, non-fatal)."""
+    logger = logging.getLogger("main")
+    logger.info("Marketing report: %s", marketing_path)
+    try:
+        result = marketing_run(
+            Path(marketing_path),
+            output_dir=run_dir,
+            post_start_date=report_start_date,
+            post_end_date=report_end_date,
+            operator_name=operator_name,
+            write_file=False,
+        )
+        if isinstance(result, list):
+            logger.info("MarketingAgent built %s sheets", len(result))
+            return result
+    except Exception as marketing_err:
+        logger.warning("MarketingAgent failed (non-fatal): %s", marketing_err)
+    return None
+
+
+def _run_financial_analysis(
+    financial_path: Path,
+    run_dir: Path,
+    report_start_date: str,
+    report_end_date: str,
+    operator_name: str,
+    stream: bool,
+    chunksize: int | None,
+) -> list | None:
+    """AnalysisAgent sheets for the combined report, or None (not a ZIP, or failures logged, non-fatal)."""
+    logger = logging.getLogger("main")
+    logger.info("Financial report: %s", financial_path)
+    dl_path = Path(financial_path)
+    is_zip = dl_path.suffix.lower() == ".zip"
+    if not is_zip and dl_path.is_file() and dl_path.stat().st_size >= 4:
+        with open(dl_path, "rb") as f:
+            is_zip = f.read(4) == b"PK\x03\x04"
+    if not is_zip:
+        return None
+    try:
+        result = analysis_run(
+            dl_path,
+            output_dir=run_dir,
+            report_start_date=report_start_date,
+            report_end_date=report_end_date,
+            operator_name=operator_name,
+            write_file=False,
+            stream=stream,
+            chunksize=chunksize,
+        )
+        if isinstance(result, list):
+            logger.info("AnalysisAgent built %s sheets", len(result))
+            return result
+    except Exception as analysis_err:
+        logger.warning("AnalysisAgent failed (non-fatal): %s", analysis_err)
+    return None
+
+
+async def _run_analyses(jobs: list) -> list:
+    """
+    Run (function, args) analysis jobs at the same time, off the event loop (which owns the live browser).
+    ANALYSIS_EXECUTOR=thread (default) uses asyncio.to_thread; =process uses a process pool for CPU
+    parallelism across the GIL; =serial runs them one after the other in a worker thread.
+    Tracing spans of process pool jobs go to the caller's metrics file as well.
+    Returns one result per job (None for a job that crashed its worker).
+    """
+    logger = logging.getLogger("main")
+    executor = get_optional_env("ANALYSIS_EXECUTOR", "thread").lower()
+    if executor == "process":
+        loop = asyncio.get_running_loop()
+        # spawn: forking a process that runs the browser session's threads is not safe
+        ctx = multiprocessing.get_context("spawn")
+        context = trace_context()
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=ctx, initializer=setup_logging) as pool:
+            try:
+                results = await asyncio.gather(
+                    *(loop.run_in_executor(pool, call_with_metrics, context, fn, *args) for fn, args in jobs),
+                    return_exceptions=True,
+                )
+            except asyncio.CancelledError:
+                # Stop the workers rather than wait for them when leaving the pool
+                for process in list((getattr(pool, "_processes", None) or {}).values()):
+                    process.terminate()
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+    elif executor == "serial":
+        results = []
+        for fn, args in jobs:
+            try:
+                results.append(await asyncio.to_thread(fn, *args))
+            except Exception as e:
+                results.append(e)
+    else:
+        results = await asyncio.gather(*(asyncio.to_thread(fn, *args) for fn, args in jobs), return_exceptions=True)
+    out = []
+    for (fn, _), result in zip(jobs, results):
+        if isinstance(result, BaseException):
+            logger.warning("%s failed (non-fatal): %s", fn.__name__, result)
+            result = None
+        out.append(result)
+    return out
+
+
+def _analysis_job(
+    report: str,
+    path: Path,
+    run_dir: Path,
+    report_start_date: str,
+    report_end_date: str,
+    operator_name: str | None = None,
+) -> tuple:
+    """(function, args) running the financial or marketing analysis of one downloaded report."""
+    if operator_name is None:
+        operator_name = get_optional_env("OPERATOR_NAME")
+    if report == "marketing":
+        return (_run_marketing_analysis, (Path(path), run_dir, report_start_date, report_end_date, operator_name))
+    return (_run_financial_analysis, (
+        Path(path), run_dir, report_start_date, report_end_date, operator_name,
+        get_optional_env("ANALYSIS_STREAMING").lower() in ("1", "true", "yes"),
+        _analysis_chunk_rows(),
+    ))
+
+
+def _analysis_chunk_rows() -> int | None:
+    """ANALYSIS_CHUNK_ROWS for the streaming financial analysis (None: the analysis's default chunk size)."""
+    value = get_optional_env("ANALYSIS_CHUNK_ROWS", "0")
+    try:
+        return int(value or "0") or None
+    except ValueError:
+        logging.getLogger("main").warning("Invalid ANALYSIS_CHUNK_ROWS %r; using the default chunk size", value)
+        return None
+
+
 async def _analysis_phase(
     marketing_path: Path | None,
     financial_path: Path | None,
     run_dir: Path,
     report_start_date: str,
     report_end_date: str,
+    operator_name: str | None = None,
+    push_to_sheets: bool = True,
+    started: dict | None = None,
 ) -> Path | None:
-    """Run Financial + Marketing analysis and combined report (called while browser is paused). Returns combined_path for campaign combos."""
+    """
+    Run Financial + Marketing analysis (concurrently) and the combined report (called while browser is paused,
+    or offline by `main.py analyze`). push_to_sheets=False skips the Google Sheets push.
+    started: {report path: task from _run_analyses([job])} for analyses already started as their download
+    landed; those are awaited instead of run again.
+    Returns combined_path for campaign combos.
+    """
     logger = logging.getLogger("main")
     if not marketing_path and not financial_path:
         raise RuntimeError("DoorDash (browser-use) did not return any downloaded file path")
 
-    financial_sheets = None
-    marketing_sheets = None
-
-    if marketing_path:
-        logger.info("Marketing report: %s", marketing_path)
-        try:
-            result = marketing_run(
-                Path(marketing_path),
-                output_dir=run_dir,
-                post_start_date=report_start_date,
-                post_end_date=report_end_date,
-                operator_name=get_optional_env("OPERATOR_NAME"),
-                write_file=False,
-            )
-            if isinstance(result, list):
-                marketing_sheets = result
-                logger.info("MarketingAgent built %s sheets", len(marketing_sheets))
-        except Exception as marketing_err:
-            logger.warning("MarketingAgent failed (non-fatal): %s", marketing_err)
-
-    if financial_path:
-        logger.info("Financial report: %s", financial_path)
-        dl_path = Path(financial_path)
-        is_zip = dl_path.suffix.lower() == ".zip"
-        if not is_zip and dl_path.is_file() and dl_path.stat().st_size >= 4:
-            with open(dl_path, "rb") as f:
-                is_zip = f.read(4) == b"PK\x03\x04"
-        if is_zip:
-            try:
-                result = analysis_run(
-                    dl_path,
-                    output_dir=run_dir,
-                    report_start_date=report_start_date,
-                    report_end_date=report_end_date,
-                    operator_name=get_optional_env("OPERATOR_NAME"),
-                    write_file=False,
-                )
-                if isinstance(result, list):
-                    financial_sheets = result
-                    logger.info("AnalysisAgent built %s sheets", len(financial_sheets))
-            except Exception as analysis_err:
-                logger.warning("AnalysisAgent failed (non-fatal): %s", analysis_err)
+    started = started or {}
+    jobs, early = [], []
+    for report, path in (("marketing", marketing_path), ("financial", financial_path)):
+        if not path:
+            continue
+        job = _analysis_job(report, path, run_dir, report_start_date, report_end_date, operator_name)
+        task = started.get(Path(path).resolve())
+        if task is not None:
+            early.append((job[0], task))
+        else:
+            jobs.append(job)
+    results = dict(zip([fn for fn, _ in jobs], await _run_analyses(jobs))) if jobs else {}
+    for fn, task in early:
+        results[fn] = (await task)[0]
+    marketing_sheets = results.get(_run_marketing_analysis)
+    financial_sheets = results.get(_run_financial_analysis)
 
     combined_path = None
     if financial_sheets or marketing_sheets:
         try:
-            combined_path = combined_report_run(
+            combined_path = await asyncio.to_thread(
+                combined_report_run,
                 financial_sheets=financial_sheets,
                 marketing_sheets=marketing_sheets,
                 output_dir=run_dir,
@@ -156,9 +312,10 @@ async def _analysis_phase(
         except Exception as comb_err:
             logger.warning("Combined report failed (non-fatal): %s", comb_err)
 
-    if combined_path:
+    if combined_path and push_to_sheets:
         try:
-            result = google_pusher_run(
+            result = await asyncio.to_thread(
+                google_pusher_run,
                 financial_xlsx_path=combined_path,
                 marketing_xlsx_path=None,
                 spreadsheet_title=f"DoorDash Reports {report_start_date} to {report_end_date}",
@@ -175,6 +332,110 @@ async def _analysis_phase(
     return combined_path
 
 
+async def run_account_workflow(
+    email: str,
+    password: str,
+    report_start_date: str,
+    report_end_date: str,
+    operator_name: str | None = None,
+    user_data_dir: Path | None = None,
+    attach_browser: bool = True,
+) -> dict:
+    """
+    Full flow for one account in its own run directory, with retries:
+    login → reports → download → (browser stays open) → analysis → campaign (no second login) → close.
+    A retry resumes from the first unfinished phase (agents.run_checkpoint) instead of starting over.
+    Each attempt's tracing spans (agents.tracing) are appended to run_dir/metrics.jsonl.
+    user_data_dir: browser profile (default: the account's persistent profile, see _profile_dir_for_email).
+    attach_browser: with USE_LOCAL_BROWSER=true, use the running Chrome (over CDP) instead of launching one.
+    Returns a summary dict (no password): email, status, attempts, run_dir, combined_report, campaigns, error, duration_s.
+    """
+    logger = logging.getLogger("main")
+    run_dir = _run_dir_for_email(email)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    if user_data_dir is None:
+        user_data_dir = _profile_dir_for_email(email)
+    logger.info("Account %s: run directory %s", email, run_dir)
+
+    summary = {
+        "email": email,
+        "status": "failed",
+        "attempts": 0,
+        "run_dir": str(run_dir),
+        "combined_report": None,
+        "campaigns": {},
+        "error": None,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    started = time.monotonic()
+    partitions = None
+    if get_optional_env("REPORT_PARTITIONS", "1").lower() not in ("0", "false", "no"):
+        partitions = ReportPartitionStore(DOWNLOADS_ROOT / PARTITIONS_DIR_NAME, _account_slug(email))
+
+    # Analyses started as soon as their report finished downloading (while the other one still downloads)
+    early_analyses: dict[Path, asyncio.Task] = {}
+
+    def on_report_ready(report, path):
+        if get_optional_env("ANALYSIS_EXECUTOR", "thread").lower() == "serial":
+            return  # one analysis at a time: both run from analysis_callback
+        job = _analysis_job(report, path, run_dir, report_start_date, report_end_date, operator_name)
+        logger.info("Account %s: %s report ready; starting its analysis", email, report)
+        early_analyses[Path(path).resolve()] = asyncio.create_task(_run_analyses([job]))
+
+    async def drop_early_analyses(keep: set = frozenset()) -> None:
+        # Cancel and await the early analyses no later attempt picks up (a retry downloads the reports again
+        # under new names unless the checkpoint kept them)
+        stale = [path for path in early_analyses if path not in keep]
+        tasks = [early_analyses.pop(path) for path in stale]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def analysis_callback(m_path, f_path):
+        return await _analysis_phase(
+            m_path, f_path, run_dir, report_start_date, report_end_date, operator_name, started=early_analyses
+        )
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        summary["attempts"] = attempt
+        try:
+            logger.info("Account %s: attempt %d/%d", email, attempt, MAX_RETRIES)
+            with metrics_file(run_dir / METRICS_FILE), span("workflow", account=_account_slug(email), attempt=attempt):
+                await run_reports_then_analysis_then_campaign(
+                    download_dir=run_dir,
+                    email=email,
+                    password=password,
+                    start_date=report_start_date,
+                    end_date=report_end_date,
+                    analysis_callback=analysis_callback,
+                    user_data_dir=user_data_dir,
+                    partitions=partitions,
+                    on_report_ready=on_report_ready,
+                    attach_browser=attach_browser,
+                )
+            logger.info("Account %s: campaign creation completed.", email)
+            summary["status"] = "succeeded"
+            summary["error"] = None
+            break
+        except Exception as e:
+            summary["error"] = str(e)
+            logger.warning("Account %s: attempt %d failed: %s", email, attempt, e, exc_info=True)
+            recorded = RunCheckpoint(run_dir).reports() or ()
+            await drop_early_analyses({Path(path).resolve() for path in recorded if path})
+            if attempt < MAX_RETRIES:
+                logger.info("Retrying in %s seconds...", RETRY_DELAY_SEC)
+                await asyncio.sleep(RETRY_DELAY_SEC)
+
+    await drop_early_analyses()
+    # Retries share run_dir, so each attempt resumes from the phases recorded in its checkpoint.json
+    combined_path = RunCheckpoint(run_dir).combined_path()
+    summary["combined_report"] = str(combined_path) if combined_path else None
+    summary["campaigns"] = count_campaigns_executed(run_dir)
+    summary["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    summary["duration_s"] = round(time.monotonic() - started, 1)
+    return summary
+
+
 async def run_workflow() -> None:
     """Single browser session: login → reports → download → (browser stays open) → analysis → campaign (no second login) → close."""
     logger = logging.getLogger("main")
@@ -183,51 +444,270 @@ async def run_workflow() -> None:
     doordash_password = get_required_env("DOORDASH_PASSWORD")
     get_required_env("BROWSER_USE_API_KEY")
 
-    run_dir = _run_dir_for_email(doordash_email)
-    run_dir.mkdir(parents=True, exist_ok=True)
-    logger.info("Run directory: %s", run_dir)
-
     report_start_date, report_end_date = get_last_three_months_date_range()
     logger.info("Report date range (last 3 months): %s to %s", report_start_date, report_end_date)
 
-    last_error: Exception | None = None
+    summary = await run_account_workflow(doordash_email, doordash_password, report_start_date, report_end_date)
+    if summary["status"] != "succeeded":
+        logger.error("All retries exhausted: %s", summary["error"])
+        sys.exit(1)
 
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            logger.info("Attempt %d/%d", attempt, MAX_RETRIES)
-
-            async def analysis_callback(m_path, f_path):
-                return await _analysis_phase(m_path, f_path, run_dir, report_start_date, report_end_date)
-
-            await run_reports_then_analysis_then_campaign(
-                download_dir=run_dir,
-                email=doordash_email,
-                password=doordash_password,
-                start_date=report_start_date,
-                end_date=report_end_date,
-                analysis_callback=analysis_callback,
-            )
-            logger.info("Campaign creation completed.")
-            return
 
-        except Exception as e:
-            last_error = e
-            logger.warning("Attempt %d failed: %s", attempt, e, exc_info=True)
-            if attempt < MAX_RETRIES:
-                logger.info("Retrying in %s seconds...", RETRY_DELAY_SEC)
-                await asyncio.sleep(RETRY_DELAY_SEC)
-            else:
-                break
+def load_accounts(path: Path) -> list[dict]:
+    """
+    Accounts from a CSV file with an email,password header (optional operator_name column).
+    Blank rows and rows whose email starts with # are skipped.
+    """
+    accounts = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields = {(name or "").strip().lower(): name for name in (reader.fieldnames or [])}
+        if "email" not in fields or "password" not in fields:
+            raise ValueError(f"{path}: expected a header with email and password columns (got {reader.fieldnames})")
+        for row in reader:
+            email = (row.get(fields["email"]) or "").strip()
+            if not email or email.startswith("#"):
+                continue
+            accounts.append({
+                "email": email,
+                "password": (row.get(fields["password"]) or "").strip(),
+                "operator_name": (row.get(fields.get("operator_name", ""), "") or "").strip() or None,
+            })
+    return accounts
+
+
+async def run_accounts(accounts: list[dict], max_browsers: int) -> list[dict]:
+    """
+    Run run_account_workflow for every account, at most max_browsers at a time (each holds a live browser).
+    Each account gets its own run directory and persistent browser profile (concurrent browsers cannot share
+    one profile directory), so downloads and sessions never mix.
+    Returns one summary per account, in input order.
+    """
+    logger = logging.getLogger("main")
+    report_start_date, report_end_date = get_last_three_months_date_range()
+    logger.info(
+        "Running %s accounts, up to %s browsers at once; report date range %s to %s",
+        len(accounts), max_browsers, report_start_date, report_end_date,
+    )
+    slots = asyncio.Semaphore(max_browsers)
+    if use_local_browser():
+        # The attached Chrome has one profile, i.e. one logged-in account
+        logger.warning("USE_LOCAL_BROWSER is ignored with several accounts: each account launches a browser on its own profile.")
+
+    async def one(account: dict) -> dict:
+        async with slots:
+            email = account["email"]
+            try:
+                return await run_account_workflow(
+                    email,
+                    account["password"],
+                    report_start_date,
+                    report_end_date,
+                    operator_name=account.get("operator_name"),
+                    attach_browser=False,
+                )
+            except Exception as e:
+                logger.warning("Account %s failed: %s", email, e, exc_info=True)
+                return {"email": email, "status": "failed", "error": str(e)}
 
-    if last_error:
-        logger.error("All retries exhausted: %s", last_error)
+    return list(await asyncio.gather(*(one(a) for a in accounts)))
+
+
+def write_accounts_summary(summaries: list[dict]) -> Path:
+    """Write downloads/multi_account_summary_<timestamp>.json and return its path."""
+    DOWNLOADS_ROOT.mkdir(parents=True, exist_ok=True)
+    path = DOWNLOADS_ROOT / f"multi_account_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    succeeded = sum(1 for s in summaries if s.get("status") == "succeeded")
+    path.write_text(json.dumps({
+        "accounts": len(summaries),
+        "succeeded": succeeded,
+        "failed": len(summaries) - succeeded,
+        "results": summaries,
+    }, indent=2))
+    return path
+
+
+async def run_multi_account_workflow(accounts_path: Path) -> None:
+    """Run every account in accounts_path (MAX_CONCURRENT_BROWSERS at a time) and write one summary file."""
+    logger = logging.getLogger("main")
+    get_required_env("BROWSER_USE_API_KEY")
+    accounts = load_accounts(accounts_path)
+    if not accounts:
+        logger.error("No accounts found in %s", accounts_path)
+        sys.exit(1)
+    max_browsers = max(1, int(get_optional_env("MAX_CONCURRENT_BROWSERS", str(DEFAULT_MAX_CONCURRENT_BROWSERS))))
+    summaries = await run_accounts(accounts, max_browsers)
+    summary_path = write_accounts_summary(summaries)
+    failed = [s["email"] for s in summaries if s.get("status") != "succeeded"]
+    logger.info("Accounts: %s succeeded, %s failed. Summary: %s", len(summaries) - len(failed), len(failed), summary_path)
+    if failed:
+        logger.error("Failed accounts: %s", ", ".join(failed))
+        sys.exit(1)
+
+
+def _report_range_for_run_dir(run_dir: Path) -> tuple[str, str]:
+    """Report date range a run directory was downloaded for: the 3 months before its timestamp (today if it has none)."""
+    m = RUN_DIR_TIMESTAMP_RE.search(Path(run_dir).name)
+    return get_last_three_months_date_range(datetime.strptime(m.group(1), "%Y%m%d").date() if m else None)
+
+
+def collect_analysis_inputs(paths: list[Path]) -> list[dict]:
+    """
+    One analysis input per run directory: {"run_dir", "marketing", "financial"}.
+    A directory is searched like a fresh download (_discover_downloads); report files given directly are grouped
+    by their directory and override what discovery finds there (a file with "marketing" in its name is the
+    marketing report, anything else the financial report).
+    """
+    inputs: dict[Path, dict] = {}
+    for path in paths:
+        path = Path(path).resolve()
+        if path.is_dir():
+            marketing_path, financial_path = _discover_downloads(path)
+            entry = inputs.setdefault(path, {"run_dir": path, "marketing": None, "financial": None})
+            entry["marketing"] = entry["marketing"] or marketing_path
+            entry["financial"] = entry["financial"] or financial_path
+        elif path.is_file():
+            entry = inputs.setdefault(path.parent, {"run_dir": path.parent, "marketing": None, "financial": None})
+            entry["marketing" if "marketing" in path.name.lower() else "financial"] = path
+        else:
+            raise FileNotFoundError(f"No such run directory or report file: {path}")
+    return list(inputs.values())
+
+
+def analyze_run_dir(
+    run_dir: Path,
+    marketing_path: Path | None,
+    financial_path: Path | None,
+    report_start_date: str | None = None,
+    report_end_date: str | None = None,
+    operator_name: str | None = None,
+    push_to_sheets: bool = False,
+) -> dict:
+    """
+    Offline analysis of already-downloaded reports (no browser): _analysis_phase into run_dir.
+    Dates default to the range the run directory was downloaded for; tracing spans go to run_dir/metrics.jsonl.
+    Returns a summary dict.
+    """
+    logger = logging.getLogger("main")
+    started = time.monotonic()
+    if not (report_start_date and report_end_date):
+        report_start_date, report_end_date = _report_range_for_run_dir(run_dir)
+    summary = {
+        "run_dir": str(run_dir),
+        "marketing": str(marketing_path) if marketing_path else None,
+        "financial": str(financial_path) if financial_path else None,
+        "report_start_date": report_start_date,
+        "report_end_date": report_end_date,
+        "combined_report": None,
+        "error": None,
+    }
+    logger.info("Analyze %s: report date range %s to %s", run_dir, report_start_date, report_end_date)
+    try:
+        with metrics_file(Path(run_dir) / METRICS_FILE), span("analyze"):
+            combined_path = asyncio.run(_analysis_phase(
+                marketing_path, financial_path, Path(run_dir), report_start_date, report_end_date,
+                operator_name=operator_name, push_to_sheets=push_to_sheets,
+            ))
+        summary["combined_report"] = str(combined_path) if combined_path else None
+    except Exception as e:
+        logger.warning("Analyze %s failed: %s", run_dir, e, exc_info=True)
+        summary["error"] = str(e)
+    summary["duration_s"] = round(time.monotonic() - started, 1)
+    return summary
+
+
+def run_analyze(
+    paths: list[Path],
+    report_start_date: str | None = None,
+    report_end_date: str | None = None,
+    operator_name: str | None = None,
+    push_to_sheets: bool = False,
+    jobs: int | None = None,
+) -> list[dict]:
+    """
+    analyze_run_dir for every run directory in paths. Several directories are analysed in parallel worker
+    processes (jobs at a time, default one per CPU); a single one runs in this process.
+    Returns one summary per run directory, in input order.
+    """
+    logger = logging.getLogger("main")
+    inputs = collect_analysis_inputs(paths)
+    calls = [
+        (i["run_dir"], i["marketing"], i["financial"], report_start_date, report_end_date, operator_name, push_to_sheets)
+        for i in inputs
+    ]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(calls)))
+    if jobs == 1:
+        return [analyze_run_dir(*args) for args in calls]
+    logger.info("Analyzing %s run directories, %s at a time", len(calls), jobs)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx, initializer=setup_logging) as pool:
+        futures = [pool.submit(analyze_run_dir, *args) for args in calls]
+        summaries = []
+        for args, future in zip(calls, futures):
+            try:
+                summaries.append(future.result())
+            except Exception as e:
+                logger.warning("Analyze %s failed: %s", args[0], e)
+                summaries.append({"run_dir": str(args[0]), "combined_report": None, "error": str(e)})
+    return summaries
+
+
+def run_analyze_command(args) -> None:
+    """`main.py analyze`: offline analysis of existing run directories / report files; exits 1 if any produced no combined report."""
+    logger = logging.getLogger("main")
+    if bool(args.start) != bool(args.end):
+        logger.error("--start and --end must be given together")
+        sys.exit(2)
+    try:
+        summaries = run_analyze(
+            args.paths,
+            report_start_date=args.start,
+            report_end_date=args.end,
+            operator_name=args.operator,
+            push_to_sheets=args.push,
+            jobs=args.jobs,
+        )
+    except FileNotFoundError as e:
+        logger.error("%s", e)
+        sys.exit(2)
+    failed = [s for s in summaries if not s.get("combined_report")]
+    for s in summaries:
+        logger.info("Analyze %s: %s", s["run_dir"], s.get("combined_report") or f"failed ({s.get('error') or 'no combined report'})")
+    if failed:
+        logger.error("%s of %s run directories produced no combined report", len(failed), len(summaries))
         sys.exit(1)
 
 
 def main() -> None:
-    """Entry point: setup logging and run async workflow."""
+    """
+    Entry point: setup logging and run async workflow (one account from .env, or every account in --accounts),
+    or `analyze` already-downloaded run directories without a browser.
+    """
+    parser = argparse.ArgumentParser(description="DoorDash reports → analysis → campaigns")
+    parser.add_argument(
+        "--accounts",
+        type=Path,
+        help="CSV with email,password[,operator_name] columns; runs every account, MAX_CONCURRENT_BROWSERS at a time",
+    )
+    commands = parser.add_subparsers(dest="command")
+    analyze = commands.add_parser(
+        "analyze",
+        help="Re-run financial/marketing analysis and the combined report on existing downloads (no browser)",
+    )
+    analyze.add_argument("paths", nargs="+", type=Path, help="Run directories and/or downloaded report files")
+    analyze.add_argument("--start", help="Report start date MM/DD/YYYY (default: from the run directory's timestamp)")
+    analyze.add_argument("--end", help="Report end date MM/DD/YYYY (default: from the run directory's timestamp)")
+    analyze.add_argument("--operator", help="Operator name for the analysis (default: OPERATOR_NAME)")
+    analyze.add_argument("--push", action="store_true", help="Also push each combined report to Google Sheets")
+    analyze.add_argument("--jobs", type=int, help="Run directories analysed at once (default: one per CPU)")
+    args = parser.parse_args()
     setup_logging()
-    asyncio.run(run_workflow())
+    if args.command == "analyze":
+        run_analyze_command(args)
+    elif args.accounts:
+        asyncio.run(run_multi_account_workflow(args.accounts))
+    else:
+        asyncio.run(run_workflow())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Benchmark the AnalysisAgent on synthetic FINANCIAL_DETAILED reports.
+
+Generates deterministic FINANCIAL_DETAILED-shaped ZIPs (same seed and parameters -> same bytes) and,
+for each size, runs three stages in separate subprocesses so each one's peak RSS is its own:
+  builders     _load_financial_rollup and every _build_* function, timed one by one
+  run          analysis_agent.run(write_file=False)
+  write_excel  analysis_agent._write_excel on the tables run() returned
+Wall time and peak RSS per stage are written to a JSON results file.
+
+Usage:
+  python scripts/benchmark_analysis.py
+  python scripts/benchmark_analysis.py --sizes 10k,1m --stores 50 --days 90 --output results.json
+  python scripts/benchmark_analysis.py --sizes 1m --stream --chunksize 200000
+  python scripts/benchmark_analysis.py --generate-only --sizes 10m --data-dir /tmp/bench
+
+Sizes are total CSV rows (k/m suffixes allowed); rows per day = orders per day x ~1.05 (adjustment rows).
+Generated ZIPs are kept in --data-dir and reused on the next run with the same parameters.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_SIZES = "10k,1m,10m"
+DEFAULT_STORES = 25
+DEFAULT_DAYS = 90
+DEFAULT_SEED = 42
+DEFAULT_START_DATE = "2025-11-01"
+# Rows generated (and written to the zip) per batch, so 10M-row reports never sit in memory whole
+GENERATE_BATCH_ROWS = 500_000
+# Share of rows that are later adjustments (refund, error charge) of an existing order
+ADJUSTMENT_SHARE = 0.05
+STAGES = ["builders", "run", "write_excel"]
+
+# FINANCIAL_DETAILED header as exported by the DoorDash merchant portal (subset of columns, same order)
+FINANCIAL_COLUMNS = [
+    "Timestamp UTC time",
+    "Timestamp UTC date",
+    "Timestamp local time",
+    "Timestamp local date",
+    "Payout time",
+    "Payout date",
+    "Store ID",
+    "Business ID",
+    "Store name",
+    "Merchant store ID",
+    "Transaction type",
+    "Transaction ID",
+    "DoorDash order ID",
+    "Merchant delivery ID",
+    "Description",
+    "Final order status",
+    "Currency",
+    "Subtotal",
+    "Subtotal tax passed to merchant",
+    "Commission",
+    "Payment processing fee",
+    "Marketing fees | (including any applicable taxes)",
+    "Customer discounts from marketing | (Funded by you)",
+    "Error charges",
+    "Adjustments",
+    "Net total",
+]
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000, '250000' -> 250000."""
+    text = text.strip().lower().replace("_", "")
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1_000, text[:-1]
+    elif text.endswith("m"):
+        multiplier, text = 1_000_000, text[:-1]
+    return int(float(text) * multiplier)
+
+
+def _format_times(minutes, seconds, messy, rng):
+    """HH:MM:SS local times; with messy=True some are 12-hour ('7:05 PM'), minute-only ('19:05') or blank."""
+    import numpy as np
+    import pandas as pd
+
+    hh = pd.Series(minutes // 60).astype(str).str.zfill(2)
+    mm = pd.Series(minutes % 60).astype(str).str.zfill(2)
+    ss = pd.Series(seconds).astype(str).str.zfill(2)
+    times = hh + ":" + mm + ":" + ss
+    if messy:
+        kind = rng.random(len(times))
+        twelve = kind < 0.02
+        hour12 = (minutes[twelve] // 60) % 12
+        hour12 = np.where(hour12 == 0, 12, hour12)
+        suffix = np.where(minutes[twelve] < 720, "AM", "PM")
+        times[twelve] = [f"{h}:{m:02d} {s}" for h, m, s in zip(hour12, minutes[twelve] % 60, suffix)]
+        times[(kind >= 0.02) & (kind < 0.03)] = (hh + ":" + mm)[(kind >= 0.02) & (kind < 0.03)]
+        times[(kind >= 0.03) & (kind < 0.032)] = ""
+    return times
+
+
+def _generate_batch(batch_index, rows, first_order, stores, days, orders_per_day, start, seed, messy):
+    """One batch of report rows; depends only on its arguments so the whole file is deterministic."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng([seed, batch_index])
+    n_orders = max(1, int(round(rows / (1 + ADJUSTMENT_SHARE))))
+    order_ids = np.arange(first_order, first_order + n_orders)
+    # Orders are numbered day by day, so the batch covers a contiguous run of days
+    day = np.minimum(order_ids // max(orders_per_day, 1), days - 1)
+    adjustments = rows - n_orders
+    adj_orders = rng.choice(order_ids, size=adjustments) if adjustments > 0 else np.empty(0, dtype=int)
+    all_orders = np.concatenate([order_ids, adj_orders])
+    # Adjustments post 0-2 days after the order (so some orders span several date x slot cells)
+    all_days = np.concatenate([day, np.minimum(adj_orders // max(orders_per_day, 1) + rng.integers(0, 3, adjustments), days - 1)])
+    is_adjustment = np.arange(rows) >= n_orders
+    # Lunch and dinner peaks, a quieter breakfast, a thin tail overnight
+    minutes = np.clip(
+        np.where(
+            rng.random(rows) < 0.45,
+            rng.normal(12.5 * 60, 70, rows),
+            np.where(rng.random(rows) < 0.75, rng.normal(18.5 * 60, 80, rows), rng.uniform(0, 1440, rows)),
+        ),
+        0, 1439,
+    ).astype(int)
+    seconds = rng.integers(0, 60, rows)
+    store_of_order = (all_orders * 2654435761) % stores
+    dates = pd.Timestamp(start) + pd.to_timedelta(all_days, unit="D")
+    local_date = pd.Series(dates.strftime("%Y-%m-%d"))
+    local_time = _format_times(minutes, seconds, messy, rng)
+    if messy:
+        local_date[rng.random(rows) < 0.0005] = ""
+    subtotal = np.where(is_adjustment, -rng.uniform(1, 15, rows), rng.gamma(4.0, 8.0, rows) + 5).round(2)
+    commission = np.where(is_adjustment, 0.0, -(subtotal * 0.25)).round(2)
+    processing = np.where(is_adjustment, 0.0, -(subtotal * 0.03 + 0.3)).round(2)
+    marketing = np.where(rng.random(rows) < 0.2, -rng.uniform(0.5, 5, rows), 0.0).round(2)
+    discounts = np.where(rng.random(rows) < 0.15, -rng.uniform(1, 8, rows), 0.0).round(2)
+    net_total = (subtotal + commission + processing + marketing + discounts).round(2)
+    store_ids = (10_000 + store_of_order).astype(str)
+    return pd.DataFrame({
+        "Timestamp UTC time": local_time,
+        "Timestamp UTC date": local_date,
+        "Timestamp local time": local_time,
+        "Timestamp local date": local_date,
+        "Payout time": "",
+        "Payout date": "",
+        "Store ID": store_ids,
+        "Business ID": "900001",
+        "Store name": "Store " + pd.Series(store_ids),
+        "Merchant store ID": store_ids,
+        "Transaction type": np.where(is_adjustment, "Adjustment", "Delivery"),
+        "Transaction ID": [f"t{batch_index}-{i}" for i in range(rows)],
+        "DoorDash order ID": [f"{o:012x}" for o in all_orders],
+        "Merchant delivery ID": "",
+        "Description": "",
+        "Final order status": "Delivered",
+        "Currency": "USD",
+        "Subtotal": subtotal,
+        "Subtotal tax passed to merchant": (subtotal * 0.08).round(2),
+        "Commission": commission,
+        "Payment processing fee": processing,
+        "Marketing fees | (including any applicable taxes)": marketing,
+        "Customer discounts from marketing | (Funded by you)": discounts,
+        "Error charges": 0.0,
+        "Adjustments": 0.0,
+        "Net total": net_total,
+    }, columns=FINANCIAL_COLUMNS)
+
+
+def generate_financial_zip(
+    path: Path,
+    rows: int,
+    stores: int = DEFAULT_STORES,
+    days: int = DEFAULT_DAYS,
+    orders_per_day: int = None,
+    seed: int = DEFAULT_SEED,
+    start_date: str = DEFAULT_START_DATE,
+    messy: bool = True,
+) -> Path:
+    """
+    Write a FINANCIAL_DETAILED-shaped ZIP with `rows` CSV rows over `days` days and `stores` stores.
+    orders_per_day defaults to what fills `rows` (about rows / days / 1.05). Written in batches.
+    """
+    total_orders_per_day = orders_per_day or max(1, int(rows / (1 + ADJUSTMENT_SHARE) / days))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".zip.tmp")
+    member = f"FINANCIAL_DETAILED_{start_date.replace('-', '')}_{rows}.csv"
+    # Fixed entry timestamp so the same parameters give the same bytes
+    info = zipfile.ZipInfo(member, date_time=(2020, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        with zf.open(info, "w", force_zip64=True) as raw:
+            out = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+            written, first_order, batch_index = 0, 0, 0
+            while written < rows:
+                n = min(GENERATE_BATCH_ROWS, rows - written)
+                batch = _generate_batch(batch_index, n, first_order, stores, days, total_orders_per_day, start_date, seed, messy)
+                batch.to_csv(out, index=False, header=(batch_index == 0))
+                written += n
+                first_order += int(round(n / (1 + ADJUSTMENT_SHARE)))
+                batch_index += 1
+            out.flush()
+            out.detach()
+    os.replace(tmp, path)
+    return path
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB. Linux: VmHWM, which exec resets (ru_maxrss would
+    carry over the parent's peak). Elsewhere ru_maxrss; None where neither is available.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _timed(timings, name, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    timings[name] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def _sheets_to_write_excel_args(sheets):
+    """Rebuild _write_excel's arguments from run(write_file=False)'s (sheet name, table) list."""
+    import pandas as pd
+
+    by_name = dict(sheets)
+    return {
+        "date_wise": by_name.get("Date-wise", pd.DataFrame()),
+        "day_of_week": by_name.get("Day of week", pd.DataFrame()),
+        "slot": by_name.get("Slot-based", pd.DataFrame()),
+        "day_slot": by_name.get("Day-Slot", pd.DataFrame()),
+        "store_wise": by_name.get("Store-wise", pd.DataFrame()),
+        "campaign_recs": pd.DataFrame(),
+        "store_slot_pivots": [(n, df) for n, df in sheets if n.startswith("Store-Slot ")],
+        "day_slot_store_pivots": [(n, df) for n, df in sheets if n.startswith("DaySlot-Store ")],
+        "day_slot_per_store": [(n, df) for n, df in sheets if n.startswith("Day-Slot - ")] or None,
+    }
+
+
+def run_stage(stage: str, zip_path: Path, stream: bool, chunksize: int) -> dict:
+    """Run one stage in this process and return its timings (seconds) and peak RSS."""
+    import logging
+    from agents import analysis_agent as aa
+
+    logging.basicConfig(level=logging.WARNING)
+    timings = {}
+    with tempfile.TemporaryDirectory(prefix="bench-") as out_dir:
+        out_dir = Path(out_dir)
+        start = time.perf_counter()
+        if stage == "builders":
+            loaded = _timed(timings, "_load_financial_rollup", aa._load_financial_rollup, zip_path, out_dir, stream, chunksize, False)
+            rollup, _ = loaded
+            date_wise = _timed(timings, "_build_date_wise", aa._build_date_wise, rollup)
+            _timed(timings, "_build_day_of_week", aa._build_day_of_week, date_wise)
+            _timed(timings, "_build_slot_based", aa._build_slot_based, rollup)
+            _timed(timings, "_build_day_slot", aa._build_day_slot, rollup)
+            _timed(timings, "_build_day_slot_per_store", aa._build_day_slot_per_store, rollup)
+            store_metrics = _timed(timings, "_build_store_metrics", aa._build_store_metrics, rollup)
+            _timed(timings, "_build_campaign_recommendations", aa._build_campaign_recommendations, store_metrics)
+            _timed(timings, "_build_store_slot_agg", aa._build_store_slot_agg, rollup)
+            _timed(timings, "_build_day_slot_store_agg", aa._build_day_slot_store_agg, rollup)
+        elif stage == "run":
+            _timed(
+                timings, "run", aa.run, zip_path, out_dir, "", "",
+                write_file=False, stream=stream, chunksize=chunksize, use_cache=False,
+            )
+        elif stage == "write_excel":
+            sheets = _timed(
+                timings, "run", aa.run, zip_path, out_dir, "", "",
+                write_file=False, stream=stream, chunksize=chunksize, use_cache=False,
+            )
+            _timed(timings, "_write_excel", aa._write_excel, out_dir, **_sheets_to_write_excel_args(sheets))
+        else:
+            raise ValueError(f"Unknown stage {stage!r}")
+        total = time.perf_counter() - start
+    return {"wall_s": round(total, 4), "timings_s": timings, "peak_rss_mb": peak_rss_mb()}
+
+
+def _run_stage_subprocess(stage: str, zip_path: Path, stream: bool, chunksize: int) -> dict:
+    """Run a stage in a fresh interpreter so its peak RSS is not inflated by earlier stages."""
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--stage", stage, "--zip", str(zip_path)]
+    if stream:
+        cmd.append("--stream")
+    if chunksize:
+        cmd += ["--chunksize", str(chunksize)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=str(PROJECT_ROOT))
+    if proc.returncode != 0:
+        return {"error": (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["failed"]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark analysis_agent on synthetic FINANCIAL_DETAILED reports")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated row counts (default {DEFAULT_SIZES})")
+    parser.add_argument("--stores", type=int, default=DEFAULT_STORES)
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    parser.add_argument("--orders-per-day", type=int, default=None, help="Default: whatever fills the row count")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--clean", action="store_true", help="No messy timestamps (12-hour, minute-only, blank)")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--stream", action="store_true", help="Read the report in chunks (run(stream=True))")
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--data-dir", default=None, help="Where generated ZIPs are kept (default: system temp dir)")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmark_analysis_<timestamp>.json)")
+    parser.add_argument("--generate-only", action="store_true", help="Only write the ZIPs")
+    # Internal: run one stage in this process and print its result as JSON
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--zip", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        print(json.dumps(run_stage(args.stage, Path(args.zip), args.stream, args.chunksize)))
+        return
+
+    import pandas as pd
+
+    data_dir = Path(args.data_dir) if args.data_dir else Path(tempfile.gettempdir()) / "financial_benchmark"
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    cases = []
+    for size in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+        name = f"financial_{size}r_{args.stores}s_{args.days}d_{args.orders_per_day or 'auto'}o_seed{args.seed}{'_clean' if args.clean else ''}.zip"
+        zip_path = data_dir / name
+        case = {"rows": size, "stores": args.stores, "days": args.days, "orders_per_day": args.orders_per_day, "zip": str(zip_path)}
+        if zip_path.is_file():
+            case["generate_s"] = None
+        else:
+            print(f"Generating {size:,} rows -> {zip_path}", flush=True)
+            start = time.perf_counter()
+            generate_financial_zip(zip_path, size, args.stores, args.days, args.orders_per_day, args.seed, messy=not args.clean)
+            case["generate_s"] = round(time.perf_counter() - start, 2)
+        case["zip_bytes"] = zip_path.stat().st_size
+        if not args.generate_only:
+            case["stages"] = {}
+            for stage in stages:
+                print(f"  {size:,} rows: {stage} ...", flush=True)
+                result = _run_stage_subprocess(stage, zip_path, args.stream, args.chunksize)
+                case["stages"][stage] = result
+                if "error" in result:
+                    print(f"    failed: {result['error']}", flush=True)
+                else:
+                    print(f"    {result['wall_s']:.2f}s, peak RSS {result['peak_rss_mb']} MB", flush=True)
+        cases.append(case)
+
+    if args.generate_only:
+        return
+    results = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "stream": args.stream,
+        "chunksize": args.chunksize,
+        "seed": args.seed,
+        "messy": not args.clean,
+        "cases": cases,
+    }
+    output = Path(args.output) if args.output else Path(f"benchmark_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,5 +23,5 @@ if [[ ! -x "$CHROME" ]] && ! command -v "$CHROME" &>/dev/null; then
 fi
 
 echo "Starting Chrome with --remote-debugging-port=$PORT --user-data-dir=$USER_DATA_DIR"
-echo "Log in to Gmail/DoorDash once in this window; then run: python main.py"
+echo "Log in to Gmail/DoorDash once in this window; then run: USE_LOCAL_BROWSER=true CHROME_CDP_URL=http://localhost:$PORT python main.py"
 exec "$CHROME" --remote-debugging-port="$PORT" --user-data-dir="$USER_DATA_DIR"